@@ -0,0 +1,163 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT
+
+# 추천 요청 수락 제어 (수강신청 기간처럼 요청이 몰릴 때 처리할 수 있는 만큼만 받음)
+# - 클라이언트별 토큰 버킷: 분당 RATE_LIMIT_PER_MINUTE개, 순간 최대 RATE_LIMIT_BURST개. 넘으면 429
+# - 동시 실행 제한: ADMISSION_MAX_CONCURRENCY개까지 실행하고, 나머지는 ADMISSION_MAX_QUEUE개까지
+#   ADMISSION_QUEUE_TIMEOUT초 동안 순서대로 대기. 대기열이 가득 찼거나 대기 시간이 지나면 바로 503
+# 제한은 프로세스마다 적용된다 (serve.py 작업 프로세스 N개면 전체 동시 실행 수는 N배).
+
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "8"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+
+# 0이면 클라이언트별 제한 없음
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "30"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "10"))
+
+# 토큰 버킷을 보관할 최대 클라이언트 수 (오래 요청이 없던 클라이언트부터 제거)
+RATE_LIMIT_MAX_CLIENTS = 10000
+
+# 프록시 뒤에서 실행할 때만 X-Forwarded-For의 첫 주소를 클라이언트로 사용 (아니면 위조 가능)
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+
+
+class Rejected(Exception):
+    """요청을 받지 않음 (status_code와 Retry-After 초를 함께 전달)"""
+
+    def __init__(self, status_code, reason, detail, retry_after):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def client_key(request):
+    """요청한 클라이언트 식별자 (IP)"""
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity, now):
+        self.rate = rate  # 초당 충전 개수
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def take(self, now):
+        """토큰 하나를 사용하고 0 반환. 부족하면 다음 토큰까지 남은 초 반환"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """클라이언트별 토큰 버킷 (LRU로 최대 max_clients개 보관)"""
+
+    def __init__(self, per_minute=RATE_LIMIT_PER_MINUTE, burst=RATE_LIMIT_BURST, max_clients=RATE_LIMIT_MAX_CLIENTS):
+        self.rate = per_minute / 60.0
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, key):
+        """요청을 허용하면 통과, 아니면 Rejected(429)"""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            wait = bucket.take(now)
+        if wait > 0:
+            ADMISSION_REJECTED.inc(reason="rate_limited")
+            raise Rejected(429, "rate_limited", "요청이 너무 많습니다. 잠시 후 다시 시도해주세요.", wait)
+
+
+class ConcurrencyLimiter:
+    """동시 실행 수 제한 + 크기가 제한된 대기열 (먼저 온 요청부터 실행)
+
+    한 이벤트 루프(API 서버) 안에서만 사용한다.
+    """
+
+    def __init__(self, max_concurrency=ADMISSION_MAX_CONCURRENCY, max_queue=ADMISSION_MAX_QUEUE,
+                 queue_timeout=ADMISSION_QUEUE_TIMEOUT):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters = deque()
+
+    def _update_metrics(self):
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        ADMISSION_QUEUED.set(len(self._waiters))
+
+    async def acquire(self):
+        """실행 자리를 얻을 때까지 대기 (대기열이 가득 찼거나 queue_timeout이 지나면 Rejected(503))"""
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self._update_metrics()
+            ADMISSION_WAIT.observe(0.0)
+            return
+        if len(self._waiters) >= self.max_queue:
+            ADMISSION_REJECTED.inc(reason="queue_full")
+            raise Rejected(503, "queue_full", "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                           self.queue_timeout)
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_metrics()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # 자리를 넘겨받은 직후에 시간이 지났거나 클라이언트가 끊김: 자리를 다음 요청에 넘김
+                self.release()
+            else:
+                waiter.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            ADMISSION_REJECTED.inc(reason="queue_timeout")
+            raise Rejected(503, "queue_timeout", "대기 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.",
+                           self.queue_timeout)
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            self._update_metrics()
+        ADMISSION_WAIT.observe(time.perf_counter() - start)
+
+    def release(self):
+        """실행을 마침. 대기 중인 요청이 있으면 자리를 바로 넘김"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_metrics()
+                return
+        self.in_flight -= 1
+        self._update_metrics()
+
+
+rate_limiter = RateLimiter()
+recommend_limiter = ConcurrencyLimiter()
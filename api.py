@@ -1,18 +1,33 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_openai import ChatOpenAI
-from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferMemory
-from langchain.prompts import PromptTemplate
+from typing import List, Optional
 import os
 from dotenv import load_dotenv
 import logging
 import traceback
-from vector_store import query_similar_courses
+from vector_store import query_similar_courses, get_vector_store, use_index
+from index_registry import indexes
+from terms import resolve_term, list_terms, get_current_term, TermNotAvailable
+from course_catalog import catalog
+import course_features
+from timetable import timetables, ScheduleParseError
+from similarity_graph import similarity_graphs
+from reranker import rerank, RERANK_TOP_N
+from conversation_store import conversations
+from recommendation import recommend_batch, generate_bounded, BATCH_MAX_QUESTIONS, RETRIEVE_CANDIDATES
+import jobs
+from admission import Rejected, client_key, rate_limiter, recommend_limiter
+from singleflight import normalize_question, recommend_flights
+import metrics
+from metrics import span
 import json
+import math
+import numpy as np
+import threading
+import time
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -25,51 +40,87 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다. .env 파일을 확인해주세요.")
 
+# 요청별 Server-Timing 헤더 사용 여부
+ENABLE_SERVER_TIMING = os.getenv("ENABLE_SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
 app = FastAPI()
 
-# CORS 설정
+# CORS 허용 출처 (쉼표로 구분, 기본: Streamlit과 로컬 프론트엔드)
+CORS_ALLOW_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv(
+        "CORS_ALLOW_ORIGINS",
+        "http://localhost:8501,http://127.0.0.1:8501,http://localhost:8000,http://127.0.0.1:8000"
+    ).split(",")
+    if origin.strip()
+]
+
+# CORS 설정 (쿠키 인증을 쓰지 않으므로 credentials는 허용하지 않음)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=CORS_ALLOW_ORIGINS,
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type"],
+    expose_headers=["Server-Timing", "Retry-After"],
 )
 
-# VectorDB 로드
-try:
-    logger.info("VectorDB 로드 시작...")
-    embeddings = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
-    vectorstore = Chroma(
-        persist_directory="./chroma_db",
-        embedding_function=embeddings
+@app.exception_handler(Rejected)
+async def handle_rejected(request: Request, exc: Rejected):
+    """수락 제어로 받지 않은 요청은 처리 없이 바로 429/503 응답"""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail, "reason": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)},
     )
-    logger.info("VectorDB 로드 완료")
-except Exception as e:
-    logger.error(f"VectorDB 로드 중 오류 발생: {str(e)}")
-    logger.error(traceback.format_exc())
-    raise
-
-# 대화 메모리 설정
-memory = ConversationBufferMemory(
-    memory_key="chat_history",
-    return_messages=True,
-    output_key="answer"
-)
 
-# LLM 설정
-try:
-    logger.info("LLM 초기화 시작...")
-    llm = ChatOpenAI(
-        temperature=0.7,
-        model_name="gpt-3.5-turbo",
-        openai_api_key=OPENAI_API_KEY
-    )
-    logger.info("LLM 초기화 완료")
-except Exception as e:
-    logger.error(f"LLM 초기화 중 오류 발생: {str(e)}")
-    logger.error(traceback.format_exc())
-    raise
+async def admit_recommend(request: Request):
+    """클라이언트별 요청 수 제한 후 실행 자리를 얻을 때까지 대기 (응답 후 자리 반환)"""
+    rate_limiter.check(client_key(request))
+    await recommend_limiter.acquire()
+    try:
+        yield
+    finally:
+        recommend_limiter.release()
+
+async def limit_client_rate(request: Request):
+    """클라이언트별 요청 수 제한만 적용 (작업 등록처럼 바로 끝나는 요청)"""
+    rate_limiter.check(client_key(request))
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    """요청별 단계 소요 시간 기록 및 Server-Timing 헤더 추가"""
+    timings = metrics.start_request_timings()
+    start = time.perf_counter()
+    response = await call_next(request)
+    if ENABLE_SERVER_TIMING and timings:
+        timings.append(("total", time.perf_counter() - start))
+        response.headers["Server-Timing"] = metrics.format_server_timing(timings)
+    return response
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus 형식 메트릭 반환"""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+# LLM 클라이언트 (처음 사용할 때 생성, langchain_openai도 그때 import)
+LLM_MODEL = "gpt-3.5-turbo-16k"  # 더 긴 컨텍스트를 처리할 수 있는 모델 사용
+_llm = None
+_llm_lock = threading.Lock()
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                from langchain_openai import ChatOpenAI
+                logger.info("LLM 초기화")
+                _llm = ChatOpenAI(
+                    model_name=LLM_MODEL,
+                    temperature=0.7,
+                    openai_api_key=OPENAI_API_KEY
+                )
+    return _llm
 
 # 커스텀 프롬프트 템플릿
 template = """당신은 대학교 강의 추천 시스템입니다. 주어진 강의계획서 정보를 바탕으로 학생들에게 적절한 강의를 추천해주세요.
@@ -77,6 +128,9 @@ template = """당신은 대학교 강의 추천 시스템입니다. 주어진 
 강의계획서 정보:
 {context}
 
+이전 대화:
+{chat_history}
+
 질문: {question}
 
 답변할 때 다음 사항을 고려해주세요:
@@ -98,124 +152,525 @@ template = """당신은 대학교 강의 추천 시스템입니다. 주어진 
 
 답변:"""
 
-QA_PROMPT = PromptTemplate(
-    template=template,
-    input_variables=["context", "question"]
-)
+# 변수 치환만 하므로 PromptTemplate 대신 str.format 사용 (langchain 프롬프트 모듈 import 비용 절약)
+QA_PROMPT = template
 
-# RAG 체인 설정
-try:
-    logger.info("RAG 체인 설정 시작...")
-    qa_chain = ConversationalRetrievalChain.from_llm(
-        llm=llm,
-        retriever=vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={
-                "k": 15,  # 검색 결과 수 증가
-                "score_threshold": 0.6,  # 유사도 임계값 조정
-                "filter": None
-            }
-        ),
-        memory=memory,
-        return_source_documents=True,
-        combine_docs_chain_kwargs={
-            "prompt": QA_PROMPT,
-            "document_variable_name": "context"
-        }
-    )
-    logger.info("RAG 체인 설정 완료")
-except Exception as e:
-    logger.error(f"RAG 체인 설정 중 오류 발생: {str(e)}")
-    logger.error(traceback.format_exc())
-    raise
+# 시작 준비 상태 (무거운 구성 요소는 서버가 포트를 연 뒤 백그라운드에서 미리 로드)
+# 준비가 끝나기 전에 들어온 요청도 처리되지만 첫 요청이 로드 시간만큼 느려진다.
+# /healthz는 프로세스가 살아 있는지, /readyz는 미리 로드가 끝났는지 알려준다.
+warmup_state = {"ready": False, "started_at": None, "finished_at": None, "components": {}, "errors": {}}
+
+def shared_steps(term):
+    """프로세스 간에 공유할 수 있는 읽기 전용 데이터 (serve.py는 fork 전에 마스터에서 한 번 로드)"""
+    return [
+        ("course_features", lambda: len(course_features.features.get(term))),
+        ("course_catalog", lambda: len(catalog._table(term))),
+        ("timetable", lambda: len(timetable_index(term).course_ids)),
+        ("similarity_graph", lambda: similarity_graphs.get(term) is not None),
+    ]
+
+def count_vectors(term):
+    with use_index():
+        return get_vector_store(term)._collection.count()
+
+def client_steps(term):
+    """프로세스마다 따로 만들어야 하는 클라이언트 (fork 이후에 생성)"""
+    return [
+        ("vector_store", lambda: count_vectors(term)),
+        ("llm", lambda: get_llm() is not None),
+    ]
+
+def run_steps(steps):
+    """(이름, 로드 함수) 목록을 실행하고 (이름별 소요 시간, 이름별 오류) 반환
+
+    한 구성 요소가 실패해도 나머지는 계속 로드한다 (해당 기능 요청 시 다시 시도).
+    """
+    timings, errors = {}, {}
+    for name, load in steps:
+        start = time.perf_counter()
+        try:
+            load()
+            timings[name] = round(time.perf_counter() - start, 3)
+        except Exception as e:
+            errors[name] = str(e)
+            logger.error(f"{name} 미리 로드 중 오류 발생: {str(e)}")
+    return timings, errors
+
+def preload_shared(reload=False):
+    """기본 학기 읽기 전용 데이터 로드 (reload이면 디스크에서 다시 읽음)"""
+    term = get_current_term()
+    if reload:
+        course_features.features.reload(term)
+        catalog.clear()
+    return run_steps(shared_steps(term))
+
+def warm_up():
+    """기본 학기 강의 특성 표, 강의 목록, 유사 강의 그래프, VectorDB, LLM 클라이언트를 미리 로드"""
+    warmup_state["started_at"] = time.time()
+    term = get_current_term()
+    timings, errors = run_steps(shared_steps(term) + client_steps(term))
+    warmup_state["components"].update(timings)
+    warmup_state["errors"].update(errors)
+    warmup_state["finished_at"] = time.time()
+    warmup_state["ready"] = True
+    logger.info(f"미리 로드 완료: {term} ({warmup_state['finished_at'] - warmup_state['started_at']:.2f}초)")
+
+@app.on_event("startup")
+def start_warm_up():
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+@app.get("/healthz")
+async def healthz():
+    """프로세스 생존 확인 (liveness)"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """미리 로드 완료 여부 (readiness). 완료 전에는 503"""
+    body = {
+        "status": "ready" if warmup_state["ready"] else "warming_up",
+        "index_version": indexes.current_version(),
+        "components": warmup_state["components"],
+        "errors": warmup_state["errors"],
+    }
+    if not warmup_state["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+# 비동기 작업 프로세스 (JOB_WORKERS=0이면 python jobs.py worker로 따로 실행)
+job_pool = None
+
+@app.on_event("startup")
+def start_job_workers():
+    global job_pool
+    jobs.init_jobs_db()
+    if jobs.JOB_WORKERS > 0:
+        job_pool = jobs.WorkerPool(jobs.JOB_WORKERS)
+        job_pool.start()
+        logger.info(f"작업 프로세스 {jobs.JOB_WORKERS}개 시작")
+        if not conversations.persistent:
+            logger.warning("CONVERSATION_DATABASE_URL이 비어 있어 비동기 작업으로 처리한 대화는 이어지지 않습니다.")
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    if job_pool is not None:
+        job_pool.stop()
+
+def rank_by_features(intents, term, limit=10, student=None):
+    """평가 비율/A 비율/핵심역량 기준(intents)만으로 특성 표 전체에서 순위를 매겨 (답변, 검색 결과) 반환
+
+    순위를 매길 강의가 없으면 None. student(시간표 비트셋)를 주면 시간이 겹치는 강의는 제외한다.
+    """
+    table = course_features.features.get(term)
+    candidates = None
+    if student is not None:
+        candidates = ~timetables.get(term, table).conflicts(student)
+    ranked = course_features.score_courses(table, intents, limit=limit, candidates=candidates)
+    if ranked is None or ranked.empty:
+        return None
+    
+    lines = [f"요청하신 기준({course_features.describe_intents(intents)})으로 정렬한 강의입니다."]
+    results = []
+    for rank, row in enumerate(ranked.itertuples(index=False), 1):
+        metadata = catalog.get(term, int(row.course_id)) or {}
+        values = ", ".join(
+            f"{course_features.COLUMN_LABELS[column]} {getattr(row, column):g}"
+            + ("%" if column in course_features.EVALUATION_COLUMNS or column == "a_ratio" else "")
+            for column, _ in intents if not math.isnan(getattr(row, column))
+        )
+        lines.append(f"{rank}. {metadata.get('subject_name', row.subject_name)} "
+                     f"({metadata.get('professor', row.professor)}) - {values}")
+        results.append(json.dumps({"content": "", "metadata": metadata, "score": float(row.score)}, ensure_ascii=False))
+    return "\n".join(lines), results
+
+# 주제와 평가 기준이 함께 있는 질문에서 특성 점수를 반영하는 비중 (나머지는 재정렬 점수)
+FEATURE_RERANK_WEIGHT = 0.5
+
+def rerank_by_features(similar_courses, term, intents, limit):
+    """재정렬된 검색 결과를 특성 기준 점수와 섞어 다시 정렬하고 상위 limit개 반환
+
+    특성 값이 없어 기준을 확인할 수 없는 강의는 뒤로 보낸다.
+    """
+    if not similar_courses:
+        return similar_courses
+    candidates = [json.loads(course) for course in similar_courses]
+    course_ids = [candidate.get("metadata", {}).get("course_id") for candidate in candidates]
+    scores = course_features.course_scores(course_features.features.get(term), course_ids, intents)
+    relevance = np.array([candidate.get("rerank_score", 0.0) for candidate in candidates], dtype=np.float64)
+    missing = np.isnan(scores)
+    combined = (1 - FEATURE_RERANK_WEIGHT) * relevance + FEATURE_RERANK_WEIGHT * np.where(missing, 0.0, scores)
+    reranked = []
+    for row in np.lexsort((-combined, missing))[:limit]:
+        candidate = candidates[row]
+        if not missing[row]:
+            candidate["feature_score"] = round(float(scores[row]), 4)
+        reranked.append(json.dumps(candidate, ensure_ascii=False))
+    return reranked
 
 class Query(BaseModel):
     question: str
-    chat_history: list = []
+    chat_history: list = []  # session_id가 없을 때 사용할 이전 대화 ([질문, 답변] 목록 등)
+    session_id: Optional[str] = None  # 대화 세션 (생략 시 새로 만들어 응답에 포함)
+    term: Optional[str] = None  # 검색할 학기 (생략 시 기본 학기)
+    timetable: List[str] = []  # 학생 시간표 (예: "월 7-A,월 7-B"). 시간이 겹치는 강의는 추천에서 제외
 
-@app.post("/api/recommend")
-async def recommend_courses(query: Query):
+class TimetableQuery(BaseModel):
+    timetable: List[str] = []  # 학생 시간표 (요일/시간 문자열 목록)
+    course_ids: List[int] = []  # 이미 담은 강의 (해당 강의 시간도 시간표에 포함)
+    term: Optional[str] = None
+    course_type: Optional[str] = None
+    major: Optional[str] = None
+    max_overlap: int = 0  # 허용할 겹치는 반교시 수 (0이면 충돌 없는 강의만)
+    include_unscheduled: bool = False  # 요일/시간 정보가 없는 강의 포함 여부
+    limit: int = 20
+
+def timetable_index(term):
+    return timetables.get(term, course_features.features.get(term))
+
+def drop_conflicts(similar_courses, term, student):
+    """검색 결과 중 학생 시간표와 겹치는 강의 제거 (course_id가 없는 결과는 유지)"""
+    index = timetable_index(term)
+    course_ids = [json.loads(course).get("metadata", {}).get("course_id") for course in similar_courses]
+    rows = index.rows_for(course_ids)
+    if not len(rows):
+        return similar_courses
+    conflicting = set(index.course_ids[rows[index.conflicts(student, rows)]].tolist())
+    return [course for course, course_id in zip(similar_courses, course_ids) if course_id not in conflicting]
+
+@app.post("/api/timetable/candidates")
+async def timetable_candidates(query: TimetableQuery):
+    """학생 시간표와 겹치지 않는 (max_overlap 이하로 겹치는) 강의를 겹치는 칸 수 순으로 반환"""
     try:
-        # 유사한 강의 검색
-        similar_courses = query_similar_courses(query.question, n_results=10)  # 검색 결과 수 증가
-        
-        if not similar_courses:
-            return {
-                "answer": "죄송합니다. 관련된 강의를 찾을 수 없습니다.",
-                "sources": []
-            }
-        
+        term = resolve_term(query.term)
+        index = timetable_index(term)
+        student = index.student_words(query.timetable, query.course_ids)
+    except (TermNotAvailable, ScheduleParseError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    table = course_features.features.get(term)
+    
+    with span("timetable_filter"):
+        overlap = index.overlap_slots(student)
+        mask = overlap <= query.max_overlap
+        if not query.include_unscheduled:
+            mask &= index.has_schedule
+        if query.course_type:
+            mask &= (table["course_type"] == query.course_type).to_numpy()
+        if query.major:
+            mask &= table["major"].str.contains(query.major, regex=False).to_numpy()
+        mask[index.rows_for(query.course_ids)] = False
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(overlap[rows], kind="stable")][:query.limit]
+    
+    candidates = []
+    for row in rows:
+        course_id = int(index.course_ids[row])
+        metadata = catalog.get(term, course_id) or {}
+        candidates.append({
+            "course_id": course_id,
+            "subject_name": metadata.get("subject_name", ""),
+            "professor": metadata.get("professor", ""),
+            "major": metadata.get("major", ""),
+            "course_type": metadata.get("course_type", ""),
+            "schedule": metadata.get("schedule", ""),
+            "overlap_slots": int(overlap[row])
+        })
+    return {
+        "term": term,
+        "checked": len(index),
+        "conflicting": int(np.count_nonzero(overlap > 0)),
+        "candidates": candidates
+    }
+
+@app.get("/api/terms")
+async def get_terms():
+    """검색 가능한 학기 목록"""
+    return {"terms": [item for item in list_terms() if item["status"] == "active"]}
+
+def format_sources(similar_courses):
+    """검색된 강의 정보를 API 응답용 sources 형식으로 변환"""
+    sources = []
+    for course in similar_courses:
+        try:
+            # JSON 형식의 강의 정보에서 필요한 정보 추출
+            course_info = json.loads(course)
+            metadata = course_info.get("metadata", {})
+
+            # 강의 정보 추출
+            subject_name = metadata.get("subject_name", "")
+            professor = metadata.get("professor", "")
+            major = metadata.get("major", "")
+            course_type = metadata.get("course_type", "")
+            year = metadata.get("year", "")
+            professor_phone = metadata.get("professor_phone", "")
+            professor_email = metadata.get("professor_email", "")
+            office = metadata.get("office", "")
+            consultation_time = metadata.get("consultation_time", "")
+            classroom = metadata.get("classroom", "")
+            schedule = metadata.get("schedule", "")
+
+            # 기본 정보가 있는 경우에만 추가
+            if subject_name or professor or major or course_type:
+                sources.append({
+                    "subject_name": subject_name,
+                    "professor": professor,
+                    "major": f"{major} {year}" if major and year else major,
+                    "course_type": course_type,
+                    "professor_phone": professor_phone,
+                    "professor_email": professor_email,
+                    "office": office,
+                    "consultation_time": consultation_time,
+                    "classroom": classroom,
+                    "schedule": schedule,
+                    "content": course
+                })
+        except Exception as e:
+            logger.error(f"강의 정보 파싱 중 오류 발생: {str(e)}")
+            continue
+    return sources
+
+@app.get("/api/courses/{course_id}/similar")
+async def similar_courses_of(course_id: int, term: Optional[str] = None, limit: int = 10):
+    """미리 계산한 유사도 그래프에서 비슷한 강의 조회 (같은 교과목의 다른 분반은 제외)"""
+    try:
+        term = resolve_term(term)
+    except TermNotAvailable as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    graph = similarity_graphs.get(term)
+    if graph is None:
+        raise HTTPException(status_code=503, detail=f"{term} 학기 유사도 그래프가 없습니다. similarity_graph.py를 실행하세요.")
+    course = catalog.get(term, course_id)
+    if course is None or course_id not in graph:
+        raise HTTPException(status_code=404, detail=f"강의를 찾을 수 없습니다: {course_id}")
+    
+    similar = []
+    for neighbor_id, score in graph.neighbors(course_id):
+        metadata = catalog.get(term, neighbor_id)
+        if metadata is None or metadata.get("subject_name") == course.get("subject_name"):
+            continue
+        similar.append({**metadata, "score": score})
+        if len(similar) >= limit:
+            break
+    return {"course": course, "similar": similar}
+
+# 이보다 짧은 질문은 이어지는 질문("그 중 3학년 수업은?")으로 보고 직전 질문과 함께 검색
+FOLLOW_UP_MAX_CHARS = 30
+
+def search_text(question, history):
+    """검색에 쓸 문장 (짧은 후속 질문이면 직전 질문을 앞에 붙임)"""
+    previous = history.last_user_message() if history is not None else None
+    if previous and len(question) <= FOLLOW_UP_MAX_CHARS:
+        return f"{previous} {question}"
+    return question
+
+async def answer_question(question, term, student=None, history=None):
+    """질문 하나의 (상태, 답변, 추천 강의) 계산 (history가 있으면 이어지는 질문으로 검색/프롬프트 구성)"""
+    intents, topic = course_features.parse_feature_query(question)
+    text = search_text(question, history)
+    
+    # 주제 없이 평가 비율 등 구조화된 기준만 있는 질문은 LLM 없이 특성 표 전체에서 순위 계산
+    if intents and not topic and text == question:
+        with span("feature_rank"):
+            ranked = rank_by_features(intents, term, student=student)
+        if ranked is not None:
+            answer, ranked_courses = ranked
+            return "ok", answer, format_sources(ranked_courses)
+    
+    # 유사한 강의 검색 (요청한 학기 컬렉션만 검색, 이벤트 루프를 막지 않도록 스레드에서 실행)
+    with span("retrieve"):
+        similar_courses = await run_in_threadpool(
+            query_similar_courses, text, n_results=RETRIEVE_CANDIDATES, term=term)  # 재정렬 후보
+    if student is not None:
+        similar_courses = drop_conflicts(similar_courses, term, student)
+    
+    # 교과목명/수업목표 겹침, 학과·이수구분 일치를 반영해 재정렬하고 상위 강의만 LLM에 전달
+    # (평가 기준이 함께 있으면 검색된 후보 안에서 특성 점수도 반영)
+    with span("rerank"):
+        if intents:
+            similar_courses = rerank(question, similar_courses, limit=len(similar_courses))
+            similar_courses = rerank_by_features(similar_courses, term, intents, RERANK_TOP_N)
+        else:
+            similar_courses = rerank(question, similar_courses, limit=RERANK_TOP_N)
+    
+    if not similar_courses:
+        return "no_results", "죄송합니다. 관련된 강의를 찾을 수 없습니다.", []
+    
+    with span("prompt_build"):
         # 검색된 강의 정보를 컨텍스트로 사용
         context = "\n\n".join(similar_courses)
         
-        # LLM을 사용하여 답변 생성
-        llm = ChatOpenAI(
-            model_name="gpt-3.5-turbo-16k",  # 더 긴 컨텍스트를 처리할 수 있는 모델 사용
-            temperature=0.7,
-            openai_api_key=OPENAI_API_KEY
-        )
-        
-        # 프롬프트 생성
+        # 프롬프트 생성 (대화 기록은 세션별 토큰 상한 안에서 요약/잘라서 포함)
         formatted_prompt = QA_PROMPT.format(
             context=context,
-            question=query.question
+            chat_history=(history.format_history() if history is not None else "") or "(없음)",
+            question=question
         )
+    
+    # LLM을 사용하여 답변 생성
+    with span("llm"):
+        response = await get_llm().ainvoke(formatted_prompt)
+    token_usage = getattr(response, "response_metadata", {}).get("token_usage") or {}
+    if token_usage.get("prompt_tokens"):
+        metrics.PROMPT_TOKENS.inc(token_usage["prompt_tokens"])
+    
+    # sources 정보 생성
+    with span("format_sources"):
+        sources = format_sources(similar_courses)
+    return "ok", response.content, sources
+
+@app.post("/api/recommend", dependencies=[Depends(admit_recommend)])
+async def recommend_courses(query: Query):
+    start = time.perf_counter()
+    status = "error"
+    try:
+        term = resolve_term(query.term)
+        student = timetable_index(term).student_words(query.timetable) if query.timetable else None
+    except (TermNotAvailable, ScheduleParseError) as e:
+        metrics.RECOMMEND_REQUESTS.inc(status="bad_request")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # 세션 대화 기록 (세션 기록이 없으면 클라이언트가 보낸 chat_history 사용)
+    session_id = query.session_id or conversations.new_session_id()
+    history = conversations.start(session_id, query.chat_history)
+    try:
+        if history.turns or history.summary:
+            # 이어지는 질문은 대화 기록에 따라 답이 달라지므로 따로 계산
+            status, answer, sources = await answer_question(query.question, term, student, history)
+        else:
+            # 대화 기록이 없는 같은 질문(같은 학기, 같은 시간표)이 동시에 들어오면 한 번만 계산해서 나눠 받음
+            key = (normalize_question(query.question), term, tuple(sorted(query.timetable or [])))
+            status, answer, sources = await recommend_flights.do(
+                key, lambda: answer_question(query.question, term, student))
         
-        # 답변 생성
-        response = llm.invoke(formatted_prompt)
-        
-        # sources 정보 생성
-        sources = []
-        for course in similar_courses:
-            try:
-                # JSON 형식의 강의 정보에서 필요한 정보 추출
-                course_info = json.loads(course)
-                metadata = course_info.get("metadata", {})
-                
-                # 강의 정보 추출
-                subject_name = metadata.get("subject_name", "")
-                professor = metadata.get("professor", "")
-                major = metadata.get("major", "")
-                course_type = metadata.get("course_type", "")
-                year = metadata.get("year", "")
-                professor_phone = metadata.get("professor_phone", "")
-                professor_email = metadata.get("professor_email", "")
-                office = metadata.get("office", "")
-                consultation_time = metadata.get("consultation_time", "")
-                classroom = metadata.get("classroom", "")
-                schedule = metadata.get("schedule", "")
-                
-                # 기본 정보가 있는 경우에만 추가
-                if subject_name or professor or major or course_type:
-                    sources.append({
-                        "subject_name": subject_name,
-                        "professor": professor,
-                        "major": f"{major} {year}" if major and year else major,
-                        "course_type": course_type,
-                        "professor_phone": professor_phone,
-                        "professor_email": professor_email,
-                        "office": office,
-                        "consultation_time": consultation_time,
-                        "classroom": classroom,
-                        "schedule": schedule,
-                        "content": course
-                    })
-            except Exception as e:
-                logger.error(f"강의 정보 파싱 중 오류 발생: {str(e)}")
-                continue
-        
+        if status == "ok":
+            conversations.append_exchange(session_id, query.question, answer)
         return {
-            "answer": response.content,
-            "sources": sources
+            "answer": answer,
+            "sources": sources,
+            "session_id": session_id
         }
         
     except Exception as e:
+        status = "error"
         logger.error(f"오류 발생: {str(e)}")
         logger.error(traceback.format_exc())
         raise HTTPException(
             status_code=500,
             detail=f"서버 오류가 발생했습니다: {str(e)}"
         )
+    finally:
+        metrics.RECOMMEND_REQUESTS.inc(status=status)
+        metrics.REQUEST_DURATION.observe(time.perf_counter() - start)
+
+class BatchQuery(BaseModel):
+    questions: List[str]
+    term: Optional[str] = None
+    limit: int = RERANK_TOP_N  # 질문당 추천 강의 수
+    generate: bool = False  # True면 질문마다 LLM 답변 생성 (동시 호출 수 제한)
+
+@app.post("/api/recommend/batch", dependencies=[Depends(admit_recommend)])
+async def recommend_courses_batch(query: BatchQuery):
+    """여러 질문을 한 번에 추천 (질문 임베딩/벡터 검색은 한 번씩만 수행)"""
+    if not query.questions or len(query.questions) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=400, detail=f"질문은 1~{BATCH_MAX_QUESTIONS}개까지 보낼 수 있습니다.")
+    try:
+        term = resolve_term(query.term)
+    except TermNotAvailable as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        results = [None] * len(query.questions)
+        
+        # 주제 없이 평가 비율 등 구조화된 기준만 있는 질문은 특성 표로 바로 순위 계산
+        pending = []
+        intents = {}
+        with span("feature_rank"):
+            for i, question in enumerate(query.questions):
+                intents[i], topic = course_features.parse_feature_query(question)
+                ranked = rank_by_features(intents[i], term, limit=query.limit) if intents[i] and not topic else None
+                if ranked is None:
+                    pending.append(i)
+                    continue
+                answer, ranked_courses = ranked
+                results[i] = {"question": question, "answer": answer, "sources": format_sources(ranked_courses)}
+        metrics.BATCH_QUESTIONS.inc(len(query.questions) - len(pending), path="feature_rank")
+        metrics.BATCH_QUESTIONS.inc(len(pending), path="retrieve")
+        
+        # 나머지 질문은 한 번의 배치 임베딩과 검색으로 처리
+        # (평가 기준이 함께 있는 질문은 재정렬한 후보 전체를 받아 특성 점수를 반영한 뒤 자름)
+        with span("retrieve_batch"):
+            retrieved = await run_in_threadpool(
+                recommend_batch, [query.questions[i] for i in pending], term, max(query.limit, RETRIEVE_CANDIDATES))
+        contexts = {}
+        for i, similar_courses in zip(pending, retrieved):
+            if intents[i]:
+                contexts[i] = rerank_by_features(similar_courses, term, intents[i], query.limit)
+            else:
+                contexts[i] = similar_courses[:query.limit]
+        for i, similar_courses in contexts.items():
+            results[i] = {
+                "question": query.questions[i],
+                "answer": None if similar_courses else "죄송합니다. 관련된 강의를 찾을 수 없습니다.",
+                "sources": format_sources(similar_courses)
+            }
+        
+        if query.generate:
+            targets = [i for i in pending if contexts[i]]
+            prompts = [
+                QA_PROMPT.format(context="\n\n".join(contexts[i]), chat_history="(없음)", question=query.questions[i])
+                for i in targets
+            ]
+            with span("llm_batch"):
+                responses = await generate_bounded(prompts, get_llm().ainvoke)
+            for i, response in zip(targets, responses):
+                if isinstance(response, Exception):
+                    logger.error(f"일괄 추천 답변 생성 중 오류 발생: {str(response)}")
+                    continue
+                results[i]["answer"] = response.content
+                token_usage = getattr(response, "response_metadata", {}).get("token_usage") or {}
+                if token_usage.get("prompt_tokens"):
+                    metrics.PROMPT_TOKENS.inc(token_usage["prompt_tokens"])
+        
+        return {"term": term, "results": results}
+    
+    except Exception as e:
+        logger.error(f"일괄 추천 중 오류 발생: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(
+            status_code=500,
+            detail=f"서버 오류가 발생했습니다: {str(e)}"
+        )
+
+def submit_job(kind, payload, webhook_url):
+    try:
+        job = jobs.submit_job(kind, payload, webhook_url=webhook_url)
+    except jobs.QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except jobs.InvalidWebhook as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job["poll_url"] = f"/api/jobs/{job['job_id']}"
+    return job
+
+@app.post("/api/jobs/recommend", status_code=202, dependencies=[Depends(limit_client_rate)])
+async def submit_recommend_job(query: Query, webhook_url: Optional[str] = None):
+    """추천 작업 등록 (작업 ID를 바로 반환, 결과는 GET /api/jobs/{job_id} 또는 webhook으로 전달)"""
+    return submit_job("recommend", query.model_dump(), webhook_url)
+
+@app.post("/api/jobs/recommend/batch", status_code=202, dependencies=[Depends(limit_client_rate)])
+async def submit_recommend_batch_job(query: BatchQuery, webhook_url: Optional[str] = None):
+    """일괄 추천 작업 등록"""
+    if not query.questions or len(query.questions) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=400, detail=f"질문은 1~{BATCH_MAX_QUESTIONS}개까지 보낼 수 있습니다.")
+    return submit_job("recommend_batch", query.model_dump(), webhook_url)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """작업 상태와 결과 조회 (대기 중이면 앞에 남은 작업 수 포함)"""
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    if job["status"] == jobs.STATUS_QUEUED:
+        job["queue_position"] = jobs.queue_position(job_id)
+    return job
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,8 +1,13 @@
 import streamlit as st
 import requests
 import json
+import time
 from typing import List, Dict
 
+API_BASE_URL = "http://localhost:8001"
+JOB_POLL_INTERVAL = 1  # 작업 결과 확인 간격 (초)
+JOB_WAIT_TIMEOUT = 300  # 작업 결과를 기다리는 최대 시간 (초)
+
 # 페이지 설정
 st.set_page_config(
     page_title="강의 추천 시스템",
@@ -98,28 +103,44 @@ if st.button("추천 받기", type="primary"):
     else:
         with st.spinner("추천 강의를 생성하는 중..."):
             try:
-                # API 요청
-                api_url = "http://localhost:8001/api/recommend"
+                # 추천 작업 등록 (작업 ID를 바로 받고, 결과는 주기적으로 조회)
+                api_url = f"{API_BASE_URL}/api/jobs/recommend"
                 st.info(f"API 서버에 요청 중... ({api_url})")
                 
                 response = requests.post(
                     api_url,
-                    json={"question": query, "chat_history": []},
-                    timeout=30  # 타임아웃 설정
+                    json={"question": query, "session_id": st.session_state.get("session_id")},
+                    timeout=10
                 )
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # 답변 표시
-                    st.markdown("### 💬 추천 결과")
-                    st.write(data["answer"])
-                    
-                    # 추천 강의 표시
-                    st.markdown("### 📚 추천 강의")
-                    for course in data["sources"]:
-                        with st.container():
-                            display_course_info(course)
+                if response.status_code == 202:
+                    job_url = f"{API_BASE_URL}{response.json()['poll_url']}"
+                    deadline = time.monotonic() + JOB_WAIT_TIMEOUT
+                    while True:
+                        job = requests.get(job_url, timeout=10).json()
+                        if job["status"] in ("done", "failed"):
+                            break
+                        if time.monotonic() > deadline:
+                            raise requests.exceptions.Timeout()
+                        time.sleep(JOB_POLL_INTERVAL)
+                    if job["status"] == "failed":
+                        st.error(f"추천 작업 실패: {job.get('error')}")
+                    else:
+                        data = job["result"]
+                        # 이어지는 질문에서 같은 대화 세션 사용
+                        st.session_state["session_id"] = data.get("session_id")
+                        
+                        # 답변 표시
+                        st.markdown("### 💬 추천 결과")
+                        st.write(data["answer"])
+                        
+                        # 추천 강의 표시
+                        st.markdown("### 📚 추천 강의")
+                        for course in data["sources"]:
+                            with st.container():
+                                display_course_info(course)
+                elif response.status_code == 503:
+                    st.warning("요청이 많아 잠시 후 다시 시도해주세요.")
                 else:
                     st.error(f"API 요청 실패 (상태 코드: {response.status_code})")
                     st.error(f"오류 메시지: {response.text}")
@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tiktoken  # noqa: E402
+from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from chunking import chunk_course, DEFAULT_MAX_CHARS  # noqa: E402
+from data_processor import engine, init_db, Course, LEGACY_TERM  # noqa: E402
+
+# 청크 분할 비교 (기존 f-string 템플릿 + RecursiveCharacterTextSplitter vs 섹션 기반 청크)
+# 사용 예: python benchmarks/bench_chunking.py
+#         python benchmarks/bench_chunking.py --term 2025-U211600010 --max-chars 800 --show 2
+
+
+def legacy_document_text(course):
+    """기존 vector_store.get_course_documents의 문서 텍스트 (비교 기준)"""
+    basic_info = json.loads(course.syllabus.basic_info)
+    professor_info = json.loads(course.syllabus.professor_info)
+    course_info = json.loads(course.syllabus.course_info)
+    evaluation = json.loads(course.syllabus.evaluation)
+    textbook_info = json.loads(course.syllabus.textbook_info)
+    core_competencies = json.loads(course.syllabus.core_competencies)
+
+    # 텍스트 생성 (JSON 구조 반영)
+    text = f"""
+    강의 기본 정보:
+    - 교과목명: {course.subject_name}
+    - 담당교수: {course.professor}
+    - 이수구분: {course.course_type}
+    - 학과/학년: {course.major} {course.year}
+    - 분반: {course.class_number}
+    - 학기: {course.semester}
+
+    기본 정보:
+    - 이메일: {basic_info.get('email', '')}
+    - 연락처: {basic_info.get('phone', '')}
+    - 수업목표: {basic_info.get('course_objective', '')}
+
+    교수 정보:
+    - 연구실: {professor_info.get('office', '')}
+    - 상담가능시간: {professor_info.get('consultation_time', '')}
+
+    강의 정보:
+    - 강의실: {course_info.get('classroom', '')}
+    - 요일/시간: {course_info.get('schedule', '')}
+
+    평가 방법:
+    - A 비율: {evaluation.get('a_ratio', '')}
+    - 평가방법: {evaluation.get('evaluation_method', '')}
+    - 중간고사: {evaluation.get('midterm', '')}
+    - 기말고사: {evaluation.get('final', '')}
+    - 출석: {evaluation.get('attendance', '')}
+    - 과제: {evaluation.get('assignment', '')}
+    - 기타: {evaluation.get('other', '')}
+
+    교재 정보:
+    - 주교재: {textbook_info.get('main_textbook', '')}
+    - 참고자료: {textbook_info.get('reference', '')}
+
+    핵심역량:
+    - 소통역량: {core_competencies.get('communication', '')}
+    - 창의역량: {core_competencies.get('creativity', '')}
+    - 인성역량: {core_competencies.get('personality', '')}
+    - 실무역량: {core_competencies.get('practical', '')}
+    - 도전역량: {core_competencies.get('challenge', '')}
+    """
+    return text
+
+
+def legacy_chunks(course, text_splitter):
+    text = legacy_document_text(course)
+    if not text.strip():
+        return []
+    return text_splitter.split_text(text)
+
+
+def summarize(name, chunks_per_course, encoding):
+    chunks = [chunk for chunks in chunks_per_course for chunk in chunks]
+    tokens = [len(encoding.encode(chunk)) for chunk in chunks]
+    whitespace = sum(sum(1 for ch in chunk if ch.isspace()) for chunk in chunks)
+    chars = sum(len(chunk) for chunk in chunks)
+    return {
+        "name": name,
+        "chunks": len(chunks),
+        "tokens": sum(tokens),
+        "avg_tokens": statistics.mean(tokens) if tokens else 0,
+        "chars": chars,
+        "whitespace": whitespace / chars if chars else 0,
+        "per_course": len(chunks) / len(chunks_per_course) if chunks_per_course else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청크 분할 벤치마크")
+    parser.add_argument("--term", default=LEGACY_TERM, help="측정할 학기")
+    parser.add_argument("--max-chars", type=int, default=DEFAULT_MAX_CHARS, help="섹션 기반 청크 최대 길이")
+    parser.add_argument("--show", type=int, default=0, help="처음 N개 강의의 청크를 출력")
+    args = parser.parse_args()
+
+    init_db()
+    encoding = tiktoken.get_encoding("cl100k_base")  # text-embedding-ada-002 토크나이저
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=500,
+        chunk_overlap=100,
+        length_function=len,
+        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
+    )
+
+    session = sessionmaker(bind=engine)()
+    try:
+        courses = session.query(Course).filter(Course.term == args.term).all()
+        before = [legacy_chunks(course, text_splitter) for course in courses]
+        after = [chunk_course(course, max_chars=args.max_chars) for course in courses]
+    finally:
+        session.close()
+
+    print(f"학기: {args.term}, 강의 {len(courses)}개")
+    print(f"{'방식':<20}{'청크 수':>10}{'강의당':>8}{'임베딩 토큰':>14}{'청크당 토큰':>12}{'공백 비율':>10}")
+    results = [summarize("기존 (500/100)", before, encoding), summarize(f"섹션 기반 ({args.max_chars})", after, encoding)]
+    for r in results:
+        print(f"{r['name']:<20}{r['chunks']:>10}{r['per_course']:>8.2f}{r['tokens']:>14}"
+              f"{r['avg_tokens']:>12.1f}{r['whitespace'] * 100:>9.1f}%")
+    old, new = results
+    if old["chunks"] and old["tokens"]:
+        print(f"청크 수 {(1 - new['chunks'] / old['chunks']) * 100:.1f}% 감소, "
+              f"임베딩 토큰 {(1 - new['tokens'] / old['tokens']) * 100:.1f}% 감소")
+
+    for course, old_chunks, new_chunks in list(zip(courses, before, after))[:args.show]:
+        print("\n" + "=" * 80)
+        print(f"course_id={course.id}: 기존 {len(old_chunks)}개 → {len(new_chunks)}개")
+        for chunk in new_chunks:
+            print("-" * 80)
+            print(chunk)
+
+
+if __name__ == "__main__":
+    main()
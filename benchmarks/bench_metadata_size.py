@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 임베딩은 FakeEmbeddings로 대신하므로 실제 API 키가 필요 없음
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from langchain_community.embeddings import FakeEmbeddings  # noqa: E402
+from langchain_community.vectorstores import Chroma  # noqa: E402
+from data_processor import init_db  # noqa: E402
+from terms import get_current_term  # noqa: E402
+from vector_store import get_course_documents, split_documents  # noqa: E402
+
+# 청크 메타데이터 크기 비교 (강의 전체 메타데이터 복제 vs course_id/chunk_index만 저장)
+# 사용 예: python benchmarks/bench_metadata_size.py
+#         python benchmarks/bench_metadata_size.py --term 2025-U211600010 --chroma
+
+
+def json_size(value):
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def build_store(texts, metadatas, k, queries=20):
+    """임시 Chroma에 적재 후 (디스크 크기, 검색 결과 k개의 평균 메타데이터 크기, 평균 검색 시간) 반환"""
+    directory = tempfile.mkdtemp(prefix="bench_chroma_")
+    try:
+        embedding = FakeEmbeddings(size=1536)
+        store = Chroma.from_texts(texts=texts, embedding=embedding, metadatas=metadatas, persist_directory=directory)
+        size = dir_size(directory)
+        payload = 0
+        start = time.perf_counter()
+        for i in range(queries):
+            results = store.similarity_search_by_vector_with_relevance_scores(embedding.embed_query(str(i)), k=k)
+            payload += sum(json_size(doc.metadata) for doc, _ in results)
+        elapsed = (time.perf_counter() - start) / queries
+        store.delete_collection()
+        return size, payload / queries, elapsed
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청크 메타데이터 크기 벤치마크")
+    parser.add_argument("--term", default=None, help="측정할 학기 (생략 시 기본 학기)")
+    parser.add_argument("--chroma", action="store_true", help="임시 Chroma에 실제로 적재하여 디스크 크기도 비교")
+    parser.add_argument("--k", type=int, default=20, help="검색 결과 수 (검색 응답 크기 비교용)")
+    args = parser.parse_args()
+
+    init_db()
+    term = args.term or get_current_term()
+    documents = get_course_documents(term)
+    texts, compact = split_documents(documents)
+    full_by_course = {doc["metadata"]["course_id"]: doc["metadata"] for doc in documents}
+    full = [full_by_course[metadata["course_id"]] for metadata in compact]
+
+    full_bytes = sum(json_size(metadata) for metadata in full)
+    compact_bytes = sum(json_size(metadata) for metadata in compact)
+    text_bytes = sum(len(text.encode("utf-8")) for text in texts)
+    catalog_bytes = sum(json_size(metadata) for metadata in full_by_course.values())
+
+    print(f"학기: {term}, 강의 {len(documents)}개, 청크 {len(texts)}개 (청크 텍스트 {text_bytes / 1024:.1f} KiB)")
+    print(f"{'':<24}{'전체 복제':>14}{'course_id만':>14}{'감소율':>10}")
+    print(f"{'청크 메타데이터 합계':<24}{full_bytes / 1024:>12.1f}KiB{compact_bytes / 1024:>12.1f}KiB"
+          f"{(1 - compact_bytes / full_bytes) * 100:>9.1f}%")
+    print(f"{'청크당 평균':<24}{full_bytes / len(texts):>13.0f}B{compact_bytes / len(texts):>13.0f}B")
+    print(f"강의 목록(메모리) 크기: {catalog_bytes / 1024:.1f} KiB (강의당 1회)")
+
+    if args.chroma:
+        full_disk, full_payload, full_time = build_store(texts, full, args.k)
+        compact_disk, compact_payload, compact_time = build_store(texts, compact, args.k)
+        print(f"\nChroma 디스크 크기: {full_disk / 1024 / 1024:.1f} MiB → {compact_disk / 1024 / 1024:.1f} MiB "
+              f"({(1 - compact_disk / full_disk) * 100:.1f}% 감소)")
+        print(f"검색 응답 메타데이터 (k={args.k}): {full_payload / 1024:.1f} KiB → {compact_payload / 1024:.1f} KiB")
+        print(f"평균 검색 시간: {full_time * 1000:.1f} ms → {compact_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
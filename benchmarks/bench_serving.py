@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from bench_startup import ROOT, child_env, free_port, wait_for
+
+# serve.py 작업 프로세스 수에 따른 처리량 비교
+# 작업 프로세스 수마다 서버를 새로 띄워 같은 요청을 동시에 보내고 초당 처리 수, 지연 시간,
+# 작업 프로세스별 메모리(RSS와 공유분을 나눠 계산한 PSS)를 출력한다.
+# 기본 요청은 LLM/임베딩 호출이 없는 특성 표 경로라서 API 키 없이 측정할 수 있다.
+# 수락 제어에 거절된 요청(429 요청 제한, 503 대기열 초과)은 다른 실패와 나눠 센다.
+# 사용 예: python benchmarks/bench_serving.py
+#         python benchmarks/bench_serving.py --workers 1 2 4 8 --concurrency 32 --duration 20
+
+DEFAULT_BODY = {"question": "과제 비중 낮고 A 비율 높은 수업 추천해줘"}
+
+
+def load_test(url, body, concurrency, duration):
+    """duration초 동안 concurrency개 스레드가 요청을 반복해서 (성공 수, 실패 수, 지연 시간 목록) 반환
+
+    실패 수는 {429: 개수, 503: 개수, "기타": 개수} (그 밖의 상태 코드와 연결 오류는 "기타")
+    """
+    latencies = []
+    failures = {429: 0, 503: 0, "기타": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def run():
+        session = requests.Session()
+        session.trust_env = False
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = session.post(url, json=body, timeout=30).status_code
+            except requests.RequestException:
+                status = None
+            elapsed = time.perf_counter() - start
+            with lock:
+                if status == 200:
+                    latencies.append(elapsed)
+                else:
+                    failures[status if status in failures else "기타"] += 1
+
+    threads = [threading.Thread(target=run) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), failures, latencies
+
+
+def worker_pids(master_pid):
+    try:
+        with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+            return [int(pid) for pid in f.read().split()]
+    except OSError:
+        return []
+
+
+def memory_kib(pid):
+    """(RSS, PSS) KiB. /proc/<pid>/smaps_rollup이 없는 환경이면 None"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            values = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(values["Rss"].split()[0]), int(values["Pss"].split()[0])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def measure(workers, args, body):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = child_env()
+    # 동시 요청이 모두 대기열에 들어갈 수 있도록 (작업 프로세스 하나에 몰려도 503이 나지 않게)
+    env["ADMISSION_MAX_QUEUE"] = str(max(int(env.get("ADMISSION_MAX_QUEUE", "32")), args.concurrency))
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "serve.py"), "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--job-workers", "0", "--watch-interval", "0"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if wait_for(f"{base}/healthz", time.perf_counter() + args.timeout) is None:
+            raise RuntimeError(f"서버가 응답하지 않습니다 (작업 프로세스 {workers}개)")
+        # 모든 작업 프로세스가 미리 로드를 마치도록 잠시 요청을 보낸 뒤 측정
+        load_test(f"{base}{args.path}", body, args.concurrency, args.warmup)
+        ok, failed, latencies = load_test(f"{base}{args.path}", body, args.concurrency, args.duration)
+        memory = [memory_kib(pid) for pid in worker_pids(server.pid)]
+        return ok, failed, latencies, [m for m in memory if m is not None]
+    finally:
+        server.terminate()
+        server.wait(30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="작업 프로세스 수별 API 처리량 벤치마크")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="비교할 작업 프로세스 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 요청 수")
+    parser.add_argument("--duration", type=float, default=10, help="측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=3, help="측정 전 요청 시간 (초)")
+    parser.add_argument("--path", default="/api/recommend", help="요청 경로 (POST)")
+    parser.add_argument("--body", default=None, help="요청 본문 JSON (생략 시 특성 표 경로 질문)")
+    parser.add_argument("--timeout", type=float, default=120, help="서버 시작 대기 시간 (초)")
+    args = parser.parse_args()
+    body = json.loads(args.body) if args.body else DEFAULT_BODY
+
+    print(f"{'작업 프로세스':>12}{'요청/초':>10}{'배율':>8}{'p50 ms':>10}{'p95 ms':>10}{'429':>6}{'503':>6}{'기타 실패':>10}"
+          f"{'RSS MiB':>10}{'PSS MiB':>10}")
+    baseline = None
+    for workers in args.workers:
+        ok, failed, latencies, memory = measure(workers, args, body)
+        throughput = ok / args.duration
+        baseline = baseline or throughput
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000 if latencies else 0.0
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0
+        rss = statistics.mean(m[0] for m in memory) / 1024 if memory else 0.0
+        pss = statistics.mean(m[1] for m in memory) / 1024 if memory else 0.0
+        print(f"{workers:>12}{throughput:>10.1f}{throughput / baseline:>7.2f}x{p50:>10.1f}{p95:>10.1f}{failed[429]:>6}{failed[503]:>6}{failed['기타']:>10}"
+              f"{rss:>10.1f}{pss:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
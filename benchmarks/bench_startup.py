@@ -0,0 +1,149 @@
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# API 서버 시작 시간 측정
+# - import: 새 프로세스에서 `import api`에 걸리는 시간 (무거운 모듈 import 여부 포함)
+# - 콜드 스타트: uvicorn 실행부터 /healthz 응답(포트 열림)과 /readyz 200(미리 로드 완료)까지 걸린 시간
+# 사용 예: python benchmarks/bench_startup.py
+#         python benchmarks/bench_startup.py --runs 5 --skip-server --top 15
+
+# import 시점에 읽으면 안 되는 무거운 패키지 (LLM/임베딩 클라이언트, VectorDB)
+HEAVY_MODULES = ["chromadb", "openai", "langchain_openai", "langchain.chains"]
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import api
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(f"{{elapsed}} {{','.join(heavy)}}")
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "unused")
+    # 작업 프로세스는 시작 시간 측정에서 제외
+    env.setdefault("JOB_WORKERS", "0")
+    # 벤치마크는 한 클라이언트(IP)에서 요청을 몰아 보내므로 클라이언트별 요청 제한은 끔
+    env.setdefault("RATE_LIMIT_PER_MINUTE", "0")
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def measure_import():
+    """새 프로세스에서 import api 시간과 import된 무거운 패키지 목록"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(heavy=HEAVY_MODULES)],
+        env=child_env(), capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    elapsed, _, heavy = output.partition(" ")
+    return float(elapsed), [name for name in heavy.split(",") if name]
+
+
+def slowest_imports(top):
+    """python -X importtime 결과에서 누적 시간이 긴 모듈"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api"],
+        env=child_env(), capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url, deadline, status=200):
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == status:
+                return time.perf_counter()
+        except requests.RequestException:
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def measure_cold_start(timeout):
+    """uvicorn 실행부터 (/healthz 응답, /readyz 200)까지 걸린 시간 (초)"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port)],
+        env=child_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = start + timeout
+        live = wait_for(f"{base}/healthz", deadline)
+        ready = wait_for(f"{base}/readyz", deadline) if live else None
+        return (
+            live - start if live else None,
+            ready - start if ready else None,
+            requests.get(f"{base}/readyz", timeout=1).json() if ready else None,
+        )
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 서버 import/콜드 스타트 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=3, help="반복 횟수 (중앙값 출력)")
+    parser.add_argument("--top", type=int, default=10, help="누적 import 시간이 긴 모듈 출력 개수 (0이면 생략)")
+    parser.add_argument("--skip-server", action="store_true", help="uvicorn 콜드 스타트 측정 생략")
+    parser.add_argument("--timeout", type=float, default=120, help="서버 준비 대기 시간 (초)")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    heavy = sorted({name for _, names in imports for name in names})
+    print(f"import api: {statistics.median(elapsed for elapsed, _ in imports) * 1000:.0f} ms (중앙값, {args.runs}회)")
+    print(f"import 시점에 읽힌 무거운 패키지: {', '.join(heavy) if heavy else '없음'}")
+
+    if args.top:
+        print(f"\n누적 import 시간 상위 {args.top}개")
+        for cumulative, name in slowest_imports(args.top):
+            print(f"{cumulative / 1000:>10.1f} ms  {name}")
+
+    if args.skip_server:
+        return
+    lives, readies = [], []
+    components = None
+    for _ in range(args.runs):
+        live, ready, body = measure_cold_start(args.timeout)
+        if live is None:
+            print("서버가 응답하지 않습니다 (--timeout 확인)")
+            return
+        lives.append(live)
+        if ready is not None:
+            readies.append(ready)
+            components = body.get("components")
+    print(f"\n콜드 스타트: /healthz {statistics.median(lives) * 1000:.0f} ms", end="")
+    if readies:
+        print(f", /readyz {statistics.median(readies) * 1000:.0f} ms (중앙값, {args.runs}회)")
+        print(f"미리 로드 구성 요소별 시간 (초): {components}")
+    else:
+        print(f", /readyz 준비 안 됨 ({args.timeout:.0f}초 초과)")
+
+
+if __name__ == "__main__":
+    main()
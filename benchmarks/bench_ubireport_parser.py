@@ -0,0 +1,205 @@
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ubireport_parser import parse_report  # noqa: E402
+
+# UbiReport 1단계 응답 파서 벤치마크 (기존 DOM 파서 vs 스트리밍 파서)
+# 사용 예: python benchmarks/bench_ubireport_parser.py ~/Downloads/syllabi
+#         python benchmarks/bench_ubireport_parser.py --synthetic 500 --rows 80
+
+
+def legacy_parse(content):
+    """기존 test_2.parse_bin_file 구현 (비교 기준)"""
+    try:
+        root = ET.fromstring(content)
+
+        syllabus_data = {
+            "기본정보": {},
+            "평가방법": {},
+            "핵심역량": {}
+        }
+        current_section = "기본정보"
+
+        items = []
+        for item in root.findall('.//Item'):
+            if 'classname' in item.attrib and item.attrib['classname'] == 'UbiTextItem':
+                text_elem = item.find('.//Text')
+                if text_elem is not None and text_elem.text:
+                    text = text_elem.text.strip()
+                    x = int(item.attrib.get('x', 0))
+                    y = int(item.attrib.get('y', 0))
+                    items.append((y, x, text))
+
+        row_dict = defaultdict(list)
+        y_threshold = 3
+        sorted_items = sorted(items)
+        prev_y = None
+        group_y = None
+        for y, x, text in sorted_items:
+            if prev_y is None or abs(y - prev_y) > y_threshold:
+                group_y = y
+            row_dict[group_y].append((x, text))
+            prev_y = y
+
+        rows_by_y = [sorted(row) for row in row_dict.values()]
+        section_rows = []
+        for row in rows_by_y:
+            texts = [text for x, text in row]
+            section_rows.append(texts)
+
+        def is_percent(val):
+            return bool(re.match(r'^[0-9]+%$', val.strip()))
+        def is_all_percent(row):
+            return all(is_percent(cell) for cell in row if cell.strip())
+        def is_all_korean(row):
+            return all(re.match(r'^[가-힣/()]+$', cell.strip()) for cell in row if cell.strip())
+
+        i = 0
+        prev_row = None
+        while i < len(section_rows):
+            row = section_rows[i]
+            if any(s in row for s in ["교수정보", "강의정보", "평가방법", "교재정보", "핵심역량"]):
+                for s in ["교수정보", "강의정보", "평가방법", "교재정보", "핵심역량"]:
+                    if s in row:
+                        current_section = s
+                        break
+                # 스트리밍 파서와 같이 교수정보/강의정보/교재정보 섹션을 처음 나올 때 만듦
+                # (원래 구현은 여기서 KeyError로 실패해 결과를 비교할 수 없음)
+                syllabus_data.setdefault(current_section, {})
+                if current_section == "평가방법":
+                    for j in range(0, len(row)-1, 2):
+                        key = row[j]
+                        value = row[j+1]
+                        if key != "평가방법":
+                            syllabus_data[current_section][key] = value
+                    i += 1
+                    prev_row = row
+                    continue
+            if current_section == "기본정보":
+                if any("평가계획" in cell for cell in row):
+                    if i+1 < len(section_rows) and is_all_korean(row) and is_all_percent(section_rows[i+1]):
+                        keys = row
+                        values = section_rows[i+1]
+                        min_len = min(len(keys), len(values))
+                        for k, v in zip(keys[:min_len], values[:min_len]):
+                            if "평가계획" not in k:
+                                syllabus_data["평가방법"][k] = v
+                        i += 2
+                        prev_row = row
+                        continue
+                    elif any(is_percent(cell) for cell in row) and any(re.match(r'^[가-힣/()]+$', cell.strip()) for cell in row):
+                        for j in range(0, len(row)-1, 2):
+                            k, v = row[j], row[j+1]
+                            if is_percent(v):
+                                syllabus_data["평가방법"][k] = v
+                        i += 1
+                        prev_row = row
+                        continue
+                    elif is_all_percent(row) and prev_row and is_all_korean(prev_row):
+                        keys = prev_row
+                        values = row
+                        min_len = min(len(keys), len(values))
+                        for k, v in zip(keys[:min_len], values[:min_len]):
+                            if "평가계획" not in k:
+                                syllabus_data["평가방법"][k] = v
+                        i += 1
+                        prev_row = row
+                        continue
+            j = 0
+            while j + 1 < len(row):
+                key = row[j]
+                value = row[j+1]
+                if key not in ["교수정보", "강의정보", "평가방법", "교재정보", "핵심역량"] and not (current_section == "기본정보" and "평가계획" in key):
+                    syllabus_data[current_section][key] = value
+                j += 2
+            prev_row = row
+            i += 1
+
+        for row in rows_by_y:
+            row = sorted(row)
+            if len(row) > 3 and '평가계획' in row[0][1]:
+                for j in range(1, len(row)-1, 2):
+                    key = row[j][1]
+                    value = row[j+1][1]
+                    syllabus_data['평가방법'][key] = value
+            elif len(row) > 1 and '평가참고사항' in row[0][1]:
+                syllabus_data['평가방법']['평가참고사항'] = row[1][1]
+
+        return syllabus_data
+    except Exception:
+        return None
+
+
+def load_corpus(args):
+    if args.synthetic:
+        from mock_oasis import build_report_xml
+        return [build_report_xml(f"모의강의 {i}", rows_per_section=args.rows) for i in range(args.synthetic)]
+    paths = sorted(glob.glob(os.path.join(args.corpus_dir, "syllabus_step1_*.bin")))
+    corpus = []
+    for path in paths:
+        with open(path, "rb") as f:
+            corpus.append(f.read())
+    return corpus
+
+
+def measure(name, parser, corpus, repeat):
+    # 처리량 (tracemalloc 없이 측정)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content in corpus:
+            parser(content)
+    elapsed = time.perf_counter() - start
+
+    # 문서별 최대 메모리 사용량
+    peak = 0
+    tracemalloc.start()
+    for content in corpus:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        parser(content)
+        _, doc_peak = tracemalloc.get_traced_memory()
+        peak = max(peak, doc_peak - base)
+    tracemalloc.stop()
+
+    n_docs = len(corpus) * repeat
+    n_bytes = sum(len(c) for c in corpus) * repeat
+    print(f"{name:<12} {n_docs / elapsed:>10.1f} docs/s {n_bytes / elapsed / 1e6:>8.2f} MB/s "
+          f"{elapsed * 1000 / n_docs:>8.3f} ms/doc  peak {peak / 1024:>9.1f} KiB")
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UbiReport 파서 벤치마크")
+    parser.add_argument("corpus_dir", nargs="?", help="syllabus_step1_*.bin 파일이 있는 폴더 (SYLLABUS_DEBUG=1 크롤링 결과)")
+    parser.add_argument("--synthetic", type=int, default=0, help="저장된 응답 대신 합성 문서 N개 사용")
+    parser.add_argument("--rows", type=int, default=40, help="합성 문서의 기본정보 행 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not args.synthetic and not args.corpus_dir:
+        parser.error("corpus_dir 또는 --synthetic 중 하나를 지정하세요.")
+
+    corpus = load_corpus(args)
+    if not corpus:
+        print("벤치마크할 문서가 없습니다.")
+        return
+
+    mismatches = sum(1 for content in corpus if legacy_parse(content) != parse_report(content))
+    print(f"문서 {len(corpus)}개, 총 {sum(len(c) for c in corpus) / 1e6:.2f} MB, 결과 불일치 {mismatches}건")
+
+    legacy_time, legacy_peak = measure("legacy DOM", legacy_parse, corpus, args.repeat)
+    stream_time, stream_peak = measure("streaming", parse_report, corpus, args.repeat)
+    print(f"속도 {legacy_time / stream_time:.2f}배, 최대 메모리 {stream_peak / legacy_peak * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
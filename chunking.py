@@ -0,0 +1,151 @@
+import json
+import re
+
+# 강의계획서 구조 기반 청크 분할
+# 섹션(기본 정보, 수업목표, 교수/강의 정보, 평가 방법, 교재, 핵심역량)별로 값이 있는 필드만 모아
+# 한 줄짜리 "항목: 값" 목록으로 만들고, 섹션을 나누지 않는 선에서 max_chars까지 한 청크에 담는다.
+
+# 청크 최대 길이 (문자 수). 섹션 하나가 이보다 길면 문장 단위로 나눔
+DEFAULT_MAX_CHARS = 600
+
+# 크롤링 시 값 대신 표의 항목명이 들어간 경우 (빈 값으로 취급)
+PLACEHOLDER_VALUES = {
+    "", "-", "%", ".", "None", "교과목명", "담당교수", "이수구분", "학과/학년", "연락처", "이메일", "연구실",
+    "상담가능시간", "강의실", "요일/시간", "수업목표", "저자", "출판사", "출판년도", "평가참고사항",
+    "기타", "대표역량", "1. 강의 기본정보", "기본정보", "평가방법", "핵심역량",
+}
+
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?。])\s+|\n+')
+
+
+def is_meaningful(value):
+    """빈 값이나 항목명만 들어간 값이 아닌지 확인"""
+    if value is None:
+        return False
+    value = str(value).strip()
+    return value not in PLACEHOLDER_VALUES
+
+
+def course_sections(course):
+    """강의계획서를 (섹션명, [(항목명, 값)]) 목록으로 변환 (값이 없는 필드와 섹션은 제외)"""
+    basic_info = json.loads(course.syllabus.basic_info)
+    professor_info = json.loads(course.syllabus.professor_info)
+    course_info = json.loads(course.syllabus.course_info)
+    evaluation = json.loads(course.syllabus.evaluation)
+    textbook_info = json.loads(course.syllabus.textbook_info)
+    core_competencies = json.loads(course.syllabus.core_competencies)
+
+    major_year = " ".join(part for part in (course.major, course.year) if is_meaningful(part))
+    sections = [
+        ("강의 기본 정보", [
+            ("교과목명", course.subject_name),
+            ("담당교수", course.professor),
+            ("이수구분", course.course_type),
+            ("학과/학년", major_year),
+            ("분반", course.class_number),
+            ("학기", course.semester),
+        ]),
+        ("수업목표", [
+            ("수업목표", basic_info.get('course_objective', '')),
+        ]),
+        ("교수/강의 정보", [
+            ("이메일", basic_info.get('email', '')),
+            ("연락처", basic_info.get('phone', '')),
+            ("연구실", professor_info.get('office', '')),
+            ("상담가능시간", professor_info.get('consultation_time', '')),
+            ("강의실", course_info.get('classroom', '')),
+            ("요일/시간", course_info.get('schedule', '')),
+        ]),
+        ("평가 방법", [
+            ("A 비율", evaluation.get('a_ratio', '')),
+            ("평가방법", evaluation.get('evaluation_method', '')),
+            ("중간고사", evaluation.get('midterm', '')),
+            ("기말고사", evaluation.get('final', '')),
+            ("출석", evaluation.get('attendance', '')),
+            ("과제", evaluation.get('assignment', '')),
+            ("기타", evaluation.get('other', '')),
+        ]),
+        ("교재 정보", [
+            ("주교재", textbook_info.get('main_textbook', '')),
+            ("참고자료", textbook_info.get('reference', '')),
+        ]),
+        ("핵심역량", [
+            ("소통역량", core_competencies.get('communication', '')),
+            ("창의역량", core_competencies.get('creativity', '')),
+            ("인성역량", core_competencies.get('personality', '')),
+            ("실무역량", core_competencies.get('practical', '')),
+            ("도전역량", core_competencies.get('challenge', '')),
+        ]),
+    ]
+    result = []
+    for name, fields in sections:
+        fields = [(label, str(value).strip()) for label, value in fields if is_meaningful(value)]
+        if fields:
+            result.append((name, fields))
+    return result
+
+
+def _format_section(name, fields):
+    if len(fields) == 1 and fields[0][0] == name:
+        return f"[{name}] {fields[0][1]}"
+    return f"[{name}] " + " / ".join(f"{label}: {value}" for label, value in fields)
+
+
+def _split_long(text, max_chars):
+    """max_chars보다 긴 텍스트를 문장 경계에서 나눔 (겹침 없음)"""
+    pieces = []
+    current = ""
+    for sentence in _SENTENCE_END_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_course(course, max_chars=DEFAULT_MAX_CHARS):
+    """강의 한 건을 임베딩용 청크 목록으로 변환
+
+    각 청크 앞에는 교과목명/담당교수를 붙여 섹션만으로도 어떤 강의인지 알 수 있게 한다.
+    """
+    sections = course_sections(course)
+    if not sections:
+        return []
+
+    header_parts = [value for value in (course.subject_name, course.professor) if is_meaningful(value)]
+    header = f"{' - '.join(header_parts)}\n" if header_parts else ""
+    budget = max(1, max_chars - len(header))
+
+    blocks = []
+    for name, fields in sections:
+        block = _format_section(name, fields)
+        if len(block) <= budget:
+            blocks.append(block)
+        else:
+            blocks.extend(_split_long(block, budget))
+
+    chunks = []
+    current = []
+    current_len = 0
+    for block in blocks:
+        if current and current_len + 1 + len(block) > budget:
+            chunks.append(header + "\n".join(current))
+            current = []
+            current_len = 0
+        current.append(block)
+        current_len += len(block) + (1 if current_len else 0)
+    if current:
+        chunks.append(header + "\n".join(current))
+    return chunks
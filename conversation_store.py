@@ -0,0 +1,274 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import create_engine, Column, String, Text, DateTime
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+# 세션별 대화 기록 (여러 사용자의 이어지는 질문용)
+# 최근에 쓴 세션을 메모리(LRU)에 두고 CONVERSATION_DATABASE_URL(기본 SQLite)에도 저장한다. 추천 요청은
+# 비동기 작업 프로세스나 여러 API 작업 프로세스 중 아무 곳에서나 처리되므로, 저장소가 있으면 세션을 읽을
+# 때마다 저장소의 최신 기록을 사용한다. 메모리에서 밀려난 세션이나 서버 재시작 후에도 이어서 대화할 수 있다.
+# 세션마다 토큰 상한을 넘으면 오래된 대화부터 한 줄 요약으로 접고, 요약도 상한을 넘으면 앞부분을 자른다.
+
+# 메모리에 둘 최대 세션 수
+SESSION_MAX = int(os.getenv("CONVERSATION_MAX_SESSIONS", "1000"))
+
+# 세션당 대화 기록 토큰 상한 (프롬프트에 넣는 양)
+SESSION_MAX_TOKENS = int(os.getenv("CONVERSATION_MAX_TOKENS", "1500"))
+
+# 오래된 대화를 접은 요약의 토큰 상한
+SUMMARY_MAX_TOKENS = 300
+
+# 마지막 사용 후 세션을 유지하는 시간 (초)
+SESSION_TTL = float(os.getenv("CONVERSATION_TTL", str(24 * 3600)))
+
+# 저장할 답변 최대 길이 (문자 수). 추천 답변은 길어서 앞부분만 남김
+ANSWER_KEEP_CHARS = 500
+
+# 빈 값으로 지정하면 메모리에만 저장 (프로세스 하나로만 실행할 때)
+CONVERSATION_DATABASE_URL = os.getenv("CONVERSATION_DATABASE_URL", "sqlite:///conversations.db")
+
+ROLE_USER = "user"
+ROLE_ASSISTANT = "assistant"
+
+_FIRST_SENTENCE_RE = re.compile(r'^(.+?[.!?。\n])')
+
+Base = declarative_base()
+
+
+class ConversationSession(Base):
+    __tablename__ = "conversation_session"
+
+    session_id = Column(String(64), primary_key=True)
+    summary = Column(Text, default="")
+    turns = Column(Text, default="[]")  # [{"role": ..., "content": ...}]
+    updated_at = Column(DateTime, default=datetime.now)
+
+
+def estimate_tokens(text):
+    """토큰 수 추정 (UTF-8 3바이트당 1토큰: 한글은 글자당 1토큰, 영문은 약 3글자당 1토큰)"""
+    return math.ceil(len(str(text or "").encode("utf-8")) / 3)
+
+
+def _first_sentence(text, max_chars=80):
+    text = str(text or "").strip()
+    match = _FIRST_SENTENCE_RE.match(text)
+    sentence = (match.group(1) if match else text).strip()
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars] + "…"
+
+
+def summarize_turns(turns):
+    """접을 대화를 한 줄 요약으로 (LLM 호출 없이 질문과 답변 첫 문장만 남김)"""
+    parts = []
+    for turn in turns:
+        prefix = "질문" if turn["role"] == ROLE_USER else "답변"
+        parts.append(f"{prefix}: {_first_sentence(turn['content'])}")
+    return " / ".join(parts)
+
+
+def normalize_history(chat_history):
+    """클라이언트가 보낸 chat_history를 [{"role", "content"}] 형식으로 변환
+
+    [{"role": ..., "content": ...}], [[질문, 답변], ...], ["질문", "답변", ...] 형식을 받는다.
+    """
+    turns = []
+    for i, item in enumerate(chat_history or []):
+        if isinstance(item, dict) and item.get("content"):
+            role = ROLE_ASSISTANT if item.get("role") in (ROLE_ASSISTANT, "ai", "bot") else ROLE_USER
+            turns.append({"role": role, "content": str(item["content"])})
+        elif isinstance(item, (list, tuple)) and len(item) == 2:
+            turns.append({"role": ROLE_USER, "content": str(item[0])})
+            turns.append({"role": ROLE_ASSISTANT, "content": str(item[1])})
+        elif isinstance(item, str) and item:
+            turns.append({"role": ROLE_USER if i % 2 == 0 else ROLE_ASSISTANT, "content": item})
+    return turns
+
+
+class Conversation:
+    """세션 하나의 대화 기록 (요약 + 최근 대화)"""
+
+    def __init__(self, session_id, summary="", turns=None, max_tokens=SESSION_MAX_TOKENS):
+        self.session_id = session_id
+        self.summary = summary or ""
+        self.turns = list(turns or [])
+        self.max_tokens = max_tokens
+        self.last_used = time.monotonic()
+        self._compact()
+
+    def tokens(self):
+        return estimate_tokens(self.summary) + sum(estimate_tokens(turn["content"]) for turn in self.turns)
+
+    def append(self, role, content):
+        if role == ROLE_ASSISTANT and len(content) > ANSWER_KEEP_CHARS:
+            content = content[:ANSWER_KEEP_CHARS] + "…"
+        self.turns.append({"role": role, "content": content})
+        self._compact()
+
+    def _compact(self):
+        """토큰 상한을 넘으면 오래된 대화(질문/답변 한 쌍씩)를 요약으로 접음 (마지막 한 쌍은 유지)"""
+        while self.tokens() > self.max_tokens and len(self.turns) > 2:
+            folded, self.turns = self.turns[:2], self.turns[2:]
+            summary = " / ".join(part for part in (self.summary, summarize_turns(folded)) if part)
+            # 요약도 상한을 넘으면 오래된 앞부분을 자름
+            while estimate_tokens(summary) > SUMMARY_MAX_TOKENS and " / " in summary:
+                summary = summary.split(" / ", 1)[1]
+            self.summary = summary
+
+    def last_user_message(self):
+        for turn in reversed(self.turns):
+            if turn["role"] == ROLE_USER:
+                return turn["content"]
+        return None
+
+    def format_history(self):
+        """프롬프트에 넣을 대화 기록 문자열"""
+        lines = []
+        if self.summary:
+            lines.append(f"(이전 대화 요약) {self.summary}")
+        for turn in self.turns:
+            prefix = "학생" if turn["role"] == ROLE_USER else "추천 시스템"
+            lines.append(f"{prefix}: {turn['content']}")
+        return "\n".join(lines)
+
+    def pairs(self):
+        """(질문, 답변) 목록 (LangChain chat_history 형식)"""
+        pairs = []
+        question = None
+        for turn in self.turns:
+            if turn["role"] == ROLE_USER:
+                question = turn["content"]
+            elif question is not None:
+                pairs.append((question, turn["content"]))
+                question = None
+        return pairs
+
+
+class ConversationStore:
+    """세션 ID별 대화 기록 (메모리 LRU + SQLite 저장, database_url이 비어 있으면 메모리만)"""
+
+    def __init__(self, max_sessions=SESSION_MAX, max_tokens=SESSION_MAX_TOKENS, ttl=SESSION_TTL,
+                 database_url=CONVERSATION_DATABASE_URL):
+        self.max_sessions = max_sessions
+        self.max_tokens = max_tokens
+        self.ttl = ttl
+        self.database_url = database_url
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._Session = None
+
+    @property
+    def persistent(self):
+        return bool(self.database_url)
+
+    def _session_factory(self):
+        """저장소 세션 팩토리 (처음 사용할 때 테이블 생성, import만으로는 파일을 만들지 않음)"""
+        if self._Session is None:
+            with self._lock:
+                if self._Session is None:
+                    engine = create_engine(self.database_url, connect_args={"timeout": 30})
+                    Base.metadata.create_all(engine)
+                    if engine.dialect.name == "sqlite":
+                        # 여러 프로세스가 동시에 읽고 쓰므로 WAL 사용
+                        with engine.begin() as connection:
+                            connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+                    self._Session = sessionmaker(bind=engine)
+        return self._Session
+
+    @staticmethod
+    def new_session_id():
+        return uuid.uuid4().hex
+
+    def _load(self, session_id):
+        if not self.persistent:
+            return None
+        session = self._session_factory()()
+        try:
+            row = session.get(ConversationSession, session_id)
+            if row is None:
+                return None
+            if (datetime.now() - row.updated_at).total_seconds() > self.ttl:
+                session.delete(row)
+                session.commit()
+                return None
+            return Conversation(session_id, row.summary, json.loads(row.turns or "[]"), self.max_tokens)
+        finally:
+            session.close()
+
+    def _save(self, conversation):
+        if not self.persistent:
+            return
+        session = self._session_factory()()
+        try:
+            session.merge(ConversationSession(
+                session_id=conversation.session_id,
+                summary=conversation.summary,
+                turns=json.dumps(conversation.turns, ensure_ascii=False),
+                updated_at=datetime.now()
+            ))
+            session.commit()
+        finally:
+            session.close()
+
+    def get(self, session_id):
+        """세션 대화 기록 (없으면 빈 기록을 새로 만듦)
+
+        저장소가 있으면 다른 프로세스가 이어서 기록했을 수 있으므로 저장소의 기록을 우선한다.
+        """
+        now = time.monotonic()
+        stored = self._load(session_id)
+        if stored is not None:
+            with self._lock:
+                self._sessions[session_id] = stored
+                self._sessions.move_to_end(session_id)
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            return stored
+        with self._lock:
+            conversation = self._sessions.get(session_id)
+            if conversation is not None and now - conversation.last_used > self.ttl:
+                del self._sessions[session_id]
+                conversation = None
+            if conversation is not None:
+                self._sessions.move_to_end(session_id)
+                conversation.last_used = now
+                return conversation
+        conversation = Conversation(session_id, max_tokens=self.max_tokens)
+        with self._lock:
+            conversation = self._sessions.setdefault(session_id, conversation)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return conversation
+
+    def append_exchange(self, session_id, question, answer):
+        """질문과 답변 한 쌍을 기록"""
+        conversation = self.get(session_id)
+        with self._lock:
+            conversation.append(ROLE_USER, question)
+            conversation.append(ROLE_ASSISTANT, answer)
+        self._save(conversation)
+        return conversation
+
+    def start(self, session_id, chat_history=None):
+        """세션 대화 기록을 가져옴. 기록이 비어 있으면 클라이언트가 보낸 chat_history로 채움 (같은 토큰 상한 적용)"""
+        conversation = self.get(session_id)
+        turns = normalize_history(chat_history)
+        if turns and not conversation.turns and not conversation.summary:
+            with self._lock:
+                conversation.turns = turns
+                conversation._compact()
+        return conversation
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+conversations = ConversationStore()
@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+import time
+from sqlalchemy.orm import sessionmaker
+from data_processor import engine, Course
+
+# 검색 결과 메타데이터 조회용 강의 목록 (course_id → 전체 메타데이터)
+# VectorDB 청크에는 course_id/chunk_index만 저장하고, 검색 후 이 목록으로 나머지 정보를 채운다.
+
+# 학기별 목록을 다시 읽는 주기 (초). 파이프라인이 추가/갱신한 강의가 API에 반영되는 최대 지연
+CATALOG_TTL = float(os.getenv("COURSE_CATALOG_TTL", "300"))
+
+# 목록에 없는 course_id가 조회될 때 다시 읽는 최소 간격 (초)
+CATALOG_MISS_RELOAD_INTERVAL = 5.0
+
+Session = sessionmaker(bind=engine)
+
+
+def build_course_metadata(course):
+    """강의의 전체 메타데이터 (None 값을 빈 문자열로 변환)"""
+    basic_info = json.loads(course.syllabus.basic_info)
+    professor_info = json.loads(course.syllabus.professor_info)
+    course_info = json.loads(course.syllabus.course_info)
+    return {
+        "course_id": course.id,
+        "term": course.term or "",
+        "subject_code": course.subject_code or "",
+        "subject_name": course.subject_name or "",
+        "class_number": course.class_number or "",
+        "professor": course.professor or "",
+        "college": course.college or "",
+        "major": course.major or "",
+        "course_type": course.course_type or "",
+        "year": course.year or "",
+        "semester": course.semester or "",
+        "professor_email": basic_info.get('email', '') or "",
+        "professor_phone": basic_info.get('phone', '') or "",
+        "course_objective": basic_info.get('course_objective', '') or "",
+        "office": professor_info.get('office', '') or "",
+        "consultation_time": professor_info.get('consultation_time', '') or "",
+        "classroom": course_info.get('classroom', '') or "",
+        "schedule": course_info.get('schedule', '') or ""
+    }
+
+
+class CourseCatalog:
+    """학기별 강의 메타데이터를 메모리에 올려두고 course_id로 조회"""
+
+    def __init__(self, ttl=CATALOG_TTL):
+        self.ttl = ttl
+        self._terms = {}  # term -> (course_id -> metadata)
+        self._loaded_at = {}
+        self._lock = threading.Lock()
+
+    def _load(self, term):
+        session = Session()
+        try:
+            courses = session.query(Course).filter(Course.term == term).all()
+            table = {course.id: build_course_metadata(course) for course in courses if course.syllabus is not None}
+        finally:
+            session.close()
+        with self._lock:
+            self._terms[term] = table
+            self._loaded_at[term] = time.monotonic()
+        return table
+
+    def _table(self, term):
+        with self._lock:
+            table = self._terms.get(term)
+            loaded_at = self._loaded_at.get(term, 0.0)
+        if table is None or time.monotonic() - loaded_at > self.ttl:
+            table = self._load(term)
+        return table
+
+    def get(self, term, course_id):
+        """course_id의 전체 메타데이터 (없으면 None)"""
+        table = self._table(term)
+        metadata = table.get(course_id)
+        if metadata is None:
+            with self._lock:
+                loaded_at = self._loaded_at.get(term, 0.0)
+            if time.monotonic() - loaded_at > CATALOG_MISS_RELOAD_INTERVAL:
+                metadata = self._load(term).get(course_id)
+        return metadata
+
+    def hydrate(self, term, chunk_metadata):
+        """청크의 compact 메타데이터를 전체 메타데이터로 교체
+
+        course_id가 없는 청크 (학기 구분 이전에 만든 컬렉션)는 전체 메타데이터가
+        이미 들어 있으므로 그대로 반환한다.
+        """
+        course_id = chunk_metadata.get("course_id")
+        if course_id is None:
+            return chunk_metadata
+        return self.get(term, course_id) or chunk_metadata
+
+    def clear(self):
+        with self._lock:
+            self._terms.clear()
+            self._loaded_at.clear()
+
+
+catalog = CourseCatalog()
@@ -0,0 +1,330 @@
+import argparse
+import json
+import os
+import re
+import threading
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import sessionmaker
+from data_processor import engine, init_db, Course
+
+# 강의계획서 자유 텍스트(평가 비율, A 비율, 핵심역량, 요일/시간)를 숫자 열로 변환한 강의 특성 표
+# 학기별로 features/<학기>.pkl에 저장해 두고 API 시작 시 읽어서, "과제 비중 낮은 수업" 같은 요청을
+# LLM 없이 벡터 연산으로 순위를 매긴다.
+# 사용 예: python course_features.py --term 2025-U211600010
+
+FEATURE_DIR = os.getenv("COURSE_FEATURE_DIR", "features")
+
+# 캐시 파일 형식이 바뀌면 올려서 기존 캐시를 다시 만들게 함
+FEATURE_VERSION = 1
+
+EVALUATION_COLUMNS = ("midterm", "final", "attendance", "assignment", "other")
+COMPETENCY_COLUMNS = ("communication", "creativity", "personality", "practical", "challenge")
+DAYS = "월화수목금토일"
+
+# 성적 평가 방식
+GRADING_RELATIVE_1 = "relative1"  # 상대평가Ⅰ (A 비율 명시)
+GRADING_RELATIVE_2 = "relative2"  # 상대평가Ⅱ
+GRADING_ABSOLUTE = "absolute"  # 절대평가
+GRADING_PASS_FAIL = "pass_fail"
+
+Session = sessionmaker(bind=engine)
+
+_PERCENT_PATTERN = r'^\s*(\d+(?:\.\d+)?)\s*%\s*$'
+_NUMBER_PATTERN = r'^\s*(\d+(?:\.\d+)?)\s*$'
+_A_RATIO_PATTERN = r'A\s*(\d+(?:\.\d+)?)\s*%'
+_SCHEDULE_DAY_PATTERN = r'([월화수목금토일])\s*\d'
+
+
+def _raw_rows(term):
+    """DB에서 특성 계산에 필요한 원본 문자열만 읽음"""
+    session = Session()
+    try:
+        courses = session.query(Course).filter(Course.term == term).all()
+        rows = []
+        for course in courses:
+            if course.syllabus is None:
+                continue
+            evaluation = json.loads(course.syllabus.evaluation)
+            core_competencies = json.loads(course.syllabus.core_competencies)
+            course_info = json.loads(course.syllabus.course_info)
+            row = {
+                "course_id": course.id,
+                "subject_name": course.subject_name or "",
+                "professor": course.professor or "",
+                "major": course.major or "",
+                "course_type": course.course_type or "",
+                "a_ratio_text": evaluation.get("a_ratio", "") or "",
+                "schedule": course_info.get("schedule", "") or "",
+            }
+            for column in EVALUATION_COLUMNS:
+                row[column] = evaluation.get(column, "") or ""
+            for column in COMPETENCY_COLUMNS:
+                row[column] = core_competencies.get(column, "") or ""
+            rows.append(row)
+        return rows
+    finally:
+        session.close()
+
+
+def build_feature_table(rows):
+    """원본 문자열 행 목록을 숫자 특성 표(DataFrame)로 변환 (파싱할 수 없는 값은 NaN)"""
+    raw = pd.DataFrame(rows, columns=[
+        "course_id", "subject_name", "professor", "major", "course_type", "a_ratio_text", "schedule",
+        *EVALUATION_COLUMNS, *COMPETENCY_COLUMNS,
+    ])
+    table = raw[["course_id", "subject_name", "professor", "major", "course_type"]].copy()
+    table["course_id"] = table["course_id"].astype(np.int64)
+
+    # 평가 비율: "30%" → 30.0, "%"나 항목명이 들어간 값은 NaN
+    for column in EVALUATION_COLUMNS:
+        table[column] = raw[column].astype(str).str.extract(_PERCENT_PATTERN)[0].astype(np.float32)
+
+    # A 비율: "상대평가Ⅰ(A40%)" → 40.0 / 평가 방식 분류
+    a_ratio_text = raw["a_ratio_text"].astype(str)
+    table["a_ratio"] = a_ratio_text.str.extract(_A_RATIO_PATTERN)[0].astype(np.float32)
+    table["grading"] = pd.Categorical(np.select(
+        [
+            a_ratio_text.str.contains("상대평가Ⅰ", regex=False),
+            a_ratio_text.str.contains("상대평가Ⅱ", regex=False),
+            a_ratio_text.str.contains("절대평가", regex=False),
+            a_ratio_text.str.contains("Pass/Fail|P/F", regex=True),
+        ],
+        [GRADING_RELATIVE_1, GRADING_RELATIVE_2, GRADING_ABSOLUTE, GRADING_PASS_FAIL],
+        default="unknown",
+    ))
+
+    # 핵심역량 점수: "30" → 30.0
+    for column in COMPETENCY_COLUMNS:
+        table[column] = raw[column].astype(str).str.extract(_NUMBER_PATTERN)[0].astype(np.float32)
+
+    # 요일/시간: "월 7-A,월 7-B,수 6-A" → 요일 비트마스크(월=1, 화=2, ...)와 주당 교시 수
+    schedule = raw["schedule"].astype(str)
+    days = schedule.str.findall(_SCHEDULE_DAY_PATTERN)
+    table["weekly_slots"] = days.str.len().fillna(0).astype(np.int16)
+    day_mask = np.zeros(len(table), dtype=np.int16)
+    for i, day in enumerate(DAYS):
+        day_mask |= np.where(schedule.str.contains(f"{day}\\s*\\d", regex=True), 1 << i, 0).astype(np.int16)
+    table["day_mask"] = day_mask
+    table["schedule"] = schedule.where(table["weekly_slots"] > 0, "")
+    return table
+
+
+def feature_path(term):
+    return os.path.join(FEATURE_DIR, f"{term}.pkl")
+
+
+def precompute_features(term):
+    """학기 특성 표를 계산하여 디스크에 저장"""
+    init_db()
+    table = build_feature_table(_raw_rows(term))
+    table.attrs["version"] = FEATURE_VERSION
+    table.attrs["term"] = term
+    os.makedirs(FEATURE_DIR, exist_ok=True)
+    path = feature_path(term)
+    tmp_path = f"{path}.tmp"
+    table.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+    return table
+
+
+def load_features(term, build_missing=True):
+    """디스크에 저장된 학기 특성 표를 읽음 (없거나 형식이 바뀌었으면 다시 계산)"""
+    path = feature_path(term)
+    if os.path.exists(path):
+        table = pd.read_pickle(path)
+        if table.attrs.get("version") == FEATURE_VERSION:
+            return table
+    if not build_missing:
+        return None
+    return precompute_features(term)
+
+
+class FeatureStore:
+    """학기별 특성 표를 메모리에 보관"""
+
+    def __init__(self):
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def get(self, term):
+        with self._lock:
+            table = self._tables.get(term)
+        if table is None:
+            table = load_features(term)
+            with self._lock:
+                self._tables[term] = table
+        return table
+
+    def reload(self, term):
+        table = load_features(term)
+        with self._lock:
+            self._tables[term] = table
+        return table
+
+
+features = FeatureStore()
+
+
+# 질문에서 정렬 기준 찾기: (키워드 패턴, 열 목록). 긴 패턴을 앞에 두어 "중간고사"가 "중간"보다 먼저 잡히게 함
+INTENT_FIELDS = (
+    (r"과제|레포트|리포트", ("assignment",)),
+    (r"출석|출결", ("attendance",)),
+    (r"중간\s*고사|중간", ("midterm",)),
+    (r"기말\s*고사|기말", ("final",)),
+    (r"시험", ("midterm", "final")),
+    (r"A\s*비율|A\s*학점|(?:학점|성적)\s*(?:을|를)?\s*잘(?:\s*주\w*)?|학점\s*후한", ("a_ratio",)),
+    (r"소통", ("communication",)),
+    (r"창의", ("creativity",)),
+    (r"인성", ("personality",)),
+    (r"실무", ("practical",)),
+    (r"도전", ("challenge",)),
+)
+_INTENT_RE = re.compile("|".join(f"(?P<f{i}>{pattern})" for i, (pattern, _) in enumerate(INTENT_FIELDS)))
+# 방향 표현은 키워드 바로 뒤(비중/비율 같은 말과 조사는 건너뜀)에 온 것만 인정한다.
+# "창의적인 작품", "중간 난이도"처럼 키워드 뒤에 다른 말이 오면 기준으로 보지 않음
+_DIRECTION_PREFIX = r"\s*(?:(?:비중|비율|반영\s*비율|점수|역량|부담|분량|양|량)\s*)?(?:이|가|은|는|도)?\s*"
+_LOW_RE = re.compile(_DIRECTION_PREFIX + r"(?:낮[은고게아]?|적[은고게어]|작[은고게아]|없[는고이어음]|거의\s*없\w*|가벼[운워]|덜\s*\w*|안\s*보[는고]?|않[는은고])")
+_HIGH_RE = re.compile(_DIRECTION_PREFIX + r"(?:높[은고게아]?|많[은고이아]|큰|크[고게]|중시\w*|비중\s*있\w*|잘\s*주\w*|후한|후하\w*)")
+# "학점 잘 주는"처럼 키워드 자체가 방향을 포함하는 경우
+_IMPLICIT_HIGH = ("a_ratio",)
+# 기준 표현을 뺀 나머지에서 주제로 보지 않는 말 (단어 전체가 이 말들로만 이루어진 경우)
+_FILLER_RE = re.compile(
+    r"(?:수업|강의|과목|교과목|강좌|그|추천|알려|찾아|보여|해|주세요|줘|좀|중에서|중|위주|관련|정도|"
+    r"있는|있나요|있어|어떤|뭐|것|거|들|으로|로|은|는|이|가|을|를|도|의|고|하고|및|그리고|순|순서|대로)+"
+)
+_WORD_RE = re.compile(r"[\w%]+")
+
+
+def parse_feature_query(question):
+    """질문을 (기준 목록, 주제) 로 나눔
+
+    기준은 (열, 방향) 목록이고 방향은 1(높은 순) 또는 -1(낮은 순)이다. 방향은 각 키워드 바로 뒤의
+    표현으로 정한다. 주제는 기준 표현과 "수업 추천해줘" 같은 말을 뺀 나머지로, 없으면 빈 문자열이다.
+    예: "과제 비중 낮고 출석 비중 높은 수업" → ([("assignment", -1), ("attendance", 1)], "")
+        "AI 관련 수업 중 과제 적은 수업" → ([("assignment", -1)], "AI")
+    """
+    intents = []
+    spans = []
+    for match in _INTENT_RE.finditer(question):
+        columns = INTENT_FIELDS[int(match.lastgroup[1:])][1]
+        low = _LOW_RE.match(question, match.end())
+        high = _HIGH_RE.match(question, match.end())
+        if low:
+            direction, end = -1, low.end()
+        elif high:
+            direction, end = 1, high.end()
+        elif columns[0] in _IMPLICIT_HIGH:
+            direction, end = 1, match.end()
+        else:
+            continue
+        spans.append((match.start(), end))
+        for column in columns:
+            if all(column != existing for existing, _ in intents):
+                intents.append((column, direction))
+    rest = question
+    for start, end in reversed(spans):
+        rest = rest[:start] + " " + rest[end:]
+    topic = " ".join(word for word in _WORD_RE.findall(rest) if not _FILLER_RE.fullmatch(word))
+    return intents, topic
+
+
+def detect_intents(question):
+    """질문에서 (열, 방향) 목록 추출 (parse_feature_query의 기준 목록)"""
+    return parse_feature_query(question)[0]
+
+
+def intent_scores(table, intents):
+    """전체 강의의 intents 기준 점수 (0~1)와 기준 열 값이 하나라도 있는지 여부 배열
+
+    열마다 값 범위를 0~1로 정규화하고 방향에 맞춰 뒤집은 뒤 평균을 낸다. 값이 없는 열은 중간값(0.5)으로 본다.
+    """
+    scores = np.zeros(len(table), dtype=np.float64)
+    counts = np.zeros(len(table), dtype=np.int32)
+    for column, direction in intents:
+        values = table[column].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            continue
+        low, high = np.nanmin(values), np.nanmax(values)
+        normalized = (values - low) / (high - low) if high > low else np.ones_like(values)
+        if direction < 0:
+            normalized = 1.0 - normalized
+        scores += np.where(valid, normalized, 0.5)
+        counts += valid
+    return scores / max(len(intents), 1), counts > 0
+
+
+def score_courses(table, intents, limit=10, course_type=None, major=None, candidates=None):
+    """특성 표에서 intents 기준 점수를 벡터 연산으로 계산하여 상위 limit개 행 반환
+
+    기준 열 값이 하나도 없는 강의는 제외한다. candidates(bool 배열)를 주면 True인 행만 대상으로 한다.
+    """
+    if table is None or table.empty or not intents:
+        return table.iloc[0:0] if table is not None else None
+
+    mask = np.ones(len(table), dtype=bool) if candidates is None else np.array(candidates, dtype=bool)
+    if course_type:
+        mask &= (table["course_type"] == course_type).to_numpy()
+    if major:
+        mask &= table["major"].str.contains(major, regex=False).to_numpy()
+
+    scores, has_values = intent_scores(table, intents)
+    mask &= has_values
+    if not mask.any():
+        return table.iloc[0:0]
+
+    final = np.where(mask, scores, -np.inf)
+    limit = min(limit, int(mask.sum()))
+    top = np.argpartition(-final, limit - 1)[:limit]
+    top = top[np.argsort(-final[top], kind="stable")]
+    result = table.iloc[top].copy()
+    result["score"] = final[top]
+    return result
+
+
+def course_scores(table, course_ids, intents):
+    """course_ids 순서대로 intents 기준 점수 배열 (특성 표에 없거나 기준 열 값이 없는 강의는 NaN)"""
+    result = np.full(len(course_ids), np.nan)
+    if table is None or table.empty or not intents or not len(course_ids):
+        return result
+    rows = pd.Index(table["course_id"]).get_indexer(pd.Index(course_ids, dtype="float64").fillna(-1).astype(np.int64))
+    scores, has_values = intent_scores(table, intents)
+    found = rows >= 0
+    result[found] = np.where(has_values[rows[found]], scores[rows[found]], np.nan)
+    return result
+
+
+# 답변에 표시할 열 이름
+COLUMN_LABELS = {
+    "midterm": "중간고사", "final": "기말고사", "attendance": "출석", "assignment": "과제", "other": "기타",
+    "a_ratio": "A 비율", "communication": "소통역량", "creativity": "창의역량", "personality": "인성역량",
+    "practical": "실무역량", "challenge": "도전역량",
+}
+
+
+def describe_intents(intents):
+    """(열, 방향) 목록을 "과제 낮은 순, 출석 높은 순" 형식으로"""
+    return ", ".join(f"{COLUMN_LABELS[column]} {'낮은' if direction < 0 else '높은'} 순" for column, direction in intents)
+
+
+if __name__ == "__main__":
+    from terms import get_current_term
+
+    parser = argparse.ArgumentParser(description="강의 특성 표 생성")
+    parser.add_argument("--term", default=None, help="학기 (생략 시 기본 학기)")
+    parser.add_argument("--query", default=None, help="생성 후 질문으로 순위 확인")
+    args = parser.parse_args()
+
+    init_db()
+    term = args.term or get_current_term()
+    table = precompute_features(term)
+    print(f"강의 특성 표 저장 완료: {feature_path(term)} ({len(table)}개 강의)")
+    for column in (*EVALUATION_COLUMNS, "a_ratio", *COMPETENCY_COLUMNS, "weekly_slots"):
+        print(f"  {column:<14} 값 있음 {int(table[column].notna().sum()):>5}개")
+    if args.query:
+        intents = detect_intents(args.query)
+        print(f"\n질문: {args.query} → {intents}")
+        ranked = score_courses(table, intents)
+        columns = ["subject_name", "professor"] + [column for column, _ in intents] + ["score"]
+        print(ranked[columns].to_string(index=False))
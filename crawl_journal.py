@@ -0,0 +1,187 @@
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, UniqueConstraint
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from datetime import datetime, timedelta
+import hashlib
+import json
+import threading
+
+Base = declarative_base()
+
+# 크롤링 상태
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+class CrawlEntry(Base):
+    __tablename__ = "crawl_journal"
+    __table_args__ = (
+        UniqueConstraint("year", "semester_code", "subject_code", "class_number", name="uq_crawl_course"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    year = Column(String(10))
+    semester_code = Column(String(20))
+    subject_code = Column(String(20))
+    class_number = Column(String(20))
+    subject_name = Column(String(200))
+    status = Column(String(20), default=STATUS_PENDING)
+    attempts = Column(Integer, default=0)
+    list_entry = Column(Text)  # 강의 목록 항목 (JSON 형식, 재시도 시 사용)
+    list_hash = Column(String(64))  # 마지막으로 성공한 크롤링 시점의 강의 목록 항목 해시
+    content_hash = Column(String(64))  # 저장된 결과 파일 해시
+    output_path = Column(Text)
+    last_error = Column(Text)
+    next_attempt_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    completed_at = Column(DateTime)
+
+def course_key(course):
+    """강의 목록 항목의 고유 키 (연도, 학기, 과목코드, 분반)"""
+    return (course["year"], course["semester_code"], course["subject_code"], course["class_number"])
+
+def list_entry_hash(course):
+    """강의 목록 항목 해시 (항목 내용이 바뀌었는지 확인용)"""
+    return hashlib.sha256(json.dumps(course, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def file_sha256(path):
+    """파일 내용 해시"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class CrawlJournal:
+    """강의별 크롤링 상태, 시도 횟수, 결과 해시를 기록하는 SQLite 저널"""
+
+    def __init__(self, db_path, max_attempts=5, base_delay=5.0, max_delay=600.0):
+        self.engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+
+    def _find(self, session, course):
+        year, semester_code, subject_code, class_number = course_key(course)
+        return session.query(CrawlEntry).filter_by(
+            year=year, semester_code=semester_code, subject_code=subject_code, class_number=class_number
+        ).one_or_none()
+
+    def plan(self, courses, recrawl_changed=False):
+        """이번 실행에서 크롤링할 강의 목록 결정
+
+        - 처음 보는 강의, 이전 실행이 중단된 강의: 크롤링
+        - 완료된 강의: 건너뜀 (recrawl_changed이면 목록 항목이 바뀐 경우만 다시 크롤링)
+        - 실패한 강의: 재시도 시각이 지났고 최대 시도 횟수 미만이면 크롤링
+        """
+        to_crawl = []
+        stats = {"new": 0, "resumed": 0, "skipped": 0, "changed": 0, "retry": 0, "deferred": 0, "gave_up": 0}
+        now = datetime.now()
+        with self._lock:
+            session = self.Session()
+            try:
+                for course in courses:
+                    entry = self._find(session, course)
+                    current_hash = list_entry_hash(course)
+                    if entry is None:
+                        year, semester_code, subject_code, class_number = course_key(course)
+                        entry = CrawlEntry(
+                            year=year,
+                            semester_code=semester_code,
+                            subject_code=subject_code,
+                            class_number=class_number,
+                            status=STATUS_PENDING,
+                            attempts=0
+                        )
+                        session.add(entry)
+                        stats["new"] += 1
+                        to_crawl.append(course)
+                    elif entry.status == STATUS_DONE:
+                        if recrawl_changed and entry.list_hash != current_hash:
+                            stats["changed"] += 1
+                            to_crawl.append(course)
+                        else:
+                            stats["skipped"] += 1
+                    elif entry.status == STATUS_FAILED:
+                        if entry.attempts >= self.max_attempts:
+                            stats["gave_up"] += 1
+                        elif entry.next_attempt_at and entry.next_attempt_at > now:
+                            stats["deferred"] += 1
+                        else:
+                            stats["retry"] += 1
+                            to_crawl.append(course)
+                    else:
+                        stats["resumed"] += 1
+                        to_crawl.append(course)
+                    entry.subject_name = course.get("subject_name", "")
+                    entry.list_entry = json.dumps(course, ensure_ascii=False)
+                session.commit()
+            finally:
+                session.close()
+        return to_crawl, stats
+
+    def mark_done(self, course, output_path=None, content_hash=None):
+        """크롤링 성공 기록 (content_hash를 주지 않으면 저장된 파일에서 계산)"""
+        if content_hash is None and output_path:
+            content_hash = file_sha256(output_path)
+        with self._lock:
+            session = self.Session()
+            try:
+                entry = self._find(session, course)
+                entry.status = STATUS_DONE
+                entry.attempts = (entry.attempts or 0) + 1
+                entry.list_hash = list_entry_hash(course)
+                entry.content_hash = content_hash
+                entry.output_path = output_path
+                entry.last_error = None
+                entry.next_attempt_at = None
+                entry.completed_at = datetime.now()
+                session.commit()
+            finally:
+                session.close()
+
+    def mark_failed(self, course, error=""):
+        """크롤링 실패 기록 및 지수 백오프로 다음 재시도 시각 설정"""
+        with self._lock:
+            session = self.Session()
+            try:
+                entry = self._find(session, course)
+                entry.status = STATUS_FAILED
+                entry.attempts = (entry.attempts or 0) + 1
+                entry.last_error = str(error)[:1000]
+                delay = min(self.max_delay, self.base_delay * (2 ** (entry.attempts - 1)))
+                entry.next_attempt_at = datetime.now() + timedelta(seconds=delay)
+                session.commit()
+            finally:
+                session.close()
+
+    def retry_queue(self, year, semester_code):
+        """재시도 대기 중인 강의 목록과 가장 이른 재시도 시각 반환"""
+        session = self.Session()
+        try:
+            entries = session.query(CrawlEntry).filter(
+                CrawlEntry.year == year,
+                CrawlEntry.semester_code == semester_code,
+                CrawlEntry.status == STATUS_FAILED,
+                CrawlEntry.attempts < self.max_attempts
+            ).order_by(CrawlEntry.next_attempt_at).all()
+            courses = [json.loads(entry.list_entry) for entry in entries if entry.list_entry]
+            next_at = entries[0].next_attempt_at if entries else None
+            return courses, next_at
+        finally:
+            session.close()
+
+    def summary(self, year, semester_code):
+        """상태별 강의 수"""
+        session = self.Session()
+        try:
+            counts = {}
+            for entry in session.query(CrawlEntry).filter_by(year=year, semester_code=semester_code):
+                counts[entry.status] = counts.get(entry.status, 0) + 1
+            return counts
+        finally:
+            session.close()
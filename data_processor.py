@@ -1,20 +1,33 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import create_engine, Column, Integer, String, Text, ForeignKey, UniqueConstraint, Index, DateTime, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 import json
 import os
+import argparse
 from datetime import datetime
+from profiling import stage, add_profile_arguments, profiler_from_args
 
 # 데이터베이스 설정
 DATABASE_URL = "sqlite:///course_recommender.db"
 engine = create_engine(DATABASE_URL)
 Base = declarative_base()
 
+# 학기 구분이 없던 기존 데이터의 학기 (2025년 1학기)
+LEGACY_TERM = "2025-U211600010"
+
+def term_id(year, semester_code):
+    """연도와 학기 코드로 학기 식별자 생성 (예: 2025-U211600010)"""
+    return f"{year}-{semester_code}"
+
 # 모델 정의
 class Course(Base):
     __tablename__ = "course"
+    __table_args__ = (
+        Index("ix_course_term_subject", "term", "subject_code", "class_number"),
+    )
     
     id = Column(Integer, primary_key=True)
+    term = Column(String(32), index=True)  # 학기 식별자 (연도-학기코드)
     subject_code = Column(String(20))  # 과목코드
     subject_name = Column(String(200))  # 교과목명 (항목_18)
     class_number = Column(String(20))  # 분반
@@ -54,15 +67,61 @@ class WeeklyPlan(Base):
     # 관계 설정
     course = relationship("Course", back_populates="weekly_plans")
 
+class Term(Base):
+    __tablename__ = "term"
+    
+    id = Column(String(32), primary_key=True)  # 연도-학기코드
+    year = Column(String(10))
+    semester_code = Column(String(20))
+    label = Column(String(50))  # 표시용 이름 (예: 2025년 1학기)
+    status = Column(String(20), default="active")  # active / archived
+    is_current = Column(Integer, default=0)  # 기본 검색 대상 학기 여부
+    created_at = Column(DateTime, default=datetime.now)
+    archived_at = Column(DateTime)
+
 def init_db():
-    """데이터베이스 초기화"""
+    """데이터베이스 초기화 (학기 컬럼이 없는 기존 DB는 python data_processor.py migrate를 먼저 실행해야 함)"""
+    if _needs_term_migration():
+        raise RuntimeError("course 테이블에 학기(term) 컬럼이 없습니다. "
+                           "python data_processor.py migrate로 DB를 먼저 마이그레이션하세요.")
     Base.metadata.create_all(engine)
 
-def process_json_files(json_dir):
-    """폴더 내의 모든 JSON 파일을 처리하여 데이터베이스에 저장"""
+def _needs_term_migration():
+    inspector = inspect(engine)
+    if not inspector.has_table("course"):
+        return False
+    return "term" not in [column["name"] for column in inspector.get_columns("course")]
+
+def migrate_term_column():
+    """학기 컬럼이 없는 기존 course 테이블에 컬럼과 인덱스를 추가하고 기존 데이터를 LEGACY_TERM으로 채움"""
+    Base.metadata.create_all(engine)
+    if not _needs_term_migration():
+        print("이미 학기 컬럼이 있습니다.")
+    else:
+        print(f"course 테이블에 학기 컬럼 추가 (기존 데이터: {LEGACY_TERM})")
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE course ADD COLUMN term VARCHAR(32)"))
+            conn.execute(text("UPDATE course SET term = :term WHERE term IS NULL"), {"term": LEGACY_TERM})
+        for index in Course.__table__.indexes:
+            index.create(engine, checkfirst=True)
+    # 새 DB나 이미 컬럼이 있는 DB에도 기존 학기 행을 만듦 (기본 학기가 없을 때만 기본 학기로 지정)
+    year, semester_code = LEGACY_TERM.split("-", 1)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    try:
+        if session.get(Term, LEGACY_TERM) is None:
+            has_current = session.query(Term).filter_by(is_current=1).first() is not None
+            session.add(Term(id=LEGACY_TERM, year=year, semester_code=semester_code, status="active",
+                             is_current=0 if has_current else 1))
+            session.commit()
+    finally:
+        session.close()
+
+def process_json_files(json_dir, term=LEGACY_TERM, profiler=None):
+    """폴더 내의 모든 JSON 파일을 처리하여 해당 학기 데이터로 데이터베이스에 저장"""
     try:
         # 데이터베이스 테이블 생성
-        Base.metadata.create_all(engine)
+        init_db()
         Session = sessionmaker(bind=engine)
         session = Session()
         
@@ -77,114 +136,19 @@ def process_json_files(json_dir):
                 file_path = os.path.join(json_dir, json_file)
                 print(f"\n[{i}/{total_files}] {json_file} 처리 중...")
                 
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # 기본 정보 추출
-                basic_info = data.get("기본정보", {})
-                evaluation_info = data.get("평가방법", {})
-                core_info = data.get("핵심역량", {})
-                
-                print(f"기본 정보: {basic_info.get('항목_18', '')} (교과목명)")
-                print(f"담당교수: {basic_info.get('항목_9', '')}")
-                print(f"이수구분: {basic_info.get('항목_5', '')}")
+                with stage(profiler, "json_parse"):
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
                 
-                # 담당교수 정보 추출 로직 개선
-                def extract_professor_info(info_dict):
-                    # 교수 정보가 포함될 수 있는 모든 항목 확인
-                    professor_fields = {
-                        "항목_9": "담당교수",
-                        "항목_10": "담당교수",
-                        "항목_4": "이메일",  # 이메일이 교수 정보와 함께 있을 수 있음
-                        "항목_6": "연구실",  # 연구실 정보가 교수 정보와 함께 있을 수 있음
-                    }
-                    
-                    # 각 항목에서 교수 정보 추출 시도
-                    for field, field_type in professor_fields.items():
-                        value = info_dict.get(field, "")
-                        if value and "교수" in value or "교수" in field_type:
-                            # 교수 정보에서 이름만 추출
-                            parts = value.split()
-                            for part in parts:
-                                if "교수" in part:
-                                    # 교수 앞의 이름 추출
-                                    idx = part.find("교수")
-                                    if idx > 0:
-                                        return part[:idx]
-                                    return part
-                            return value
-                    return ""
-
-                professor = extract_professor_info(basic_info)
-                
-                # 강의 정보 생성
-                course = Course(
-                    subject_code=basic_info.get("항목_13", ""),  # 교과목 코드
-                    subject_name=basic_info.get("항목_18", ""),  # 교과목명
-                    class_number=basic_info.get("항목_11", ""),  # 분반
-                    professor=professor,  # 개선된 담당교수 정보
-                    college=basic_info.get("항목_1", "").split()[0] if basic_info.get("항목_1") else "",  # 단과대학
-                    major=basic_info.get("항목_20", "").split()[0] if basic_info.get("항목_20") else "",  # 학과
-                    course_type=basic_info.get("항목_5", ""),  # 이수구분
-                    year=basic_info.get("항목_20", "").split()[-1] if basic_info.get("항목_20") else "",  # 학년
-                    semester=basic_info.get("항목_0", "").split("/")[0] if basic_info.get("항목_0") else ""  # 학기
-                )
-                
-                print(f"생성된 강의 정보: {course.subject_name} ({course.professor})")
-                
-                # 강의계획서 정보 생성
-                syllabus = Syllabus(
-                    basic_info=json.dumps({
-                        "email": basic_info.get("항목_4", ""),  # 이메일
-                        "course_type": basic_info.get("항목_5", ""),  # 이수구분
-                        "professor": basic_info.get("항목_9", ""),  # 담당교수
-                        "phone": basic_info.get("항목_10", ""),  # 연락처
-                        "subject_name": basic_info.get("항목_18", ""),  # 교과목명
-                        "major_year": basic_info.get("항목_20", ""),  # 학과/학년
-                        "course_objective": basic_info.get("항목_29", "")  # 수업목표
-                    }, ensure_ascii=False),
-                    professor_info=json.dumps({
-                        "email": basic_info.get("항목_4", ""),  # 이메일
-                        "phone": basic_info.get("항목_10", ""),  # 연락처
-                        "professor": basic_info.get("항목_9", ""),  # 담당교수
-                        "office": basic_info.get("항목_6", ""),  # 연구실
-                        "consultation_time": basic_info.get("항목_22", "")  # 상담가능시간
-                    }, ensure_ascii=False),
-                    course_info=json.dumps({
-                        "course_objective": basic_info.get("항목_29", ""),  # 수업목표
-                        "classroom": basic_info.get("전주", ""),  # 강의실
-                        "schedule": basic_info.get("항목_27", "")  # 요일/시간
-                    }, ensure_ascii=False),
-                    evaluation=json.dumps({
-                        "a_ratio": evaluation_info.get("항목_10", ""),  # A 비율 (상대평가Ⅰ(A40%))
-                        "evaluation_method": evaluation_info.get("항목_8", ""),  # 평가방법
-                        "midterm": core_info.get("항목_59", ""),  # 중간고사 비율
-                        "final": core_info.get("항목_60", ""),  # 기말고사 비율
-                        "attendance": core_info.get("항목_61", ""),  # 출석 비율
-                        "assignment": core_info.get("항목_62", ""),  # 과제 비율
-                        "other": core_info.get("항목_66", "")  # 기타 비율
-                    }, ensure_ascii=False),
-                    textbook_info=json.dumps({
-                        "main_textbook": core_info.get("항목_21", ""),  # 주교재
-                        "reference": core_info.get("항목_24", "")  # 참고자료
-                    }, ensure_ascii=False),
-                    core_competencies=json.dumps({
-                        "communication": core_info.get("항목_12", ""),  # 소통역량
-                        "creativity": core_info.get("항목_13", ""),  # 창의역량
-                        "personality": core_info.get("항목_14", ""),  # 인성역량
-                        "practical": core_info.get("항목_15", ""),  # 실무역량
-                        "challenge": core_info.get("항목_16", "")  # 도전역량
-                    }, ensure_ascii=False)
-                )
-                
-                # 관계 설정
-                course.syllabus = syllabus
+                with stage(profiler, "field_extraction"):
+                    course = build_course(data, term=term)
                 
                 # 데이터베이스에 저장
                 session.add(course)
                 print(f"강의 정보 저장 완료: {course.subject_name}")
             
-            session.commit()
+            with stage(profiler, "orm_flush"):
+                session.commit()
             print("\n모든 데이터 처리 완료")
             
         except Exception as e:
@@ -198,9 +162,271 @@ def process_json_files(json_dir):
         print(f"파일 처리 중 오류 발생: {str(e)}")
         raise
 
+# parse_report 결과(섹션 → 항목명: 값)에서 읽을 필드별 항목명 (앞의 이름부터 확인)
+# 보고서에 교수정보/강의정보/교재정보 머리행이 있으면 항목이 그 섹션으로 옮겨 가므로 모든 섹션에서 찾는다.
+REPORT_LABELS = {
+    "subject_code": ("교과목코드", "과목코드", "학수번호"),
+    "subject_name": ("교과목명", "과목명"),
+    "class_number": ("분반",),
+    "professor": ("담당교수", "교수명"),
+    "email": ("이메일", "E-mail", "e-mail"),
+    "phone": ("연락처", "전화번호"),
+    "office": ("연구실",),
+    "consultation_time": ("상담가능시간", "상담시간"),
+    "college": ("단과대학", "개설대학"),
+    "major": ("학과", "개설학과", "주관학과"),
+    "major_year": ("학과/학년",),
+    "course_type": ("이수구분",),
+    "year": ("학년",),
+    "semester": ("학기", "년도/학기"),
+    "course_objective": ("수업목표", "교과목표"),
+    "classroom": ("강의실",),
+    "schedule": ("요일/시간", "강의시간"),
+    "a_ratio": ("평가방법", "성적평가방법", "평가기준"),
+    "midterm": ("중간고사",),
+    "final": ("기말고사",),
+    "attendance": ("출석",),
+    "assignment": ("과제",),
+    "other": ("기타",),
+    "main_textbook": ("주교재",),
+    "reference": ("참고자료", "참고문헌"),
+    "communication": ("소통", "소통역량"),
+    "creativity": ("창의", "창의역량"),
+    "personality": ("인성", "인성역량"),
+    "practical": ("실무", "실무역량"),
+    "challenge": ("도전", "도전역량"),
+}
+
+# 강의 목록 항목으로 채울 수 있는 필드 (보고서에 값이 없을 때 사용)
+LISTING_FIELDS = ("subject_code", "class_number", "subject_name", "college", "major", "course_type")
+
+# 저장할 강의에 반드시 있어야 하는 필드 (비었으면 정규화 실패로 봄)
+REQUIRED_FIELDS = ("subject_name", "professor", "schedule")
+
+def _legacy_fields(data):
+    """예전 파서 형식(기본정보/핵심역량의 항목_N 키)에서 필드 추출"""
+    basic_info = data.get("기본정보", {})
+    evaluation_info = data.get("평가방법", {})
+    core_info = data.get("핵심역량", {})
+
+    # 담당교수 정보 추출 로직 개선
+    def extract_professor_info(info_dict):
+        # 교수 정보가 포함될 수 있는 모든 항목 확인
+        professor_fields = {
+            "항목_9": "담당교수",
+            "항목_10": "담당교수",
+            "항목_4": "이메일",  # 이메일이 교수 정보와 함께 있을 수 있음
+            "항목_6": "연구실",  # 연구실 정보가 교수 정보와 함께 있을 수 있음
+        }
+
+        # 각 항목에서 교수 정보 추출 시도
+        for field, field_type in professor_fields.items():
+            value = info_dict.get(field, "")
+            if value and "교수" in value or "교수" in field_type:
+                # 교수 정보에서 이름만 추출
+                parts = value.split()
+                for part in parts:
+                    if "교수" in part:
+                        # 교수 앞의 이름 추출
+                        idx = part.find("교수")
+                        if idx > 0:
+                            return part[:idx]
+                        return part
+                return value
+        return ""
+
+    return {
+        "subject_code": basic_info.get("항목_13", ""),  # 교과목 코드
+        "subject_name": basic_info.get("항목_18", ""),  # 교과목명
+        "class_number": basic_info.get("항목_11", ""),  # 분반
+        "professor": extract_professor_info(basic_info),  # 개선된 담당교수 정보
+        "professor_raw": basic_info.get("항목_9", ""),  # 담당교수
+        "college": basic_info.get("항목_1", "").split()[0] if basic_info.get("항목_1") else "",  # 단과대학
+        "major": basic_info.get("항목_20", "").split()[0] if basic_info.get("항목_20") else "",  # 학과
+        "major_year": basic_info.get("항목_20", ""),  # 학과/학년
+        "course_type": basic_info.get("항목_5", ""),  # 이수구분
+        "year": basic_info.get("항목_20", "").split()[-1] if basic_info.get("항목_20") else "",  # 학년
+        "semester": basic_info.get("항목_0", "").split("/")[0] if basic_info.get("항목_0") else "",  # 학기
+        "email": basic_info.get("항목_4", ""),  # 이메일
+        "phone": basic_info.get("항목_10", ""),  # 연락처
+        "office": basic_info.get("항목_6", ""),  # 연구실
+        "consultation_time": basic_info.get("항목_22", ""),  # 상담가능시간
+        "course_objective": basic_info.get("항목_29", ""),  # 수업목표
+        "classroom": basic_info.get("전주", ""),  # 강의실
+        "schedule": basic_info.get("항목_27", ""),  # 요일/시간
+        "a_ratio": evaluation_info.get("항목_10", ""),  # A 비율 (상대평가Ⅰ(A40%))
+        "evaluation_method": evaluation_info.get("항목_8", ""),  # 평가방법
+        "midterm": core_info.get("항목_59", ""),  # 중간고사 비율
+        "final": core_info.get("항목_60", ""),  # 기말고사 비율
+        "attendance": core_info.get("항목_61", ""),  # 출석 비율
+        "assignment": core_info.get("항목_62", ""),  # 과제 비율
+        "other": core_info.get("항목_66", ""),  # 기타 비율
+        "main_textbook": core_info.get("항목_21", ""),  # 주교재
+        "reference": core_info.get("항목_24", ""),  # 참고자료
+        "communication": core_info.get("항목_12", ""),  # 소통역량
+        "creativity": core_info.get("항목_13", ""),  # 창의역량
+        "personality": core_info.get("항목_14", ""),  # 인성역량
+        "practical": core_info.get("항목_15", ""),  # 실무역량
+        "challenge": core_info.get("항목_16", "")  # 도전역량
+    }
+
+def _report_fields(data):
+    """parse_report 형식(항목명 키)에서 REPORT_LABELS로 필드 추출"""
+    def find(labels):
+        for label in labels:
+            for section in data.values():
+                value = section.get(label) if isinstance(section, dict) else None
+                if value and str(value).strip():
+                    return str(value).strip()
+        return ""
+
+    fields = {field: find(labels) for field, labels in REPORT_LABELS.items()}
+    # "홍길동 교수"처럼 직함이 붙은 경우 이름만 사용
+    fields["professor"] = fields["professor"].replace("교수", "").strip()
+    fields["professor_raw"] = find(REPORT_LABELS["professor"])
+    fields["evaluation_method"] = fields["a_ratio"]
+    return fields
+
+def normalize_syllabus(data, listing=None):
+    """강의계획서 dict를 Course/Syllabus 필드 dict로 정규화
+
+    data는 ubireport_parser.parse_report 결과(항목명 키)이며, 예전 파서의 항목_N 키 형식도 받는다.
+    listing(강의 목록 항목)이 있으면 보고서에 없는 LISTING_FIELDS를 그 값으로 채운다.
+    """
+    legacy = any(str(key).startswith("항목_") for key in data.get("기본정보", {}))
+    fields = _legacy_fields(data) if legacy else _report_fields(data)
+    for field in LISTING_FIELDS:
+        if not fields.get(field) and listing and listing.get(field):
+            fields[field] = listing[field]
+    return fields
+
+def missing_fields(course):
+    """REQUIRED_FIELDS 중 값이 빈 필드 목록 (Course 객체 기준)"""
+    course_info = json.loads(course.syllabus.course_info or "{}") if course.syllabus is not None else {}
+    values = {
+        "subject_name": course.subject_name,
+        "professor": course.professor,
+        "schedule": course_info.get("schedule", ""),
+    }
+    return [field for field in REQUIRED_FIELDS if not (values[field] or "").strip()]
+
+def build_course(data, term=None, listing=None):
+    """강의계획서 JSON 데이터로부터 Course/Syllabus 객체 생성 (필드 매핑은 normalize_syllabus 참고)"""
+    fields = normalize_syllabus(data, listing)
+
+    print(f"기본 정보: {fields['subject_name']} (교과목명)")
+    print(f"담당교수: {fields['professor']}")
+    print(f"이수구분: {fields['course_type']}")
+
+    # 강의 정보 생성
+    course = Course(
+        term=term,
+        subject_code=fields["subject_code"],
+        subject_name=fields["subject_name"],
+        class_number=fields["class_number"],
+        professor=fields["professor"],
+        college=fields["college"],
+        major=fields["major"],
+        course_type=fields["course_type"],
+        year=fields["year"],
+        semester=fields["semester"]
+    )
+
+    print(f"생성된 강의 정보: {course.subject_name} ({course.professor})")
+
+    # 강의계획서 정보 생성
+    syllabus = Syllabus(
+        basic_info=json.dumps({
+            "email": fields["email"],  # 이메일
+            "course_type": fields["course_type"],  # 이수구분
+            "professor": fields["professor_raw"],  # 담당교수
+            "phone": fields["phone"],  # 연락처
+            "subject_name": fields["subject_name"],  # 교과목명
+            "major_year": fields["major_year"],  # 학과/학년
+            "course_objective": fields["course_objective"]  # 수업목표
+        }, ensure_ascii=False),
+        professor_info=json.dumps({
+            "email": fields["email"],  # 이메일
+            "phone": fields["phone"],  # 연락처
+            "professor": fields["professor_raw"],  # 담당교수
+            "office": fields["office"],  # 연구실
+            "consultation_time": fields["consultation_time"]  # 상담가능시간
+        }, ensure_ascii=False),
+        course_info=json.dumps({
+            "course_objective": fields["course_objective"],  # 수업목표
+            "classroom": fields["classroom"],  # 강의실
+            "schedule": fields["schedule"]  # 요일/시간
+        }, ensure_ascii=False),
+        evaluation=json.dumps({
+            "a_ratio": fields["a_ratio"],  # A 비율 (상대평가Ⅰ(A40%))
+            "evaluation_method": fields["evaluation_method"],  # 평가방법
+            "midterm": fields["midterm"],  # 중간고사 비율
+            "final": fields["final"],  # 기말고사 비율
+            "attendance": fields["attendance"],  # 출석 비율
+            "assignment": fields["assignment"],  # 과제 비율
+            "other": fields["other"]  # 기타 비율
+        }, ensure_ascii=False),
+        textbook_info=json.dumps({
+            "main_textbook": fields["main_textbook"],  # 주교재
+            "reference": fields["reference"]  # 참고자료
+        }, ensure_ascii=False),
+        core_competencies=json.dumps({
+            "communication": fields["communication"],  # 소통역량
+            "creativity": fields["creativity"],  # 창의역량
+            "personality": fields["personality"],  # 인성역량
+            "practical": fields["practical"],  # 실무역량
+            "challenge": fields["challenge"]  # 도전역량
+        }, ensure_ascii=False)
+    )
+    
+    # 관계 설정
+    course.syllabus = syllabus
+    return course
+
+def upsert_course(session, course):
+    """같은 학기/과목코드/분반의 강의가 있으면 내용을 갱신하고, 없으면 새로 추가
+
+    반환값: 세션에 반영된 Course 객체 (flush 후이므로 id가 채워져 있음)
+    """
+    existing = session.query(Course).filter_by(
+        term=course.term,
+        subject_code=course.subject_code,
+        class_number=course.class_number
+    ).first()
+    if existing is None:
+        session.add(course)
+        session.flush()
+        return course
+    
+    for field in ("subject_name", "professor", "college", "major", "course_type", "year", "semester"):
+        setattr(existing, field, getattr(course, field))
+    if existing.syllabus is None:
+        # 새 Course 객체가 세션에 딸려 들어가지 않도록 관계를 먼저 끊음
+        syllabus = course.syllabus
+        course.syllabus = None
+        existing.syllabus = syllabus
+    else:
+        for field in ("basic_info", "professor_info", "course_info", "evaluation", "textbook_info", "core_competencies"):
+            setattr(existing.syllabus, field, getattr(course.syllabus, field))
+    session.flush()
+    return existing
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="강의계획서 JSON 파일을 DB에 저장")
+    parser.add_argument("command", nargs="?", choices=["load", "migrate"], default="load",
+                        help="load: JSON 파일 저장 (기본), migrate: 기존 DB에 학기 컬럼 추가")
+    parser.add_argument("--json-dir", default="data/syllabi", help="JSON 파일이 있는 폴더 경로")
+    parser.add_argument("--year", default=None, help="기준 연도 (생략 시 기존 학기로 저장)")
+    parser.add_argument("--semester-code", default=None, help="학기 코드")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.command == "migrate":
+        migrate_term_column()
+        exit(0)
+    
     # JSON 파일이 있는 폴더 경로
-    json_dir = "data/syllabi"
+    json_dir = args.json_dir
     
     # 폴더 존재 여부 확인
     if not os.path.exists(json_dir):
@@ -209,4 +435,13 @@ if __name__ == "__main__":
         exit(1)
     
     # 데이터 처리
-    process_json_files(json_dir) 
\ No newline at end of file
+    profiler = profiler_from_args(args, "data_processor")
+    try:
+        term = term_id(args.year, args.semester_code) if args.year and args.semester_code else LEGACY_TERM
+        process_json_files(json_dir, term=term, profiler=profiler)
+        # 적재한 학기를 terms.py activate/API에서 쓸 수 있도록 등록 (terms가 이 모듈을 import하므로 여기서 import)
+        from terms import register_term
+        register_term(*term.split("-", 1))
+    finally:
+        if profiler is not None:
+            profiler.finish()
@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+
+# 버전별 VectorDB 빌드와 배포 (blue/green)
+# 새 인덱스는 현재 배포된 디렉터리를 복사한 새 빌드 디렉터리에 쓰고, 다 쓴 뒤 포인터 파일(current.json)을
+# os.replace로 바꿔 배포한다. API는 요청마다 포인터를 확인해 새 버전 디렉터리를 열고, 이미 처리 중인
+# 요청은 시작할 때 연 이전 버전을 끝까지 사용한다. 이전 버전은 INDEX_KEEP_BUILDS개까지 보관한다(롤백용).
+# 포인터가 없으면(처음 배포 전) 기존 ./chroma_db를 그대로 사용한다.
+# 빌드를 열어 둔 프로세스는 builds/<버전>/holders/<pid> 파일을 남기고(hold), 정리할 때는 살아 있는
+# 프로세스가 열어 둔 빌드를 지우지 않는다.
+# 사용 예: python index_registry.py list
+#         python index_registry.py publish 20250301T120000-123456-ab12   (롤백)
+#         python index_registry.py prune --keep 2
+
+INDEX_ROOT = os.getenv("INDEX_ROOT", "indexes")
+BUILDS_DIR = os.path.join(INDEX_ROOT, "builds")
+POINTER_PATH = os.path.join(INDEX_ROOT, "current.json")
+
+# 포인터가 없을 때 사용하는 기존 VectorDB 디렉터리
+LEGACY_INDEX_DIR = "./chroma_db"
+
+# 배포된 버전 이전에 보관할 빌드 수
+INDEX_KEEP_BUILDS = int(os.getenv("INDEX_KEEP_BUILDS", "3"))
+
+BUILD_INFO = "build.json"
+HOLDERS_DIR = "holders"
+LEGACY_VERSION = "legacy"
+
+
+class StaleBuild(RuntimeError):
+    """빌드를 시작한 뒤 다른 빌드가 먼저 배포됨 (그대로 배포하면 그 변경이 사라짐)"""
+
+
+def build_dir(version):
+    return os.path.join(BUILDS_DIR, version)
+
+
+def chroma_dir(version):
+    """빌드의 Chroma persist 디렉터리"""
+    if version == LEGACY_VERSION:
+        return LEGACY_INDEX_DIR
+    return os.path.join(build_dir(version), "chroma")
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_build_info(version):
+    try:
+        return _read_json(os.path.join(build_dir(version), BUILD_INFO))
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def holders(version):
+    """빌드를 열어 둔 살아 있는 프로세스 pid 목록 (종료된 프로세스의 파일은 지움)"""
+    directory = os.path.join(build_dir(version), HOLDERS_DIR)
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    alive = []
+    for name in names:
+        if name.isdigit() and _pid_alive(int(name)):
+            alive.append(int(name))
+        else:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+    return alive
+
+
+def list_builds():
+    """빌드 정보 목록 (오래된 순)"""
+    if not os.path.isdir(BUILDS_DIR):
+        return []
+    builds = []
+    for version in sorted(os.listdir(BUILDS_DIR)):
+        info = read_build_info(version)
+        if info is not None:
+            builds.append(info)
+    return builds
+
+
+class IndexRegistry:
+    """배포된 인덱스 버전 조회 (포인터 파일이 바뀌었을 때만 다시 읽음)"""
+
+    def __init__(self, pointer_path=POINTER_PATH):
+        self.pointer_path = pointer_path
+        self._cached = (None, LEGACY_VERSION)  # (포인터 파일 수정 시각, 버전)
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        try:
+            mtime = os.stat(self.pointer_path).st_mtime_ns
+        except FileNotFoundError:
+            return LEGACY_VERSION
+        with self._lock:
+            if self._cached[0] == mtime:
+                return self._cached[1]
+        try:
+            version = _read_json(self.pointer_path)["version"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[index] 포인터 파일을 읽을 수 없습니다 ({e}). 이전 버전을 계속 사용합니다.")
+            with self._lock:
+                return self._cached[1]
+        with self._lock:
+            self._cached = (mtime, version)
+        return version
+
+    def current_dir(self):
+        """현재 배포된 Chroma 디렉터리"""
+        return chroma_dir(self.current_version())
+
+    def start_build(self, copy_current=True):
+        """새 빌드 디렉터리를 만들고 (버전, Chroma 디렉터리) 반환
+
+        copy_current이면 현재 배포된 인덱스를 복사해서 시작한다 (다른 학기 컬렉션 유지).
+        """
+        base_version = self.current_version()
+        # 이름 순서가 만든 순서가 되도록 마이크로초까지 포함
+        version = f"{datetime.now().strftime('%Y%m%dT%H%M%S-%f')}-{uuid.uuid4().hex[:4]}"
+        directory = chroma_dir(version)
+        source = chroma_dir(base_version)
+        if copy_current and os.path.isdir(source):
+            shutil.copytree(source, directory)
+        else:
+            os.makedirs(directory)
+        _write_json(os.path.join(build_dir(version), BUILD_INFO), {
+            "version": version,
+            "base_version": base_version,
+            "created_at": datetime.now().isoformat(),
+            "published_at": None,
+        })
+        return version, directory
+
+    def publish(self, version, force=False):
+        """빌드를 현재 버전으로 배포 (포인터 파일을 원자적으로 교체)
+
+        빌드 시작 후 다른 버전이 배포되었으면 StaleBuild (force이면 그대로 배포, 롤백에 사용).
+        """
+        info = read_build_info(version)
+        if info is None:
+            raise ValueError(f"빌드를 찾을 수 없습니다: {version}")
+        current = self.current_version()
+        if not force and info["base_version"] != current:
+            raise StaleBuild(f"빌드 {version} 시작 후 {current}가 배포되었습니다. 다시 빌드하거나 index_registry.py publish로 직접 배포하세요.")
+        info["published_at"] = datetime.now().isoformat()
+        _write_json(os.path.join(build_dir(version), BUILD_INFO), info)
+        os.makedirs(INDEX_ROOT, exist_ok=True)
+        _write_json(self.pointer_path, {"version": version, "published_at": info["published_at"]})
+        print(f"[index] 인덱스 배포 완료: {current} → {version}")
+        return version
+
+    def discard(self, version):
+        """배포하지 않은 빌드 삭제"""
+        if version != self.current_version():
+            shutil.rmtree(build_dir(version), ignore_errors=True)
+
+    def hold(self, version):
+        """이 프로세스가 빌드를 열어 두었음을 기록 (prune이 지우지 않음)"""
+        if version == LEGACY_VERSION:
+            return
+        directory = os.path.join(build_dir(version), HOLDERS_DIR)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            open(os.path.join(directory, str(os.getpid())), "w").close()
+        except OSError as e:
+            print(f"[index] 빌드 사용 기록 실패 ({version}): {e}")
+
+    def release(self, version):
+        """hold 기록 삭제 (이 프로세스가 빌드를 닫음)"""
+        if version == LEGACY_VERSION:
+            return
+        try:
+            os.remove(os.path.join(build_dir(version), HOLDERS_DIR, str(os.getpid())))
+        except OSError:
+            pass
+
+    def prune(self, keep=INDEX_KEEP_BUILDS):
+        """현재 버전보다 오래된 빌드 중 최근 keep개만 남기고 삭제 (진행 중인 새 빌드는 건드리지 않음)
+
+        keep개를 넘는 빌드라도 아직 열어 둔 프로세스가 있으면(hold) 남겨 두고 다음 정리 때 다시 확인한다.
+        """
+        current = self.current_version()
+        if current == LEGACY_VERSION:
+            return []
+        older = [info["version"] for info in list_builds() if info["version"] < current]
+        removed = [version for version in older[:max(len(older) - keep, 0)] if not holders(version)]
+        for version in removed:
+            shutil.rmtree(build_dir(version), ignore_errors=True)
+        return removed
+
+
+indexes = IndexRegistry()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorDB 빌드 버전 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="빌드 목록")
+    publish_parser = subparsers.add_parser("publish", help="빌드 배포 (이전 빌드로 롤백)")
+    publish_parser.add_argument("version")
+    prune_parser = subparsers.add_parser("prune", help="오래된 빌드 삭제")
+    prune_parser.add_argument("--keep", type=int, default=INDEX_KEEP_BUILDS, help="남길 이전 빌드 수")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        current = indexes.current_version()
+        if current == LEGACY_VERSION:
+            print(f"* {LEGACY_VERSION} ({LEGACY_INDEX_DIR})")
+        for info in list_builds():
+            marker = "*" if info["version"] == current else " "
+            held = holders(info["version"])
+            print(f"{marker} {info['version']}  생성 {info['created_at']}  배포 {info['published_at'] or '-'}"
+                  + (f"  사용 중 pid {', '.join(map(str, held))}" if held else ""))
+    elif args.command == "publish":
+        indexes.publish(args.version, force=True)
+    else:
+        print(f"삭제한 빌드: {indexes.prune(args.keep) or '없음'}")
+
+
+if __name__ == "__main__":
+    main()
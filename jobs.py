@@ -0,0 +1,385 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+import requests
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Index, text
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+# 오래 걸리는 추천/일괄 추천을 위한 비동기 작업 큐
+# API는 작업을 SQLite 테이블에 넣고 작업 ID를 바로 반환하며, 별도 작업 프로세스가 대기 중인 작업을
+# 하나씩 가져가 실행하고 결과를 같은 테이블에 저장한다. 클라이언트는 작업 ID로 결과를 조회하거나
+# webhook_url로 완료 알림을 받는다. 동시에 실행되는 생성 작업 수는 작업 프로세스 수로 정해진다.
+# 사용 예: python jobs.py worker --processes 2
+#         python jobs.py status <작업 ID>
+
+JOBS_DATABASE_URL = os.getenv("JOBS_DATABASE_URL", "sqlite:///jobs.db")
+
+# API와 함께 띄울 작업 프로세스 수 (0이면 python jobs.py worker로 따로 실행)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# 대기 중인 작업이 이보다 많으면 새 작업을 받지 않음
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "1000"))
+
+# 완료된 작업 결과 보관 기간 (시간)
+JOB_RESULT_TTL_HOURS = float(os.getenv("JOB_RESULT_TTL_HOURS", "24"))
+
+# 대기 중인 작업이 없을 때 다시 확인하는 간격 (초)
+POLL_INTERVAL = 0.5
+
+WEBHOOK_TIMEOUT = 10
+WEBHOOK_RETRIES = 3
+
+# webhook을 보낼 수 있는 호스트 (쉼표로 구분, 정확히 일치해야 함). 비어 있으면 webhook을 받지 않고 조회만 허용
+# 클라이언트가 준 주소로 서버가 요청을 보내므로 내부 주소로 보내지 않도록 허용한 호스트만 받는다.
+JOB_WEBHOOK_ALLOWED_HOSTS = {
+    host.strip().lower() for host in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+}
+JOB_WEBHOOK_SCHEMES = {
+    scheme.strip().lower() for scheme in os.getenv("JOB_WEBHOOK_SCHEMES", "https").split(",") if scheme.strip()
+}
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+engine = create_engine(JOBS_DATABASE_URL, connect_args={"timeout": 30})
+Base = declarative_base()
+Session = sessionmaker(bind=engine)
+
+
+class Job(Base):
+    __tablename__ = "job"
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)  # HANDLERS의 키
+    status = Column(String(20), default=STATUS_QUEUED)
+    payload = Column(Text)  # 요청 본문 (JSON)
+    result = Column(Text)  # 응답 본문 (JSON)
+    error = Column(Text)
+    webhook_url = Column(String(500))
+    worker = Column(String(50))  # 실행한 작업 프로세스
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_job_status_created", "status", "created_at"),
+    )
+
+
+class QueueFull(RuntimeError):
+    """대기 중인 작업이 JOB_QUEUE_LIMIT에 도달함"""
+
+
+class InvalidWebhook(ValueError):
+    """허용하지 않은 webhook 주소 (JOB_WEBHOOK_ALLOWED_HOSTS/JOB_WEBHOOK_SCHEMES)"""
+
+
+def check_webhook_url(url):
+    """webhook 주소의 scheme과 호스트가 허용 목록에 있는지 확인 (아니면 InvalidWebhook)"""
+    if not JOB_WEBHOOK_ALLOWED_HOSTS:
+        raise InvalidWebhook("webhook을 사용할 수 없습니다. GET /api/jobs/{job_id}로 결과를 조회하세요.")
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        raise InvalidWebhook(f"올바르지 않은 webhook 주소입니다: {url}")
+    if parts.scheme.lower() not in JOB_WEBHOOK_SCHEMES:
+        raise InvalidWebhook(f"webhook 주소는 {', '.join(sorted(JOB_WEBHOOK_SCHEMES))}만 사용할 수 있습니다.")
+    if host not in JOB_WEBHOOK_ALLOWED_HOSTS:
+        raise InvalidWebhook(f"허용되지 않은 webhook 호스트입니다: {host or url}")
+
+
+class JobFailed(RuntimeError):
+    """작업 처리 중 클라이언트에 그대로 전달할 오류 (잘못된 요청 등)"""
+
+
+def init_jobs_db():
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("PRAGMA journal_mode=WAL"))
+
+
+# 작업 프로세스의 이벤트 루프. LLM 클라이언트(api.get_llm)의 비동기 연결 풀은 처음 사용한 루프에 묶이므로
+# 작업마다 asyncio.run으로 새 루프를 만들면 이전(닫힌) 루프의 연결을 재사용하다 실패한다.
+_loop = None
+
+
+def _run_async(coro):
+    """작업 프로세스의 이벤트 루프에서 코루틴 실행 (루프는 프로세스가 끝날 때까지 재사용)"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coro)
+
+
+def _close_loop():
+    global _loop
+    if _loop is not None and not _loop.is_closed():
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+        _loop.close()
+    _loop = None
+
+
+def _run_recommend(payload):
+    from fastapi import HTTPException
+    import api
+    try:
+        return _run_async(api.recommend_courses(api.Query(**payload)))
+    except HTTPException as e:
+        raise JobFailed(e.detail)
+
+
+def _run_recommend_batch(payload):
+    from fastapi import HTTPException
+    import api
+    try:
+        return _run_async(api.recommend_courses_batch(api.BatchQuery(**payload)))
+    except HTTPException as e:
+        raise JobFailed(e.detail)
+
+
+# 작업 종류별 처리 함수 (payload dict → 결과 dict)
+HANDLERS = {
+    "recommend": _run_recommend,
+    "recommend_batch": _run_recommend_batch,
+}
+
+
+def job_to_dict(job, include_result=True):
+    data = {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if include_result and job.status == STATUS_DONE:
+        data["result"] = json.loads(job.result) if job.result else None
+    if job.status == STATUS_FAILED:
+        data["error"] = job.error
+    return data
+
+
+def submit_job(kind, payload, webhook_url=None):
+    """작업을 대기열에 추가하고 작업 정보 반환 (대기열이 가득 차면 QueueFull, webhook_url이 허용되지 않으면 InvalidWebhook)"""
+    if kind not in HANDLERS:
+        raise ValueError(f"알 수 없는 작업 종류입니다: {kind}")
+    if webhook_url:
+        check_webhook_url(webhook_url)
+    session = Session()
+    try:
+        queued = session.query(Job).filter(Job.status == STATUS_QUEUED).count()
+        if queued >= JOB_QUEUE_LIMIT:
+            raise QueueFull(f"대기 중인 작업이 너무 많습니다 ({queued}개). 잠시 후 다시 시도해주세요.")
+        job = Job(id=uuid.uuid4().hex, kind=kind, status=STATUS_QUEUED,
+                  payload=json.dumps(payload, ensure_ascii=False), webhook_url=webhook_url)
+        session.add(job)
+        session.commit()
+        return job_to_dict(job)
+    finally:
+        session.close()
+
+
+def get_job(job_id):
+    """작업 정보 (없으면 None)"""
+    session = Session()
+    try:
+        job = session.get(Job, job_id)
+        return job_to_dict(job) if job is not None else None
+    finally:
+        session.close()
+
+
+def queue_position(job_id):
+    """대기 중인 작업 앞에 남은 작업 수 (대기 중이 아니면 None)"""
+    session = Session()
+    try:
+        job = session.get(Job, job_id)
+        if job is None or job.status != STATUS_QUEUED:
+            return None
+        return session.query(Job).filter(Job.status == STATUS_QUEUED, Job.created_at < job.created_at).count()
+    finally:
+        session.close()
+
+
+def claim_next_job(worker_name):
+    """가장 오래된 대기 작업을 실행 중으로 바꾸고 (id, kind, payload) 반환 (없으면 None)
+
+    조건부 UPDATE로 가져가므로 여러 프로세스가 동시에 호출해도 한 작업은 한 프로세스만 가져간다.
+    """
+    with engine.begin() as connection:
+        row = connection.execute(text(
+            "SELECT id FROM job WHERE status = :queued ORDER BY created_at LIMIT 1"
+        ), {"queued": STATUS_QUEUED}).first()
+        if row is None:
+            return None
+        claimed = connection.execute(text(
+            "UPDATE job SET status = :running, worker = :worker, started_at = :now "
+            "WHERE id = :id AND status = :queued"
+        ), {"running": STATUS_RUNNING, "worker": worker_name, "now": datetime.now(),
+            "id": row.id, "queued": STATUS_QUEUED})
+        if claimed.rowcount != 1:
+            return None
+        job = connection.execute(text("SELECT id, kind, payload FROM job WHERE id = :id"), {"id": row.id}).first()
+        return job.id, job.kind, json.loads(job.payload)
+
+
+def finish_job(job_id, result=None, error=None):
+    """작업 결과 저장 후 webhook_url이 있으면 알림"""
+    session = Session()
+    try:
+        job = session.get(Job, job_id)
+        job.status = STATUS_FAILED if error is not None else STATUS_DONE
+        job.result = json.dumps(result, ensure_ascii=False) if result is not None else None
+        job.error = error
+        job.finished_at = datetime.now()
+        session.commit()
+        webhook_url = job.webhook_url
+        data = job_to_dict(job)
+    finally:
+        session.close()
+    if webhook_url:
+        notify_webhook(webhook_url, data)
+
+
+def notify_webhook(url, data):
+    # 등록 뒤 허용 목록이 바뀌었을 수 있으므로 보내기 전에 다시 확인
+    try:
+        check_webhook_url(url)
+    except InvalidWebhook as e:
+        print(f"[jobs] webhook을 보내지 않습니다: {e}")
+        return False
+    for attempt in range(1, WEBHOOK_RETRIES + 1):
+        try:
+            # 리다이렉트로 허용하지 않은 주소에 보내지 않도록 따라가지 않음
+            response = requests.post(url, json=data, timeout=WEBHOOK_TIMEOUT, allow_redirects=False)
+            if response.status_code < 500:
+                return True
+        except requests.RequestException as e:
+            print(f"[jobs] webhook 전송 실패 ({attempt}/{WEBHOOK_RETRIES}): {e}")
+        time.sleep(attempt)
+    return False
+
+
+def requeue_interrupted_jobs():
+    """이전 실행에서 처리 중에 멈춘 작업을 다시 대기 상태로 (작업 프로세스를 새로 띄울 때 호출)"""
+    with engine.begin() as connection:
+        result = connection.execute(text(
+            "UPDATE job SET status = :queued, worker = NULL, started_at = NULL WHERE status = :running"
+        ), {"queued": STATUS_QUEUED, "running": STATUS_RUNNING})
+        return result.rowcount
+
+
+def purge_old_jobs(ttl_hours=JOB_RESULT_TTL_HOURS):
+    """보관 기간이 지난 완료/실패 작업 삭제"""
+    cutoff = datetime.now() - timedelta(hours=ttl_hours)
+    with engine.begin() as connection:
+        result = connection.execute(text(
+            "DELETE FROM job WHERE status IN (:done, :failed) AND finished_at < :cutoff"
+        ), {"done": STATUS_DONE, "failed": STATUS_FAILED, "cutoff": cutoff})
+        return result.rowcount
+
+
+def run_job(job_id, kind, payload):
+    try:
+        result = HANDLERS[kind](payload)
+    except JobFailed as e:
+        finish_job(job_id, error=str(e))
+    except Exception as e:
+        print(f"[jobs] 작업 {job_id} 처리 중 오류 발생: {e}")
+        finish_job(job_id, error=f"서버 오류가 발생했습니다: {e}")
+    else:
+        finish_job(job_id, result=result)
+
+
+def worker_loop(worker_name, stop_event=None):
+    """대기 작업을 하나씩 가져와 실행 (stop_event가 설정되면 현재 작업을 마치고 종료)"""
+    init_jobs_db()
+    last_purge = 0.0
+    _run_async(asyncio.sleep(0))  # 이 프로세스에서 모든 작업이 함께 쓸 이벤트 루프 생성
+    try:
+        while stop_event is None or not stop_event.is_set():
+            if time.monotonic() - last_purge > 3600:
+                purge_old_jobs()
+                last_purge = time.monotonic()
+            claimed = claim_next_job(worker_name)
+            if claimed is None:
+                if stop_event is not None:
+                    stop_event.wait(POLL_INTERVAL)
+                else:
+                    time.sleep(POLL_INTERVAL)
+                continue
+            run_job(*claimed)
+    finally:
+        _close_loop()
+
+
+class WorkerPool:
+    """작업 프로세스 묶음 (spawn으로 띄워 API 프로세스의 상태를 물려받지 않음)"""
+
+    def __init__(self, processes=JOB_WORKERS):
+        self.processes = processes
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._workers = []
+
+    def start(self):
+        init_jobs_db()
+        requeued = requeue_interrupted_jobs()
+        if requeued:
+            print(f"[jobs] 중단된 작업 {requeued}개를 다시 대기열에 넣었습니다.")
+        for i in range(self.processes):
+            worker = self._context.Process(
+                target=worker_loop, args=(f"worker-{os.getpid()}-{i}", self._stop), daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout=30):
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 작업 큐")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    worker_parser = subparsers.add_parser("worker", help="작업 프로세스 실행")
+    worker_parser.add_argument("--processes", type=int, default=max(JOB_WORKERS, 1), help="작업 프로세스 수")
+    status_parser = subparsers.add_parser("status", help="작업 상태 조회")
+    status_parser.add_argument("job_id")
+    subparsers.add_parser("purge", help="보관 기간이 지난 작업 삭제")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        pool = WorkerPool(args.processes)
+        pool.start()
+        print(f"작업 프로세스 {args.processes}개 실행 중 (Ctrl+C로 종료)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pool.stop()
+    elif args.command == "status":
+        init_jobs_db()
+        print(json.dumps(get_job(args.job_id), ensure_ascii=False, indent=2))
+    else:
+        init_jobs_db()
+        print(f"삭제한 작업: {purge_old_jobs()}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# 기본 히스토그램 버킷 (초 단위)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 요청 단위 단계별 소요 시간 (Server-Timing 헤더용)
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _format_labels(labelnames, values):
+    if not labelnames:
+        return ""
+    pairs = []
+    for name, value in zip(labelnames, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 레이블이 일치하지 않습니다 ({sorted(labels)} != {sorted(self.labelnames)})")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._render_samples())
+        return "\n".join(lines)
+
+    def _render_samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("카운터는 감소할 수 없습니다.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0)]
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """현재 값 (증가/감소 가능)"""
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0)]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램"""
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _render_samples(self):
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._values.items())
+        lines = []
+        for key, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """메트릭 등록 및 Prometheus 텍스트 포맷 출력"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"이미 등록된 메트릭입니다: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 추천 파이프라인 메트릭
+RECOMMEND_REQUESTS = REGISTRY.register(Counter(
+    "recommend_requests", "추천 요청 수", ("status",)))
+# 새로 실행하지 않고 이미 있는 결과로 응답한 요청 수. 응답 캐시는 없으므로 지금은 실행 중인 같은 요청의
+# 결과를 받은 경우(recommend_coalesced)와 같고, 결과를 재사용하는 경로가 생기면 그곳에서도 늘린다.
+RECOMMEND_CACHE_HITS = REGISTRY.register(Counter(
+    "recommend_cache_hits", "새로 실행하지 않고 이미 있는 결과로 응답한 추천 요청 수"))
+RECOMMEND_COALESCED = REGISTRY.register(Counter(
+    "recommend_coalesced", "실행 중인 같은 요청의 결과를 함께 받은 추천 요청 수"))
+BATCH_QUESTIONS = REGISTRY.register(Counter(
+    "recommend_batch_questions", "일괄 추천 요청으로 받은 질문 수", ("path",)))
+RETRIEVED_HITS = REGISTRY.register(Counter(
+    "recommend_retrieved_hits", "벡터 검색으로 가져온 청크 수"))
+PROMPT_TOKENS = REGISTRY.register(Counter(
+    "recommend_prompt_tokens", "LLM에 전달한 프롬프트 토큰 수"))
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "recommend_request_duration_seconds", "추천 요청 전체 소요 시간"))
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "recommend_stage_duration_seconds", "추천 파이프라인 단계별 소요 시간", ("stage",)))
+
+# 요청 수락 제어 메트릭 (admission.py)
+ADMISSION_IN_FLIGHT = REGISTRY.register(Gauge(
+    "recommend_admission_in_flight", "실행 중인 추천 요청 수"))
+ADMISSION_QUEUED = REGISTRY.register(Gauge(
+    "recommend_admission_queued", "실행 자리를 기다리는 추천 요청 수"))
+ADMISSION_REJECTED = REGISTRY.register(Counter(
+    "recommend_admission_rejected", "받지 않은 추천 요청 수", ("reason",)))
+ADMISSION_WAIT = REGISTRY.register(Histogram(
+    "recommend_admission_wait_seconds", "추천 요청이 실행 자리를 기다린 시간"))
+
+
+def start_request_timings():
+    """현재 요청의 단계별 소요 시간 기록 시작"""
+    timings = []
+    _request_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def span(stage):
+    """단계 소요 시간을 측정하여 히스토그램과 요청별 기록에 남김"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.observe(elapsed, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+def format_server_timing(timings):
+    """Server-Timing 헤더 값 생성 (dur은 밀리초)"""
+    return ", ".join(f"{stage};dur={elapsed * 1000:.1f}" for stage, elapsed in timings)
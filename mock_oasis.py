@@ -0,0 +1,170 @@
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+# 크롤러 테스트용 로컬 목 서버 (강의 목록 조회 + UbiGateway)
+# 사용 예: python mock_oasis.py --port 8765 --courses 200 --latency 0.2
+#         python test_2.py --base-url http://127.0.0.1:8765 --workers 8 --rps 20
+
+COURSE_LIST_PATH = "/uni/uni/cour/less/findLessSubjtTblInq.action"
+UBI_GATEWAY_PATH = "/com/UbiGateway"
+NEXACRO_NS = "http://www.nexacro.com/platform/dataset"
+FAKE_PDF = b"%PDF-1.4\n% mock syllabus\n%%EOF\n"
+
+
+def build_course_list_xml(n_courses):
+    """GRD_COUR001 Dataset을 담은 Nexacro 응답 생성"""
+    rows = []
+    for i in range(n_courses):
+        rows.append(
+            "<Row>"
+            f'<Col id="SBJTCD">{i:010d}</Col>'
+            f'<Col id="CLSS">{i % 3 + 1}</Col>'
+            f'<Col id="SBJTNM">모의강의 {i}</Col>'
+            '<Col id="COLG_NM">공과대학</Col>'
+            '<Col id="MAJR_NM">컴퓨터공학부</Col>'
+            '<Col id="SBJT_DIV_NM">전공선택</Col>'
+            "</Row>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<Root xmlns="{NEXACRO_NS}">'
+        '<Dataset id="GRD_COUR001"><ColumnInfo /><Rows>'
+        + "".join(rows)
+        + "</Rows></Dataset></Root>"
+    ).encode("utf-8")
+
+
+def build_report_xml(subject_name, professor="홍길동", rows_per_section=6):
+    """UbiReport 1단계 응답과 같은 구조(UbiTextItem 좌표 배치)의 XML 생성"""
+    items = []
+    y = 10
+
+    def add_row(texts):
+        nonlocal y
+        for col, text in enumerate(texts):
+            items.append(
+                f'<Item classname="UbiTextItem" x="{20 + col * 150}" y="{y + col % 2}">'
+                f"<Text>{escape(text)}</Text></Item>"
+            )
+        y += 24
+
+    add_row(["교과목명", subject_name, "담당교수", professor])
+    for i in range(rows_per_section):
+        add_row([f"기본항목{i}", f"값 {i}", f"기본항목{i}_2", f"값 {i}_2"])
+    add_row(["교수정보"])
+    add_row(["연구실", "공과대학 7호관 534", "상담가능시간", "화 3-4교시"])
+    add_row(["강의정보"])
+    add_row(["요일/시간", "화 1-A,화 1-B,목 3-A", "강의실", "공과대학 7호관 204"])
+    add_row(["평가방법", "상대평가Ⅰ(A40%)", "평가기준", "절대평가 기준"])
+    add_row(["평가계획", "중간고사", "30%", "기말고사", "30%", "출석", "10%", "과제", "30%"])
+    add_row(["평가참고사항", "없음"])
+    add_row(["교재정보"])
+    add_row(["주교재", "모의 교재", "참고자료", "모의 참고자료"])
+    add_row(["핵심역량"])
+    add_row(["소통", "20", "창의", "30", "인성", "10", "실무", "30", "도전", "10"])
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><UbiReport><Page>'
+        + "".join(items)
+        + "</Page></UbiReport>"
+    ).encode("utf-8")
+
+
+class MockState:
+    def __init__(self, n_courses, latency):
+        self.n_courses = n_courses
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = time.monotonic()
+
+    def enter(self):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        return (f"요청 수: {self.requests}, 최대 동시 요청: {self.max_in_flight}, "
+                f"평균 초당 요청: {self.requests / elapsed if elapsed else 0:.2f}")
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, body, content_type, headers=None):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _handle(self, params):
+            state.enter()
+            try:
+                if state.latency:
+                    time.sleep(state.latency)
+                path = urlparse(self.path).path
+                if path == COURSE_LIST_PATH:
+                    self._send(build_course_list_xml(state.n_courses), "text/xml;charset=UTF-8")
+                elif path == UBI_GATEWAY_PATH and params.get("reqtype") == "0":
+                    key = params.get("key", "")
+                    self._send(build_report_xml(f"모의강의 {key[-4:]}"), "text/xml;charset=UTF-8",
+                               {"exportseq": "1"})
+                elif path == UBI_GATEWAY_PATH:
+                    self._send(FAKE_PDF, "application/pdf")
+                else:
+                    self.send_error(404)
+            finally:
+                state.leave()
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length).decode("utf-8", errors="replace")
+            params = {k: v[0] for k, v in parse_qs(body).items()}
+            self._handle(params)
+
+        def do_GET(self):
+            params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            self._handle(params)
+
+    return Handler
+
+
+def run_server(port=8765, n_courses=50, latency=0.1):
+    """목 서버 실행 (Ctrl+C로 종료 시 요청 통계 출력)"""
+    state = MockState(n_courses, latency)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    print(f"목 서버 실행 중: http://127.0.0.1:{port} (강의 {n_courses}개, 지연 {latency}초)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(state.summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="크롤러 테스트용 로컬 목 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--courses", type=int, default=50, help="강의 목록에 포함할 강의 수")
+    parser.add_argument("--latency", type=float, default=0.1, help="요청별 인위적 지연 (초)")
+    args = parser.parse_args()
+    run_server(args.port, args.courses, args.latency)
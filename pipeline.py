@@ -0,0 +1,402 @@
+import argparse
+import hashlib
+import queue
+import threading
+import time
+from sqlalchemy.orm import sessionmaker
+from crawl_journal import CrawlJournal
+from data_processor import engine, init_db, build_course, upsert_course, missing_fields, term_id
+from terms import register_term
+from course_features import precompute_features
+from similarity_graph import precompute_similarity
+from test_2 import OasisClient, iter_course_list, prefetch_course_list, request_syllabus_report, generate_key, batched
+from ubireport_parser import parse_report
+from vector_store import get_vector_store, get_course_vector_store, build_course_document, index_course_documents, close_directory
+from index_registry import indexes, chroma_dir, StaleBuild
+
+# 크롤링 → 파싱 → 정규화/DB 저장 → 청크 임베딩을 한 번에 처리하는 스트리밍 파이프라인
+# 사용 예: python pipeline.py --fetch-workers 4 --parse-workers 2 --rps 2
+#
+# 단계 사이는 크기가 제한된 큐로 연결되어 있어 뒤 단계가 밀리면 앞 단계가 put()에서 멈춘다.
+# DB 저장과 임베딩은 각각 한 스레드만 담당하므로 SQLite/Chroma에 동시에 쓰지 않는다.
+# 임베딩은 현재 배포된 인덱스를 복사한 새 빌드 디렉터리에 쓰고, publish_interval초마다(그리고 끝날 때)
+# 배포한다. 실행 중인 API는 배포 전까지 이전 인덱스를 읽고, 배포된 강의는 몇 분 안에 검색된다.
+# 저널의 완료 표시는 배포 후에 기록한다. 그사이 다른 빌드가 배포되었으면(StaleBuild) 새 빌드에 다시 반영한다.
+
+# 다른 빌드와 배포가 겹쳤을 때 새 빌드에 다시 반영해 배포를 시도하는 횟수
+PUBLISH_RETRIES = 3
+
+# 단계 종료 표시
+_DONE = object()
+
+
+class PipelineStats:
+    """단계별 처리 건수 (진행 상황 출력용)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+class Stage:
+    """입력 큐에서 항목을 꺼내 handler로 처리하는 작업 스레드 묶음
+
+    handler가 반환한 값은 (None이 아니면) 출력 큐에 넣는다. 모든 작업 스레드가
+    종료 표시를 받으면 마지막 스레드가 다음 단계 작업 수만큼 종료 표시를 전달한다.
+    """
+
+    def __init__(self, name, handler, workers, in_queue, out_queue=None, downstream_workers=1):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.downstream_workers = downstream_workers
+        self._remaining = self.workers
+        self._lock = threading.Lock()
+        self.threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def _run(self):
+        try:
+            while True:
+                item = self.in_queue.get()
+                if item is _DONE:
+                    break
+                try:
+                    result = self.handler(item)
+                except Exception as e:
+                    print(f"[{self.name}] 처리 중 오류 발생: {e}")
+                    continue
+                if result is not None and self.out_queue is not None:
+                    self.out_queue.put(result)
+        finally:
+            with self._lock:
+                self._remaining -= 1
+                last = self._remaining == 0
+            if last and self.out_queue is not None:
+                for _ in range(self.downstream_workers):
+                    self.out_queue.put(_DONE)
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+
+class SyllabusPipeline:
+    """강의 목록을 받는 대로 강의계획서를 가져와 검색 가능한 상태까지 반영"""
+
+    def __init__(self, client, journal, year, semester_code, entrance_year="2017",
+                 fetch_workers=4, parse_workers=2, queue_size=32, embed_batch=32,
+                 flush_interval=10.0, publish_interval=60.0, recrawl_changed=False):
+        self.client = client
+        self.journal = journal
+        self.year = year
+        self.semester_code = semester_code
+        self.term = term_id(year, semester_code)
+        self.entrance_year = entrance_year
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.embed_batch = embed_batch
+        self.flush_interval = flush_interval
+        self.publish_interval = publish_interval
+        self.recrawl_changed = recrawl_changed
+        self.stats = PipelineStats()
+        self.plan_totals = {}
+
+        # 단계 사이 큐 (크기 제한으로 back-pressure 적용)
+        self.fetch_queue = queue.Queue(maxsize=queue_size)
+        self.parse_queue = queue.Queue(maxsize=queue_size)
+        self.store_queue = queue.Queue(maxsize=queue_size)
+        self.embed_queue = queue.Queue(maxsize=queue_size)
+
+        init_db()
+        register_term(year, semester_code)
+        self.Session = sessionmaker(bind=engine)
+        self.session = None
+        self.vectorstore = None
+        self.course_store = None
+        self.build_version = None
+        self.build_started = None
+        self.indexed = []  # 빌드에 반영했지만 아직 배포하지 않은 (course, document, content_hash)
+
+    # 1. 강의 목록 (저널에서 이미 완료된 강의는 제외)
+    def produce(self):
+        try:
+            # fetch_queue가 차서 멈춰도 목록 응답은 끝까지 받아 연결을 닫음
+            courses = prefetch_course_list(
+                iter_course_list(self.year, self.semester_code, self.entrance_year, client=self.client)
+            )
+            for batch in batched(courses, 50):
+                to_crawl, stats = self.journal.plan(batch, recrawl_changed=self.recrawl_changed)
+                for name, count in stats.items():
+                    self.plan_totals[name] = self.plan_totals.get(name, 0) + count
+                self.stats.inc("listed", len(batch))
+                for course in to_crawl:
+                    self.fetch_queue.put(course)
+        except Exception as e:
+            print(f"강의 목록 처리 중 오류 발생: {e}")
+        finally:
+            for _ in range(self.fetch_workers):
+                self.fetch_queue.put(_DONE)
+
+    # 2. 1단계 보고서 요청
+    def fetch(self, course):
+        content, _ = request_syllabus_report(
+            self.year, self.semester_code, course["subject_code"], course["class_number"],
+            generate_key(), client=self.client
+        )
+        if not content:
+            self.journal.mark_failed(course, "보고서 응답 없음")
+            self.stats.inc("fetch_failed")
+            return None
+        self.stats.inc("fetched")
+        return course, content
+
+    # 3. 보고서 파싱
+    def parse(self, item):
+        course, content = item
+        data = parse_report(content)
+        if not data:
+            self.journal.mark_failed(course, "보고서 파싱 실패")
+            self.stats.inc("parse_failed")
+            return None
+        self.stats.inc("parsed")
+        return course, data, hashlib.sha256(content).hexdigest()
+
+    # 4. 정규화 및 DB 저장 (단일 스레드)
+    def store(self, item):
+        course, data, content_hash = item
+        if self.session is None:
+            self.session = self.Session()
+        try:
+            record = build_course(data, term=self.term, listing=course)
+            # 강의 목록의 과목코드/분반이 보고서 값보다 정확하므로 우선 사용
+            record.subject_code = course["subject_code"] or record.subject_code
+            record.class_number = course["class_number"] or record.class_number
+            missing = missing_fields(record)
+            if missing:
+                # 빈 강의를 저장/임베딩하지 않고 저널에 실패로 남김 (보고서 형식이 바뀐 경우 REPORT_LABELS 확인)
+                self.journal.mark_failed(course, f"정규화 실패: 빈 항목 {', '.join(missing)}")
+                self.stats.inc("invalid")
+                return None
+            record = upsert_course(self.session, record)
+            self.session.commit()
+            document = build_course_document(record)
+        except Exception as e:
+            self.session.rollback()
+            self.journal.mark_failed(course, f"DB 저장 실패: {e}")
+            self.stats.inc("store_failed")
+            return None
+        self.stats.inc("stored")
+        return course, document, content_hash
+
+    # 5. 청크 임베딩 (단일 스레드, embed_batch개가 모이거나 flush_interval이 지나면 반영)
+    def embed(self):
+        batch = []
+        deadline = None
+        done = False
+        while not done:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.embed_queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _DONE:
+                done = True
+            elif item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch and (done or len(batch) >= self.embed_batch or time.monotonic() >= deadline):
+                self._flush_embeddings(batch)
+                batch = []
+                deadline = None
+
+    def _open_build(self):
+        self.build_version, directory = indexes.start_build()
+        self.build_started = time.monotonic()
+        self.vectorstore = get_vector_store(self.term, directory)
+        self.course_store = get_course_vector_store(self.term, directory)
+
+    def _close_build(self, discard=False):
+        if self.build_version is not None:
+            close_directory(chroma_dir(self.build_version))
+        if discard and self.build_version is not None:
+            indexes.discard(self.build_version)
+        self.build_version = None
+        self.build_started = None
+        self.vectorstore = None
+        self.course_store = None
+
+    def _flush_embeddings(self, batch):
+        if self.vectorstore is None:
+            self._open_build()
+        try:
+            chunk_count = index_course_documents(self.vectorstore, [document for _, document, _ in batch],
+                                                 course_store=self.course_store)
+        except Exception as e:
+            print(f"[embed] 임베딩 중 오류 발생: {e}")
+            for course, _, _ in batch:
+                self.journal.mark_failed(course, f"임베딩 실패: {e}")
+            self.stats.inc("embed_failed", len(batch))
+            return
+        self.indexed.extend(batch)
+        self.stats.inc("indexed", len(batch))
+        print(f"[embed] 강의 {len(batch)}개 ({chunk_count}개 청크) 빌드에 반영")
+        if time.monotonic() - self.build_started >= self.publish_interval:
+            self.publish()
+
+    def run(self, progress_interval=30.0):
+        stages = [
+            Stage("fetch", self.fetch, self.fetch_workers, self.fetch_queue, self.parse_queue,
+                  downstream_workers=self.parse_workers),
+            Stage("parse", self.parse, self.parse_workers, self.parse_queue, self.store_queue),
+            Stage("store", self.store, 1, self.store_queue, self.embed_queue),
+        ]
+        producer = threading.Thread(target=self.produce, name="list", daemon=True)
+        embedder = threading.Thread(target=self.embed, name="embed", daemon=True)
+
+        start = time.perf_counter()
+        producer.start()
+        for item in stages:
+            item.start()
+        embedder.start()
+
+        try:
+            while embedder.is_alive():
+                embedder.join(timeout=progress_interval)
+                if embedder.is_alive():
+                    print(f"진행 상황: {self.stats.snapshot()} / 대기열: "
+                          f"fetch {self.fetch_queue.qsize()}, parse {self.parse_queue.qsize()}, "
+                          f"store {self.store_queue.qsize()}, embed {self.embed_queue.qsize()}")
+            producer.join()
+            for item in stages:
+                item.join()
+            if self.session is not None:
+                self.session.close()
+            self.publish()
+        finally:
+            # 배포에 실패해도 DB에 저장된 강의의 특성 표와 배포된 인덱스의 유사도 그래프는 갱신
+            if self.stats.snapshot().get("stored"):
+                precompute_features(self.term)
+            if self.stats.snapshot().get("indexed"):
+                precompute_similarity(self.term)
+        return time.perf_counter() - start
+
+    def publish(self):
+        """빌드를 배포하고 반영된 강의를 저널에 완료로 기록 (반영된 강의가 없으면 빌드 삭제)
+
+        빌드를 시작한 뒤 다른 빌드가 배포되었으면, 그 빌드를 복사한 새 빌드에 반영한 강의를 다시 넣고
+        PUBLISH_RETRIES번까지 다시 배포한다. 끝내 배포하지 못한 강의는 저널에 실패로 기록해 다음 실행에서
+        다시 처리한다. 다음 반영은 방금 배포한 인덱스를 복사한 새 빌드에서 시작한다.
+        """
+        if self.build_version is None:
+            return
+        if not self.indexed:
+            self._close_build(discard=True)
+            return
+        error = None
+        for attempt in range(PUBLISH_RETRIES + 1):
+            try:
+                self.vectorstore.persist()
+                indexes.publish(self.build_version)
+                error = None
+                break
+            except StaleBuild as e:
+                error = e
+                if attempt == PUBLISH_RETRIES:
+                    break
+                print(f"[embed] {e} 새 빌드에 강의 {len(self.indexed)}개를 다시 반영합니다.")
+                self._close_build(discard=True)
+                try:
+                    self._open_build()
+                    index_course_documents(self.vectorstore, [document for _, document, _ in self.indexed],
+                                           course_store=self.course_store)
+                except Exception as e:
+                    error = e
+                    break
+            except Exception as e:
+                error = e
+                break
+        if error is not None:
+            print(f"[embed] 배포 실패: {error}")
+            for course, _, _ in self.indexed:
+                self.journal.mark_failed(course, f"배포 실패: {error}")
+            self.stats.inc("publish_failed", len(self.indexed))
+            self.indexed = []
+            self._close_build(discard=True)
+            return
+        for course, _, content_hash in self.indexed:
+            self.journal.mark_done(course, content_hash=content_hash)
+        self.stats.inc("published", len(self.indexed))
+        self.indexed = []
+        self._close_build()
+        indexes.prune()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="강의계획서 크롤링부터 VectorDB 반영까지 한 번에 실행")
+    parser.add_argument("--year", default="2025", help="기준 연도")
+    parser.add_argument("--semester-code", default="U211600010", help="학기 코드")
+    parser.add_argument("--entrance-year", default="2017", help="입학년도 (필터링용)")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="보고서 요청 작업 수")
+    parser.add_argument("--parse-workers", type=int, default=2, help="보고서 파싱 작업 수")
+    parser.add_argument("--rps", type=float, default=2.0, help="초당 최대 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--base-url", default=None, help="서버 주소 (로컬 목 서버 테스트용)")
+    parser.add_argument("--queue-size", type=int, default=32, help="단계 사이 대기열 최대 크기")
+    parser.add_argument("--embed-batch", type=int, default=32, help="한 번에 임베딩할 강의 수")
+    parser.add_argument("--flush-interval", type=float, default=10.0, help="임베딩 배치를 채우지 못해도 반영하는 간격 (초)")
+    parser.add_argument("--publish-interval", type=float, default=60.0, help="반영한 강의를 검색 가능하게 배포하는 간격 (초)")
+    parser.add_argument("--journal", default="crawl_journal.db", help="크롤링 저널(SQLite) 경로")
+    parser.add_argument("--recrawl-changed", action="store_true", help="완료된 강의 중 목록 항목이 바뀐 강의만 다시 처리")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    client = OasisClient(base_url=args.base_url, requests_per_second=args.rps,
+                         pool_size=max(args.fetch_workers, 1) * 2)
+    journal = CrawlJournal(args.journal)
+    pipeline = SyllabusPipeline(
+        client, journal, args.year, args.semester_code, args.entrance_year,
+        fetch_workers=args.fetch_workers,
+        parse_workers=args.parse_workers,
+        queue_size=args.queue_size,
+        embed_batch=args.embed_batch,
+        flush_interval=args.flush_interval,
+        publish_interval=args.publish_interval,
+        recrawl_changed=args.recrawl_changed
+    )
+
+    print("==== 강의계획서 파이프라인 ====")
+    print(f"학기: {pipeline.term}, 서버 주소: {client.base_url}")
+    print(f"작업 수: fetch {args.fetch_workers}, parse {args.parse_workers}, 대기열 크기: {args.queue_size}")
+    print("==============================\n")
+
+    elapsed = pipeline.run()
+    totals = pipeline.plan_totals
+    if totals:
+        print(f"처리 계획: 신규 {totals['new']}, 재개 {totals['resumed']}, 재시도 {totals['retry']}, "
+              f"변경됨 {totals['changed']}, 건너뜀 {totals['skipped']}")
+    print(f"처리 결과: {pipeline.stats.snapshot()}")
+    print(f"저널 상태: {journal.summary(args.year, args.semester_code)}")
+    print(f"소요 시간: {elapsed:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import cProfile
+import linecache
+import os
+import pstats
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+
+def default_profile_dir(job_name):
+    """프로파일 결과 기본 저장 경로 (profiles/<작업명>_<시각>)"""
+    return os.path.join("profiles", f"{job_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+
+def stage(profiler, name):
+    """프로파일러가 있으면 단계 측정, 없으면 아무 것도 하지 않는 컨텍스트"""
+    return profiler.stage(name) if profiler is not None else nullcontext()
+
+
+class StageProfiler:
+    """배치 작업의 단계별 cProfile/tracemalloc 측정
+
+    단계마다 별도의 cProfile 결과를 모으고, 메모리는 매 호출마다 순증가량과
+    최대 사용량을 기록하며 snapshot_interval 번마다 스냅샷 비교로 할당 위치를 집계한다.
+    finish()를 호출하면 다음 파일을 output_dir에 쓴다.
+    - <단계>.prof : pstats 형식 (snakeviz, gprof2dot 등에서 사용)
+    - profile.collapsed : flamegraph.pl / speedscope 에서 읽을 수 있는 collapsed stack
+    - report.txt : 단계별 요약과 상위 N개 할당 위치
+    """
+
+    def __init__(self, output_dir, top_n=20, snapshot_interval=50, traceback_limit=10):
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.snapshot_interval = snapshot_interval
+        self._profiles = {}
+        self._calls = defaultdict(int)
+        self._wall_time = defaultdict(float)
+        self._net_alloc = defaultdict(int)
+        self._peak_alloc = defaultdict(int)
+        self._alloc_by_line = defaultdict(lambda: defaultdict(int))
+        self._started_tracemalloc = False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(traceback_limit)
+            self._started_tracemalloc = True
+
+    @contextmanager
+    def stage(self, name):
+        profile = self._profiles.get(name)
+        if profile is None:
+            profile = self._profiles[name] = cProfile.Profile()
+
+        self._calls[name] += 1
+        take_snapshot = (self._calls[name] - 1) % self.snapshot_interval == 0
+        before = tracemalloc.take_snapshot() if take_snapshot else None
+        current_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._wall_time[name] += time.perf_counter() - start
+            current_after, peak = tracemalloc.get_traced_memory()
+            self._net_alloc[name] += current_after - current_before
+            self._peak_alloc[name] = max(self._peak_alloc[name], peak - current_before)
+            if before is not None:
+                after = tracemalloc.take_snapshot()
+                for diff in after.compare_to(before, "lineno"):
+                    if diff.size_diff > 0:
+                        frame = diff.traceback[0]
+                        self._alloc_by_line[name][(frame.filename, frame.lineno)] += diff.size_diff
+
+    def finish(self):
+        """측정 결과를 파일로 저장하고 저장 경로 반환"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        collapsed_lines = []
+        for name, profile in self._profiles.items():
+            profile.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+            collapsed_lines.extend(_collapse_stacks(name, pstats.Stats(profile).stats))
+
+        with open(os.path.join(self.output_dir, "profile.collapsed"), "w", encoding="utf-8") as f:
+            f.write("\n".join(collapsed_lines) + "\n")
+
+        with open(os.path.join(self.output_dir, "report.txt"), "w", encoding="utf-8") as f:
+            f.write(self._format_report())
+
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        print(f"프로파일 결과 저장됨: {self.output_dir}")
+        return self.output_dir
+
+    def _format_report(self):
+        lines = ["단계별 요약", "=" * 80]
+        lines.append(f"{'단계':<24}{'호출 수':>10}{'시간(s)':>12}{'순증가(KiB)':>16}{'최대(KiB)':>14}")
+        for name in self._profiles:
+            lines.append(
+                f"{name:<24}{self._calls[name]:>10}{self._wall_time[name]:>12.3f}"
+                f"{self._net_alloc[name] / 1024:>16.1f}{self._peak_alloc[name] / 1024:>14.1f}"
+            )
+
+        for name in self._profiles:
+            lines.append("")
+            lines.append(f"[{name}] 상위 {self.top_n}개 할당 위치 (샘플 간격: {self.snapshot_interval}회)")
+            lines.append("-" * 80)
+            top = sorted(self._alloc_by_line[name].items(), key=lambda item: item[1], reverse=True)[:self.top_n]
+            for (filename, lineno), size in top:
+                source = linecache.getline(filename, lineno).strip()
+                lines.append(f"{size / 1024:>10.1f} KiB  {filename}:{lineno}  {source}")
+
+            lines.append("")
+            lines.append(f"[{name}] 누적 시간 상위 {self.top_n}개 함수")
+            lines.append("-" * 80)
+            stats = pstats.Stats(self._profiles[name]).stats
+            top_funcs = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top_n]
+            for func, (_, ncalls, tottime, cumtime, _) in top_funcs:
+                lines.append(f"{cumtime:>10.3f}s {tottime:>10.3f}s {ncalls:>9}  {_format_func(func)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_func(func):
+    filename, lineno, funcname = func
+    if filename == "~":
+        return funcname
+    return f"{funcname} ({os.path.basename(filename)}:{lineno})"
+
+
+def _collapse_stacks(stage_name, stats, max_depth=64):
+    """pstats 호출 그래프를 collapsed stack 형식으로 변환
+
+    cProfile은 호출자-피호출자 관계만 기록하므로 각 함수의 자체 시간(tottime)을
+    누적 시간이 가장 큰 호출자 경로에 배정하는 근사치이다.
+    """
+    lines = []
+    for func, (_, _, tottime, _, callers) in stats.items():
+        micros = int(tottime * 1_000_000)
+        if micros <= 0:
+            continue
+        stack = [func]
+        seen = {func}
+        current_callers = callers
+        while current_callers and len(stack) < max_depth:
+            parent = max(current_callers.items(), key=lambda item: item[1][3])[0]
+            if parent in seen or parent not in stats:
+                break
+            stack.append(parent)
+            seen.add(parent)
+            current_callers = stats[parent][4]
+        frames = [stage_name] + [_format_func(f).replace(";", ":") for f in reversed(stack)]
+        lines.append(f"{';'.join(frames)} {micros}")
+    return lines
+
+
+def add_profile_arguments(parser):
+    """--profile 관련 명령행 인자 추가"""
+    parser.add_argument("--profile", action="store_true", help="단계별 cProfile/tracemalloc 측정 활성화")
+    parser.add_argument("--profile-dir", default=None, help="프로파일 결과 저장 경로")
+    parser.add_argument("--profile-top-n", type=int, default=20, help="리포트에 표시할 상위 항목 수")
+
+
+def profiler_from_args(args, job_name):
+    """명령행 인자로부터 StageProfiler 생성 (--profile 미지정 시 None)"""
+    if not args.profile:
+        return None
+    return StageProfiler(args.profile_dir or default_profile_dir(job_name), top_n=args.profile_top_n)
@@ -2,8 +2,8 @@ from langchain.vectorstores import Chroma
 from langchain.embeddings import OpenAIEmbeddings
 from langchain.chat_models import ChatOpenAI
 from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferMemory
 import os
+from conversation_store import conversations
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -28,27 +28,22 @@ class CourseRecommender:
             openai_api_key=OPENAI_API_KEY
         )
         
-        # 대화 메모리 설정
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
-        )
-        
-        # RAG 체인 설정
+        # RAG 체인 설정 (대화 기록은 호출마다 세션별 기록에서 전달)
         self.qa_chain = ConversationalRetrievalChain.from_llm(
             llm=self.llm,
             retriever=self.vectorstore.as_retriever(
                 search_kwargs={"k": 3}  # 상위 3개 문서 검색
             ),
-            memory=self.memory,
             verbose=True
         )
     
-    def get_recommendation(self, query):
-        """사용자 질문에 대한 강의 추천"""
+    def get_recommendation(self, query, session_id="cli"):
+        """사용자 질문에 대한 강의 추천 (session_id별로 대화 기록 유지)"""
         try:
             # RAG 체인 실행
-            result = self.qa_chain({"question": query})
+            history = conversations.get(session_id)
+            result = self.qa_chain({"question": query, "chat_history": history.pairs()})
+            conversations.append_exchange(session_id, query, result["answer"])
             
             return {
                 "answer": result["answer"],
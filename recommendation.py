@@ -0,0 +1,39 @@
+import asyncio
+import os
+from reranker import rerank, RERANK_TOP_N
+from vector_store import query_similar_courses_batch
+
+# 여러 질문 일괄 추천 (지도교수 상담, 신입생 오리엔테이션 등 수백 명 단위 요청)
+# 질문 임베딩과 벡터 검색을 한 번씩만 수행하고, LLM 답변 생성은 동시 호출 수를 제한해서 실행한다.
+
+# 한 요청에 받을 최대 질문 수
+BATCH_MAX_QUESTIONS = int(os.getenv("RECOMMEND_BATCH_MAX_QUESTIONS", "500"))
+
+# LLM 답변을 동시에 생성할 최대 개수
+LLM_CONCURRENCY = int(os.getenv("RECOMMEND_LLM_CONCURRENCY", "4"))
+
+# 재정렬 전에 검색할 후보 강의 수
+RETRIEVE_CANDIDATES = 15
+
+
+def recommend_batch(questions, term=None, limit=RERANK_TOP_N, candidates=RETRIEVE_CANDIDATES):
+    """여러 질문의 추천 강의를 LLM 없이 반환
+
+    질문 순서대로, 재정렬된 검색 결과(query_similar_courses와 같은 JSON 문자열) 목록을 반환한다.
+    """
+    retrieved = query_similar_courses_batch(questions, n_results=candidates, term=term)
+    return [rerank(question, results, limit=limit) for question, results in zip(questions, retrieved)]
+
+
+async def generate_bounded(prompts, generate, concurrency=LLM_CONCURRENCY):
+    """프롬프트마다 generate(비동기 함수)를 동시에 최대 concurrency개씩 실행
+
+    입력 순서대로 결과를 반환하며, 실패한 항목은 예외 객체로 채운다.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(prompt):
+        async with semaphore:
+            return await generate(prompt)
+
+    return await asyncio.gather(*(run(prompt) for prompt in prompts), return_exceptions=True)
@@ -0,0 +1,114 @@
+import json
+import os
+import re
+import numpy as np
+from chunking import is_meaningful
+
+# 벡터 검색 결과 재정렬 (LLM에 넘기기 전 CPU에서 한 번에 점수 계산)
+# 검색 점수만으로 정한 순서를 질문과 교과목명/수업목표의 글자 바이그램 겹침, 질문에 나온
+# 학과·이수구분·교수명 일치, 후보 안에서 정규화한 벡터 점수를 섞어 다시 매기고 상위 몇 개만 남긴다.
+
+# LLM 컨텍스트로 넘길 최대 강의 수
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "5"))
+
+# 점수 가중치 (합 1)
+VECTOR_WEIGHT = 0.5
+SUBJECT_WEIGHT = 0.25
+OBJECTIVE_WEIGHT = 0.15
+METADATA_WEIGHT = 0.1
+
+# 검색 점수 차이가 이보다 작으면 그만큼만 반영 (후보끼리 점수가 비슷할 때 작은 차이가 부풀려지지 않게)
+MIN_SCORE_SPREAD = 0.2
+
+# 교과목명이 비었거나 항목명만 들어간 (크롤링이 잘못된) 강의의 점수 배율
+MISSING_SUBJECT_PENALTY = 0.5
+
+# 학과명 끝의 괄호 (세부전공/야간 표시 등) 제거
+_MAJOR_SUFFIX_RE = re.compile(r'\(.*$')
+# "전자공학부" → "전자공학"처럼 질문에 쓰일 만한 학과 이름
+_MAJOR_UNIT_RE = re.compile(r'(학부|학과|전공|부|과)$')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def bigrams(text):
+    """공백을 뺀 소문자 글자 바이그램 집합 (한 글자면 그 글자)"""
+    text = _SPACE_RE.sub("", str(text or "")).lower()
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _field(metadata, key):
+    value = metadata.get(key, "")
+    return str(value) if is_meaningful(value) else ""
+
+
+def lexical_overlap(query_grams, texts):
+    """질문 바이그램 중 각 텍스트에 들어 있는 비율 (N,) 배열"""
+    if not query_grams or not texts:
+        return np.zeros(len(texts), dtype=np.float32)
+    vocabulary = sorted(query_grams)
+    hits = np.zeros((len(texts), len(vocabulary)), dtype=bool)
+    for row, text in enumerate(texts):
+        grams = bigrams(text)
+        hits[row] = [gram in grams for gram in vocabulary]
+    return hits.mean(axis=1, dtype=np.float32)
+
+
+def metadata_matches(question, metadatas):
+    """질문에 후보의 학과/이수구분/교수명이 나오는지 (N,) 배열 (0~1)"""
+    compact = _SPACE_RE.sub("", question)
+    matches = np.zeros((len(metadatas), 3), dtype=bool)
+    for row, metadata in enumerate(metadatas):
+        major = _MAJOR_UNIT_RE.sub("", _MAJOR_SUFFIX_RE.sub("", _field(metadata, "major")).strip())
+        course_type = _field(metadata, "course_type")
+        professor = _field(metadata, "professor")
+        matches[row] = (
+            len(major) >= 2 and major in compact,
+            bool(course_type) and course_type in compact,
+            len(professor) >= 2 and professor in compact,
+        )
+    return matches.mean(axis=1, dtype=np.float32)
+
+
+def normalize_scores(scores, min_spread=MIN_SCORE_SPREAD):
+    """후보 안에서 검색 점수를 0~1로 정규화 (최고점이 1, 점수 폭은 min_spread 이상으로 봄)"""
+    scores = np.asarray(scores, dtype=np.float32)
+    if not len(scores):
+        return scores
+    high = scores.max()
+    spread = max(float(high - scores.min()), min_spread)
+    return 1.0 - (high - scores) / spread
+
+
+def score_candidates(question, candidates):
+    """검색 결과(dict 목록: metadata, score)의 재정렬 점수 (N,) 배열"""
+    metadatas = [candidate.get("metadata", {}) for candidate in candidates]
+    query_grams = bigrams(question)
+    vector = normalize_scores([candidate.get("score", 0.0) for candidate in candidates])
+    subject_names = [_field(metadata, "subject_name") for metadata in metadatas]
+    subject = lexical_overlap(query_grams, subject_names)
+    objective = lexical_overlap(query_grams, [_field(metadata, "course_objective") for metadata in metadatas])
+    metadata = metadata_matches(question, metadatas)
+    scores = (VECTOR_WEIGHT * vector + SUBJECT_WEIGHT * subject
+              + OBJECTIVE_WEIGHT * objective + METADATA_WEIGHT * metadata)
+    missing_subject = np.array([not name for name in subject_names], dtype=bool)
+    return np.where(missing_subject, scores * MISSING_SUBJECT_PENALTY, scores)
+
+
+def rerank(question, similar_courses, limit=RERANK_TOP_N):
+    """query_similar_courses 결과(JSON 문자열 목록)를 재정렬하여 상위 limit개 반환
+
+    각 결과에 rerank_score를 추가한다.
+    """
+    if not similar_courses:
+        return []
+    candidates = [json.loads(course) for course in similar_courses]
+    scores = score_candidates(question, candidates)
+    order = np.argsort(-scores, kind="stable")[:limit]
+    reranked = []
+    for row in order:
+        candidate = candidates[row]
+        candidate["rerank_score"] = round(float(scores[row]), 4)
+        reranked.append(json.dumps(candidate, ensure_ascii=False))
+    return reranked
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import numpy as np
+from langchain_core.documents import Document
+
+# 벡터 검색 점수 규약
+# Chroma는 거리(작을수록 가까움)를 반환하며, 거리 종류는 컬렉션의 "hnsw:space" 설정을 따른다.
+#   l2     : 제곱 유클리드 거리 (정규화된 임베딩이면 d = 2 - 2cos)
+#   cosine : 1 - cos
+#   ip     : 1 - 내적
+# 검색 결과는 모두 코사인 유사도(-1~1, 클수록 가까움)로 바꾸어 다루고, 임계값도 유사도 기준으로 정한다.
+# OpenAI 임베딩과 강의 단위 벡터는 L2 정규화되어 있으므로 세 방식 모두 같은 유사도가 나온다.
+# 사용 예: python retrieval_scoring.py calibrate --labels labeled_queries.jsonl
+#         python retrieval_scoring.py show
+
+METRICS = ("l2", "cosine", "ip")
+DEFAULT_METRIC = "l2"  # hnsw:space 설정이 없는 컬렉션 (Chroma 기본값)
+
+# 보정 전 기본 최소 유사도
+DEFAULT_MIN_SIMILARITY = 0.7
+
+# 보정 결과 파일 (환경 변수 RETRIEVAL_MIN_SIMILARITY가 있으면 그 값을 우선 사용)
+THRESHOLD_PATH = os.getenv("RETRIEVAL_THRESHOLD_PATH", os.path.join("features", "retrieval_threshold.json"))
+
+
+def collection_metric(vectorstore):
+    """Chroma 컬렉션의 거리 종류 (l2/cosine/ip)"""
+    metadata = vectorstore._collection.metadata or {}
+    metric = metadata.get("hnsw:space", DEFAULT_METRIC)
+    if metric not in METRICS:
+        raise ValueError(f"지원하지 않는 거리 종류입니다: {metric}")
+    return metric
+
+
+def distance_to_similarity(distances, metric=DEFAULT_METRIC):
+    """거리 배열을 코사인 유사도 배열로 변환 (정규화된 임베딩 기준)"""
+    distances = np.asarray(distances, dtype=np.float64)
+    if metric == "l2":
+        similarities = 1.0 - distances / 2.0
+    elif metric in ("cosine", "ip"):
+        similarities = 1.0 - distances
+    else:
+        raise ValueError(f"지원하지 않는 거리 종류입니다: {metric}")
+    return np.clip(similarities, -1.0, 1.0)
+
+
+def scored_search(vectorstore, embedding, k, filter=None):
+    """벡터 검색 결과를 [(문서, 유사도)] 유사도 내림차순으로 반환"""
+    results = vectorstore.similarity_search_by_vector_with_relevance_scores(
+        embedding=embedding,
+        k=k,
+        filter=filter
+    )
+    if not results:
+        return []
+    similarities = distance_to_similarity([distance for _, distance in results], collection_metric(vectorstore))
+    order = np.argsort(-similarities, kind="stable")
+    return [(results[i][0], float(similarities[i])) for i in order]
+
+
+def scored_search_batch(vectorstore, query_embeddings, k):
+    """여러 질문 임베딩을 한 번의 컬렉션 조회로 검색하여 질문별 [(문서, 유사도)] 목록 반환"""
+    if not len(query_embeddings):
+        return []
+    results = vectorstore._collection.query(
+        query_embeddings=[list(embedding) for embedding in query_embeddings],
+        n_results=k,
+        include=["documents", "metadatas", "distances"]
+    )
+    metric = collection_metric(vectorstore)
+    batches = []
+    for documents, metadatas, distances in zip(results["documents"], results["metadatas"], results["distances"]):
+        similarities = distance_to_similarity(distances, metric)
+        order = np.argsort(-similarities, kind="stable")
+        batches.append([
+            (Document(page_content=documents[i] or "", metadata=metadatas[i] or {}), float(similarities[i]))
+            for i in order
+        ])
+    return batches
+
+
+def calibrate_threshold(similarities, labels, beta=1.0):
+    """(유사도, 관련 여부) 표본에서 F-beta가 가장 높은 최소 유사도와 그때의 정밀도/재현율 반환"""
+    similarities = np.asarray(similarities, dtype=np.float64)
+    labels = np.asarray(labels, dtype=bool)
+    total_relevant = int(labels.sum())
+    if not len(similarities) or total_relevant == 0:
+        raise ValueError("관련 강의가 포함된 표본이 없습니다.")
+    order = np.argsort(-similarities, kind="stable")
+    similarities, labels = similarities[order], labels[order]
+    true_positives = np.cumsum(labels)
+    precision = true_positives / np.arange(1, len(labels) + 1)
+    recall = true_positives / total_relevant
+    beta2 = beta * beta
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f_score = np.nan_to_num((1 + beta2) * precision * recall / (beta2 * precision + recall))
+    # 같은 유사도가 여러 개면 마지막 위치에서만 자를 수 있음
+    cut_points = np.append(similarities[1:] != similarities[:-1], True)
+    best = int(np.flatnonzero(cut_points)[np.argmax(f_score[cut_points])])
+    return {
+        "min_similarity": float(similarities[best]),
+        "precision": float(precision[best]),
+        "recall": float(recall[best]),
+        "f_score": float(f_score[best]),
+    }
+
+
+def load_min_similarity():
+    """검색에 쓸 최소 유사도 (환경 변수 > 보정 결과 파일 > 기본값)"""
+    value = os.getenv("RETRIEVAL_MIN_SIMILARITY")
+    if value:
+        return float(value)
+    if os.path.exists(THRESHOLD_PATH):
+        with open(THRESHOLD_PATH, encoding="utf-8") as f:
+            return float(json.load(f)["min_similarity"])
+    return DEFAULT_MIN_SIMILARITY
+
+
+def _read_labels(path):
+    """라벨 파일(JSONL): {"query": "...", "relevant": ["과목코드 또는 교과목명", ...]}"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def calibrate(labels_path, term=None, k=50, beta=1.0, output=THRESHOLD_PATH):
+    """라벨이 붙은 질문으로 강의 단위 컬렉션을 검색하여 최소 유사도를 보정하고 파일로 저장
+
+    API도 최소 유사도를 청크 점수와 섞기 전의 강의 단위 점수에 적용하므로 같은 점수로 보정한다.
+    """
+    from terms import get_current_term
+    from course_catalog import catalog
+    from vector_store import get_embeddings, get_course_vector_store
+
+    term = term or get_current_term()
+    store = get_course_vector_store(term)
+    labeled = _read_labels(labels_path)
+    query_embeddings = get_embeddings().embed_documents([item["query"] for item in labeled])
+
+    similarities = []
+    labels = []
+    cutoff_ranks = []
+    for item, embedding in zip(labeled, query_embeddings):
+        relevant = set(item["relevant"])
+        hits = scored_search(store, embedding, k)
+        last_relevant = 0
+        for rank, (doc, similarity) in enumerate(hits, 1):
+            metadata = catalog.hydrate(term, doc.metadata)
+            is_relevant = metadata.get("subject_code") in relevant or metadata.get("subject_name") in relevant
+            similarities.append(similarity)
+            labels.append(is_relevant)
+            if is_relevant:
+                last_relevant = rank
+        cutoff_ranks.append(last_relevant)
+
+    result = calibrate_threshold(similarities, labels, beta=beta)
+    kept = np.asarray(similarities) >= result["min_similarity"]
+    result.update({
+        "metric": collection_metric(store),
+        "score": "course",  # 강의 단위 점수 기준 (청크 보정 전)
+        "term": term,
+        "queries": len(labeled),
+        "samples": len(similarities),
+        "kept_per_query": float(kept.sum() / max(len(labeled), 1)),
+        "max_relevant_rank": int(max(cutoff_ranks, default=0)),
+    })
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 유사도 임계값 보정")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    calibrate_parser = subparsers.add_parser("calibrate", help="라벨이 붙은 질문으로 최소 유사도 보정")
+    calibrate_parser.add_argument("--labels", required=True, help="라벨 파일 (JSONL: query, relevant)")
+    calibrate_parser.add_argument("--term", default=None, help="검색할 학기 (생략 시 기본 학기)")
+    calibrate_parser.add_argument("--k", type=int, default=50, help="질문당 검색할 강의 수")
+    calibrate_parser.add_argument("--beta", type=float, default=1.0, help="F-beta의 beta (클수록 재현율 중시)")
+    calibrate_parser.add_argument("--output", default=THRESHOLD_PATH, help="보정 결과 파일")
+
+    subparsers.add_parser("show", help="현재 적용되는 최소 유사도 출력")
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        result = calibrate(args.labels, term=args.term, k=args.k, beta=args.beta, output=args.output)
+        print(f"최소 유사도 {result['min_similarity']:.4f} (정밀도 {result['precision']:.3f}, "
+              f"재현율 {result['recall']:.3f}, 질문당 평균 {result['kept_per_query']:.1f}개 통과, "
+              f"관련 강의 최대 순위 {result['max_relevant_rank']}) → {args.output}")
+    else:
+        print(f"최소 유사도: {load_min_similarity():.4f}")
+
+
+if __name__ == "__main__":
+    main()
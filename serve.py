@@ -0,0 +1,149 @@
+import argparse
+import gc
+import os
+import signal
+import threading
+import time
+from gunicorn.app.base import BaseApplication
+
+# 운영용 API 서버 (gunicorn 마스터 + uvicorn 작업 프로세스 N개)
+# 마스터가 api를 import하고 기본 학기 읽기 전용 데이터(강의 특성 표, 강의 목록, 시간표 비트셋,
+# 유사 강의 그래프)를 미리 로드한 뒤 fork하므로, 작업 프로세스들은 같은 메모리 페이지를 공유한다
+# (copy-on-write, gc.freeze로 GC가 공유 페이지를 건드리지 않게 함). Chroma/OpenAI 클라이언트는
+# fork 이후 작업 프로세스마다 따로 만든다.
+# 새 인덱스가 배포되면(특성 표, 유사도 그래프, 인덱스 포인터 변경) 마스터가 데이터를 다시 읽고
+# 작업 프로세스를 하나씩 새로 띄운 뒤 이전 프로세스는 처리 중인 요청을 마치고 종료한다.
+# 수동으로 다시 읽으려면: kill -HUP <마스터 PID>
+# 사용 예: python serve.py --workers 4
+#         python serve.py --workers 8 --job-workers 2 --watch-interval 10
+
+DEFAULT_WORKERS = int(os.getenv("SERVE_WORKERS", str(os.cpu_count() or 1)))
+
+# 인덱스 파일 변경 확인 간격 (초, 0이면 감시하지 않음)
+WATCH_INTERVAL = float(os.getenv("SERVE_WATCH_INTERVAL", "5"))
+
+
+def index_stamp():
+    """배포된 인덱스 파일들의 (경로, 수정 시각) 목록 (바뀌면 다시 읽을 때가 된 것)"""
+    from course_features import feature_path
+    from similarity_graph import graph_path
+    from terms import get_current_term
+    from index_registry import POINTER_PATH
+    term = get_current_term()
+    # VectorDB는 작업 프로세스가 요청마다 새 버전으로 바꾸지만, 다시 시작하면 이전 버전의 Chroma 클라이언트가 정리됨
+    paths = [feature_path(term), graph_path(term), POINTER_PATH]
+    return tuple((path, os.path.getmtime(path) if os.path.exists(path) else None) for path in paths)
+
+
+def watch_index(interval):
+    """인덱스 파일이 바뀌고 한 주기 동안 더 바뀌지 않으면 마스터에 SIGHUP (작성 중인 파일은 건너뜀)"""
+    current = index_stamp()
+    pending = None
+    while True:
+        time.sleep(interval)
+        try:
+            stamp = index_stamp()
+        except Exception as e:
+            print(f"[serve] 인덱스 확인 중 오류 발생: {e}")
+            continue
+        if stamp == current:
+            pending = None
+        elif stamp != pending:
+            pending = stamp
+        else:
+            print("[serve] 새 인덱스 감지: 작업 프로세스를 다시 시작합니다.")
+            current, pending = stamp, None
+            os.kill(os.getpid(), signal.SIGHUP)
+
+
+def dispose_engines():
+    """fork 전에 열린 SQLite 연결을 작업 프로세스가 같이 쓰지 않도록 연결 풀을 새로 시작"""
+    import data_processor
+    import jobs
+    import vector_store
+    for engine in (data_processor.engine, vector_store.engine, jobs.engine):
+        engine.dispose(close=False)
+
+
+class ApiServer(BaseApplication):
+    def __init__(self, options, job_workers=0, watch_interval=WATCH_INTERVAL):
+        self.options = options
+        self.job_workers = job_workers
+        self.watch_interval = watch_interval
+        self.job_pool = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        self.cfg.set("when_ready", self.when_ready)
+        self.cfg.set("on_reload", self.on_reload)
+        self.cfg.set("pre_fork", self.pre_fork)
+        self.cfg.set("post_fork", self.post_fork)
+        self.cfg.set("on_exit", self.on_exit)
+
+    def load(self):
+        import api
+        timings, errors = api.preload_shared()
+        print(f"[serve] 공유 데이터 로드 완료 (초): {timings}" + (f", 오류: {errors}" if errors else ""))
+        return api.app
+
+    def when_ready(self, server):
+        # 비동기 작업 프로세스는 API 작업 프로세스마다가 아니라 마스터에서 한 벌만 실행
+        if self.job_workers > 0:
+            import jobs
+            self.job_pool = jobs.WorkerPool(self.job_workers)
+            self.job_pool.start()
+            print(f"[serve] 작업 프로세스 {self.job_workers}개 시작")
+        if self.watch_interval > 0:
+            threading.Thread(target=watch_index, args=(self.watch_interval,), name="index-watch", daemon=True).start()
+
+    def on_reload(self, server):
+        # 새 작업 프로세스를 fork하기 전에 마스터의 공유 데이터를 새 인덱스로 교체
+        import api
+        timings, errors = api.preload_shared(reload=True)
+        print(f"[serve] 공유 데이터 다시 로드 (초): {timings}" + (f", 오류: {errors}" if errors else ""))
+
+    def pre_fork(self, server, worker):
+        # 지금까지 만든 객체를 GC 대상에서 빼서, 작업 프로세스의 GC가 공유 페이지를 복사하지 않게 함
+        gc.freeze()
+
+    def post_fork(self, server, worker):
+        dispose_engines()
+
+    def on_exit(self, server):
+        if self.job_pool is not None:
+            self.job_pool.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="운영용 API 서버 (작업 프로세스 여러 개)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="API 작업 프로세스 수")
+    parser.add_argument("--job-workers", type=int, default=int(os.getenv("JOB_WORKERS", "2")),
+                        help="비동기 작업 프로세스 수 (0이면 python jobs.py worker로 따로 실행)")
+    parser.add_argument("--watch-interval", type=float, default=WATCH_INTERVAL,
+                        help="인덱스 파일 변경 확인 간격 (초, 0이면 감시하지 않음)")
+    parser.add_argument("--timeout", type=int, default=120, help="응답 없는 작업 프로세스를 재시작할 시간 (초)")
+    parser.add_argument("--graceful-timeout", type=int, default=30, help="다시 시작할 때 처리 중인 요청을 기다릴 시간 (초)")
+    args = parser.parse_args()
+
+    # API 작업 프로세스는 비동기 작업 프로세스를 직접 띄우지 않음 (마스터가 한 벌만 실행)
+    os.environ["JOB_WORKERS"] = "0"
+    if (args.workers > 1 or args.job_workers > 0) and not os.getenv("CONVERSATION_DATABASE_URL", "sqlite:///conversations.db"):
+        print("[serve] 경고: CONVERSATION_DATABASE_URL이 비어 있으면 대화 기록이 API/비동기 작업 프로세스마다 따로 저장됩니다.")
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+    }
+    ApiServer(options, job_workers=args.job_workers, watch_interval=args.watch_interval).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import argparse
+import os
+import threading
+import time
+import numpy as np
+from terms import get_current_term
+from vector_store import get_course_vector_store
+
+# 강의 간 유사도 그래프 ("이 강의와 비슷한 강의" 조회용)
+# 강의 단위 벡터(청크 임베딩 가중 평균, L2 정규화) 행렬에서 블록 단위 행렬곱으로 코사인 유사도를 구하고
+# 강의마다 상위 K개 이웃만 CSR 배열(indptr, indices, scores)로 features/<학기>.similar.npz에 저장한다.
+# API는 이 배열을 읽어 임베딩/LLM 호출 없이 이웃을 바로 반환한다.
+# 사용 예: python similarity_graph.py --term 2025-U211600010 --top-k 20
+
+GRAPH_DIR = os.getenv("COURSE_FEATURE_DIR", "features")
+
+# 파일 형식이 바뀌면 올려서 기존 그래프를 다시 만들게 함
+GRAPH_VERSION = 1
+
+DEFAULT_TOP_K = 20
+DEFAULT_BLOCK_SIZE = 512
+
+
+def graph_path(term):
+    return os.path.join(GRAPH_DIR, f"{term}.similar.npz")
+
+
+def course_embeddings(term):
+    """학기 강의 단위 벡터 컬렉션에서 (course_ids, L2 정규화된 행렬) 반환 (course_id 순)"""
+    data = get_course_vector_store(term).get(include=["embeddings", "metadatas"])
+    rows = [
+        (metadata["course_id"], embedding)
+        for embedding, metadata in zip(data["embeddings"], data["metadatas"])
+        if (metadata or {}).get("course_id") is not None
+    ]
+    rows.sort(key=lambda row: row[0])
+    course_ids = np.array([course_id for course_id, _ in rows], dtype=np.int64)
+    if not len(course_ids):
+        return course_ids, np.zeros((0, 0), dtype=np.float32)
+    matrix = np.asarray([embedding for _, embedding in rows], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms > 0, norms, 1.0)
+    return course_ids, matrix
+
+
+def build_similarity_graph(matrix, top_k=DEFAULT_TOP_K, block_size=DEFAULT_BLOCK_SIZE):
+    """정규화된 (N, D) 행렬에서 행마다 자기 자신을 뺀 상위 top_k 이웃을 구해 CSR 배열로 반환
+
+    (N, N) 유사도 행렬 전체를 만들지 않고 block_size행씩 곱하므로 메모리는 block_size × N만 쓴다.
+    """
+    n = len(matrix)
+    k = min(top_k, max(n - 1, 0))
+    indptr = np.arange(n + 1, dtype=np.int64) * k
+    indices = np.empty(n * k, dtype=np.int32)
+    scores = np.empty(n * k, dtype=np.float32)
+    if k == 0:
+        return indptr, indices, scores
+
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        sims = matrix[start:end] @ matrix.T
+        rows = np.arange(end - start)
+        sims[rows, rows + start] = -np.inf  # 자기 자신 제외
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        indices[start * k:end * k] = np.take_along_axis(top, order, axis=1).ravel()
+        scores[start * k:end * k] = np.take_along_axis(top_scores, order, axis=1).ravel()
+    return indptr, indices, scores
+
+
+def precompute_similarity(term, top_k=DEFAULT_TOP_K, block_size=DEFAULT_BLOCK_SIZE):
+    """학기 유사도 그래프를 계산하여 디스크에 저장"""
+    course_ids, matrix = course_embeddings(term)
+    indptr, indices, scores = build_similarity_graph(matrix, top_k=top_k, block_size=block_size)
+    os.makedirs(GRAPH_DIR, exist_ok=True)
+    path = graph_path(term)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, version=GRAPH_VERSION, course_ids=course_ids,
+             indptr=indptr, indices=indices, scores=scores)
+    os.replace(tmp_path, path)
+    return SimilarityGraph(course_ids, indptr, indices, scores)
+
+
+class SimilarityGraph:
+    """강의별 상위 K 이웃 (CSR 배열)"""
+
+    def __init__(self, course_ids, indptr, indices, scores):
+        self.course_ids = course_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.scores = scores
+        self._row_by_id = {int(course_id): row for row, course_id in enumerate(course_ids)}
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data["version"]) != GRAPH_VERSION:
+                return None
+            return cls(data["course_ids"], data["indptr"], data["indices"], data["scores"])
+
+    def __len__(self):
+        return len(self.course_ids)
+
+    def __contains__(self, course_id):
+        return course_id in self._row_by_id
+
+    def neighbors(self, course_id, limit=None):
+        """course_id와 비슷한 강의 [(course_id, 유사도)] (유사도 내림차순, 그래프에 없으면 빈 목록)"""
+        row = self._row_by_id.get(course_id)
+        if row is None:
+            return []
+        start, end = int(self.indptr[row]), int(self.indptr[row + 1])
+        if limit is not None:
+            end = min(end, start + limit)
+        neighbor_ids = self.course_ids[self.indices[start:end]]
+        return [(int(neighbor), float(score)) for neighbor, score in zip(neighbor_ids, self.scores[start:end])]
+
+
+def load_similarity(term):
+    """디스크에 저장된 학기 유사도 그래프를 읽음 (없거나 형식이 바뀌었으면 None)"""
+    path = graph_path(term)
+    if not os.path.exists(path):
+        return None
+    return SimilarityGraph.load(path)
+
+
+class SimilarityStore:
+    """학기별 유사도 그래프를 메모리에 보관 (그래프 파일이 갱신되면 다시 읽음)"""
+
+    def __init__(self):
+        self._graphs = {}  # term -> (파일 수정 시각, graph)
+        self._lock = threading.Lock()
+
+    def get(self, term):
+        path = graph_path(term)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        with self._lock:
+            cached = self._graphs.get(term)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        graph = load_similarity(term) if mtime is not None else None
+        with self._lock:
+            self._graphs[term] = (mtime, graph)
+        return graph
+
+
+similarity_graphs = SimilarityStore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="강의 간 유사도 그래프 생성")
+    parser.add_argument("--term", default=None, help="대상 학기 (생략 시 기본 학기)")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="강의별로 저장할 이웃 수")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="한 번에 곱할 행 수")
+    parser.add_argument("--course-id", type=int, default=None, help="생성 후 이웃을 출력할 강의")
+    args = parser.parse_args()
+
+    term = args.term or get_current_term()
+    start = time.perf_counter()
+    graph = precompute_similarity(term, top_k=args.top_k, block_size=args.block_size)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(graph_path(term))
+    print(f"유사도 그래프 생성 완료: {graph_path(term)} (강의 {len(graph)}개, 이웃 {len(graph.indices)}개, "
+          f"{size / 1024:.1f} KiB, {elapsed:.2f}초)")
+
+    if args.course_id is not None:
+        for neighbor, score in graph.neighbors(args.course_id):
+            print(f"{neighbor}\t{score:.4f}")
+
+
+if __name__ == "__main__":
+    main()
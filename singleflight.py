@@ -0,0 +1,54 @@
+import asyncio
+import re
+import unicodedata
+from metrics import RECOMMEND_CACHE_HITS, RECOMMEND_COALESCED
+
+# 같은 요청 합치기 (single-flight)
+# 인기 질문이 동시에 몰리면 처음 온 요청만 임베딩/검색/LLM을 실행하고, 실행 중에 들어온 같은 요청은
+# 그 결과를 함께 받는다. 결과를 저장해 두지는 않으므로 실행이 끝난 뒤 들어온 요청은 새로 실행한다.
+
+_SPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.~。]+$")
+
+
+def normalize_question(question):
+    """같은 질문으로 볼 형태 (유니코드 정규화, 공백 정리, 소문자, 끝의 물음표/마침표 제거)"""
+    text = unicodedata.normalize("NFKC", str(question or ""))
+    text = _SPACE_RE.sub(" ", text).strip().lower()
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+class SingleFlight:
+    """키별로 실행 중인 작업을 하나만 유지 (한 이벤트 루프 안에서 사용)"""
+
+    def __init__(self):
+        self._tasks = {}
+
+    def __len__(self):
+        return len(self._tasks)
+
+    async def do(self, key, run):
+        """key로 실행 중인 작업이 있으면 그 결과를, 없으면 run()을 실행해 결과를 반환
+
+        한 요청이 취소되어도(클라이언트 연결 끊김) 같은 결과를 기다리는 다른 요청을 위해 작업은 계속 실행된다.
+        """
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        if task is not None and task.get_loop() is loop and not task.done():
+            RECOMMEND_COALESCED.inc()
+            RECOMMEND_CACHE_HITS.inc()
+            return await asyncio.shield(task)
+        task = loop.create_task(run())
+        self._tasks[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # 기다리던 요청이 모두 취소된 경우에도 예외가 로그에 남지 않도록 확인 처리
+        if not task.cancelled():
+            task.exception()
+
+
+recommend_flights = SingleFlight()
@@ -0,0 +1,206 @@
+import argparse
+import os
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+from data_processor import engine, init_db, Term, Course, LEGACY_TERM, term_id
+
+# 학기 등록/기본 학기 지정/보관 처리
+# 사용 예: python terms.py list
+#         python terms.py activate 2025-U211600020
+#         python terms.py archive 2024-U211600010 --drop-index
+
+# 기본 학기 조회 결과 캐시 시간 (초). API 재시작 없이 activate 결과가 반영되도록 짧게 유지
+CURRENT_TERM_TTL = float(os.getenv("CURRENT_TERM_TTL", "30"))
+
+# 환경 변수로 기본 학기를 고정할 수 있음 (설정 시 DB의 is_current보다 우선)
+ACTIVE_TERM_OVERRIDE = os.getenv("ACTIVE_TERM")
+
+STATUS_ACTIVE = "active"
+STATUS_ARCHIVED = "archived"
+
+Session = sessionmaker(bind=engine)
+
+_cache_lock = threading.Lock()
+_cache = {"current": None, "searchable": None, "expires": 0.0}
+_db_ready = False
+
+
+class TermNotAvailable(ValueError):
+    """등록되지 않았거나 보관 처리된 학기"""
+
+
+def _invalidate_cache():
+    with _cache_lock:
+        _cache["expires"] = 0.0
+
+
+def _load_cache():
+    global _db_ready
+    with _cache_lock:
+        if time.monotonic() < _cache["expires"]:
+            return _cache["current"], _cache["searchable"]
+    if not _db_ready:
+        # 테이블 확인 (학기 컬럼이 없는 기존 DB면 migrate 안내와 함께 실패)
+        init_db()
+        _db_ready = True
+    session = Session()
+    try:
+        terms = session.query(Term).all()
+        searchable = {term.id for term in terms if term.status == STATUS_ACTIVE}
+        current = next((term.id for term in terms if term.is_current and term.status == STATUS_ACTIVE), None)
+    finally:
+        session.close()
+    with _cache_lock:
+        _cache.update(current=current, searchable=searchable, expires=time.monotonic() + CURRENT_TERM_TTL)
+    return current, searchable
+
+
+def register_term(year, semester_code, label=None, make_current=False):
+    """학기 등록 (이미 있으면 그대로 두고 반환), make_current이면 기본 학기로 지정"""
+    init_db()
+    term = term_id(year, semester_code)
+    session = Session()
+    try:
+        entry = session.get(Term, term)
+        if entry is None:
+            entry = Term(id=term, year=year, semester_code=semester_code, label=label,
+                         status=STATUS_ACTIVE, is_current=0)
+            session.add(entry)
+        elif label:
+            entry.label = label
+        session.commit()
+    finally:
+        session.close()
+    if make_current:
+        set_current_term(term)
+    _invalidate_cache()
+    return term
+
+
+def set_current_term(term):
+    """기본 검색 대상 학기 지정"""
+    session = Session()
+    try:
+        entry = session.get(Term, term)
+        if entry is None or entry.status != STATUS_ACTIVE:
+            raise TermNotAvailable(f"검색할 수 없는 학기입니다: {term}")
+        session.query(Term).update({Term.is_current: 0})
+        entry.is_current = 1
+        session.commit()
+    finally:
+        session.close()
+    _invalidate_cache()
+
+
+def get_current_term():
+    """기본 검색 대상 학기 (ACTIVE_TERM 환경 변수 > DB 지정 학기 > LEGACY_TERM)"""
+    if ACTIVE_TERM_OVERRIDE:
+        return ACTIVE_TERM_OVERRIDE
+    current, _ = _load_cache()
+    return current or LEGACY_TERM
+
+
+def resolve_term(term=None):
+    """요청한 학기를 검증하여 반환, 생략 시 기본 학기"""
+    if not term:
+        return get_current_term()
+    _, searchable = _load_cache()
+    if term not in searchable:
+        raise TermNotAvailable(f"검색할 수 없는 학기입니다: {term}")
+    return term
+
+
+def list_terms():
+    """등록된 학기 목록 (학기별 강의 수 포함)"""
+    session = Session()
+    try:
+        counts = dict(session.query(Course.term, func.count(Course.id)).group_by(Course.term).all())
+        return [
+            {
+                "term": term.id,
+                "label": term.label or "",
+                "status": term.status,
+                "is_current": bool(term.is_current),
+                "courses": counts.get(term.id, 0),
+            }
+            for term in session.query(Term).order_by(Term.id).all()
+        ]
+    finally:
+        session.close()
+
+
+def archive_term(term, drop_index=False):
+    """학기를 보관 처리 (검색 대상에서 제외), drop_index이면 해당 학기 VectorDB 컬렉션도 삭제
+
+    DB의 강의 데이터와 다른 학기 컬렉션은 그대로 두므로 현재 학기를 다시 만들 필요가 없다.
+    """
+    session = Session()
+    try:
+        entry = session.get(Term, term)
+        if entry is None:
+            raise TermNotAvailable(f"등록되지 않은 학기입니다: {term}")
+        if entry.is_current:
+            raise TermNotAvailable(f"기본 학기는 보관할 수 없습니다. 다른 학기를 먼저 지정하세요: {term}")
+        entry.status = STATUS_ARCHIVED
+        entry.archived_at = datetime.now()
+        session.commit()
+    finally:
+        session.close()
+    _invalidate_cache()
+    if drop_index:
+        from vector_store import drop_term_collection
+        drop_term_collection(term)
+
+
+def restore_term(term):
+    """보관된 학기를 다시 검색 대상으로 (컬렉션을 삭제했다면 vector_store.py --term으로 다시 생성)"""
+    session = Session()
+    try:
+        entry = session.get(Term, term)
+        if entry is None:
+            raise TermNotAvailable(f"등록되지 않은 학기입니다: {term}")
+        entry.status = STATUS_ACTIVE
+        entry.archived_at = None
+        session.commit()
+    finally:
+        session.close()
+    _invalidate_cache()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="학기 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="등록된 학기 목록")
+    register_parser = subparsers.add_parser("register", help="학기 등록")
+    register_parser.add_argument("year")
+    register_parser.add_argument("semester_code")
+    register_parser.add_argument("--label", default=None)
+    register_parser.add_argument("--current", action="store_true", help="기본 학기로 지정")
+    activate_parser = subparsers.add_parser("activate", help="기본 검색 학기 지정")
+    activate_parser.add_argument("term")
+    archive_parser = subparsers.add_parser("archive", help="학기 보관 처리")
+    archive_parser.add_argument("term")
+    archive_parser.add_argument("--drop-index", action="store_true", help="해당 학기 VectorDB 컬렉션 삭제")
+    restore_parser = subparsers.add_parser("restore", help="보관된 학기 복원")
+    restore_parser.add_argument("term")
+    args = parser.parse_args()
+
+    init_db()
+    if args.command == "list":
+        for item in list_terms():
+            mark = "*" if item["is_current"] else " "
+            print(f"{mark} {item['term']:<20} {item['status']:<10} 강의 {item['courses']:>5}개  {item['label']}")
+    elif args.command == "register":
+        print(f"학기 등록: {register_term(args.year, args.semester_code, args.label, make_current=args.current)}")
+    elif args.command == "activate":
+        set_current_term(args.term)
+        print(f"기본 학기 지정: {args.term}")
+    elif args.command == "archive":
+        archive_term(args.term, drop_index=args.drop_index)
+        print(f"학기 보관 처리: {args.term}")
+    elif args.command == "restore":
+        restore_term(args.term)
+        print(f"학기 복원: {args.term}")
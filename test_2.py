@@ -6,35 +6,172 @@ from datetime import datetime
 import re
 import json
 import base64
+import argparse
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup  # 설치 필요: pip install beautifulsoup4
+from crawl_journal import CrawlJournal
+from ubireport_parser import parse_report
 
-# 저장할 디렉토리 생성
+# 저장할 디렉토리 (import할 때가 아니라 처음 저장할 때 생성)
 save_dir = os.path.join(os.path.expanduser("~"), "Downloads", "syllabi")
-os.makedirs(save_dir, exist_ok=True)
 
-# 디버깅 모드 설정
-DEBUG = True
+# 디버깅 모드 설정 (SYLLABUS_DEBUG=1 이면 응답 원본을 save_dir에 저장)
+DEBUG = os.getenv("SYLLABUS_DEBUG", "0").lower() in ("1", "true", "yes")
+
+# 서버 주소 (로컬 목 서버로 테스트할 때 OASIS_BASE_URL 환경 변수 또는 --base-url 사용)
+BASE_URL = os.getenv("OASIS_BASE_URL", "https://oasis.jbnu.ac.kr")
+COURSE_LIST_PATH = "/uni/uni/cour/less/findLessSubjtTblInq.action"
+UBI_GATEWAY_PATH = "/com/UbiGateway"
+
+class RateLimiter:
+    """스레드 간 공유되는 초당 요청 수 제한기"""
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """다음 요청 슬롯까지 대기"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+
+class OasisClient:
+    """keep-alive 세션과 전역 요청 속도 제한을 공유하는 HTTP 클라이언트"""
+    def __init__(self, base_url=None, requests_per_second=0, pool_size=10):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        return path if path.startswith("http") else f"{self.base_url}{path}"
+
+    def post(self, path, **kwargs):
+        self.rate_limiter.acquire()
+        return self.session.post(self.url(path), **kwargs)
+
+    def get(self, path, **kwargs):
+        self.rate_limiter.acquire()
+        return self.session.get(self.url(path), **kwargs)
+
+_default_client = None
+
+def get_client():
+    """기본 클라이언트 반환 (속도 제한 없음)"""
+    global _default_client
+    if _default_client is None:
+        _default_client = OasisClient()
+    return _default_client
 
 # 시간 기반 키 생성
 def generate_key():
     current_time = datetime.now().strftime("%Y%m%d%H%M%S%f")[:19]
     return f"{current_time}_{os.urandom(4).hex()}"
 
-# 응답 저장 함수
+# 디버그용 응답 저장은 크롤링 작업을 막지 않도록 별도 스레드에서 처리
+_debug_writer = None
+_debug_writer_lock = threading.Lock()
+
+def _write_debug_file(path, content):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        print(f"응답 저장됨: {path}")
+    except Exception as e:
+        print(f"응답 저장 실패: {e}")
+
+def _save_debug_bytes(content, filename):
+    global _debug_writer
+    with _debug_writer_lock:
+        if _debug_writer is None:
+            _debug_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="debug-writer")
+    _debug_writer.submit(_write_debug_file, os.path.join(save_dir, filename), content)
+
+# 응답 저장 함수 (DEBUG 모드에서만, 비동기)
 def save_response(response, filename):
     if DEBUG:
-        path = os.path.join(save_dir, filename)
-        try:
-            with open(path, "wb") as f:
-                f.write(response.content)
-            print(f"응답 저장됨: {path}")
-        except Exception as e:
-            print(f"응답 저장 실패: {e}")
+        _save_debug_bytes(response.content, filename)
 
-# 강의 목록 가져오기 함수
-def fetch_course_list(year, semester_code, entrance_year="2017"):
+def flush_debug_writes():
+    """대기 중인 디버그 응답 저장 완료까지 대기"""
+    global _debug_writer
+    with _debug_writer_lock:
+        writer, _debug_writer = _debug_writer, None
+    if writer is not None:
+        writer.shutdown(wait=True)
+
+NEXACRO_NS = "{http://www.nexacro.com/platform/dataset}"
+COURSE_LIST_DATASET = "GRD_COUR001"
+
+def iter_course_rows(chunks, year, semester_code):
+    """Nexacro 강의 목록 응답을 받는 대로 파싱하여 강의 정보를 하나씩 반환
+
+    chunks는 응답 본문 bytes 조각의 iterable. GRD_COUR001 Dataset의 Row가 닫힐 때마다
+    강의 정보를 내보내고 해당 Row는 트리에서 제거하므로 전체 DOM을 만들지 않는다.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    in_dataset = False
+    
+    def handle_events():
+        nonlocal in_dataset
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                if elem.tag == f"{NEXACRO_NS}Dataset" and elem.get("id", "") == COURSE_LIST_DATASET:
+                    in_dataset = True
+                continue
+            
+            stack.pop()
+            if elem.tag == f"{NEXACRO_NS}Dataset":
+                in_dataset = False
+            elif elem.tag == f"{NEXACRO_NS}Row" and in_dataset:
+                # 각 컬럼 데이터 추출
+                course_data = {col.get("id", ""): col.text if col.text else "" for col in elem}
+                
+                # 행 처리 후 메모리 해제
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+                
+                # 필요한 필드 추출
+                subject_code = course_data.get("SBJTCD", "")
+                if subject_code:
+                    yield {
+                        "year": year,
+                        "semester_code": semester_code,
+                        "subject_code": subject_code,
+                        "class_number": course_data.get("CLSS", "1"),
+                        "subject_name": course_data.get("SBJTNM", ""),
+                        "college": course_data.get("COLG_NM", ""),  # 단과대학
+                        "major": course_data.get("MAJR_NM", ""),    # 학과
+                        "course_type": course_data.get("SBJT_DIV_NM", "")  # 이수구분
+                    }
+    
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from handle_events()
+    parser.close()
+    yield from handle_events()
+
+# 강의 목록 스트리밍 조회 함수 (응답을 받는 동안 강의 정보를 하나씩 반환)
+def iter_course_list(year, semester_code, entrance_year="2017", client=None, chunk_size=16384):
+    client = client or get_client()
     # 강의 목록 조회 URL
-    url = "https://oasis.jbnu.ac.kr/uni/uni/cour/less/findLessSubjtTblInq.action"
+    url = client.url(COURSE_LIST_PATH)
     
     # 헤더 설정
     headers = {
@@ -82,125 +219,105 @@ def fetch_course_list(year, semester_code, entrance_year="2017"):
     </Parameters>
 </Root>"""
     
+    print("강의 목록 요청 보내는 중...")
+    if DEBUG:
+        print(f"요청 URL: {url}")
+        print(f"요청 본문: {xml_body}")
+    
+    # 요청 보내기 (본문은 받는 대로 파싱)
+    response = client.post(url, headers=headers, cookies=cookies, data=xml_body, timeout=30, stream=True)
+    print(f"응답 상태 코드: {response.status_code}")
+    
     try:
-        print("강의 목록 요청 보내는 중...")
-        if DEBUG:
-            print(f"요청 URL: {url}")
-            print(f"요청 헤더: {json.dumps(headers, indent=2)}")
-            print(f"요청 본문: {xml_body}")
+        if response.status_code != 200:
+            print(f"강의 목록 가져오기 실패: 상태 코드 {response.status_code}")
+            return
         
-        # 요청 보내기
-        response = requests.post(url, headers=headers, cookies=cookies, data=xml_body, timeout=30)
+        debug_chunks = [] if DEBUG else None
         
-        print(f"응답 상태 코드: {response.status_code}")
-        print(f"응답 헤더: {dict(response.headers)}")
+        def chunks():
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if debug_chunks is not None:
+                    debug_chunks.append(chunk)
+                yield chunk
         
-        # 응답 저장
-        save_response(response, "course_list_response.xml")
+        count = 0
+        for course in iter_course_rows(chunks(), year, semester_code):
+            count += 1
+            yield course
+        print(f"총 {count}개 강의 목록을 가져왔습니다.")
         
-        if response.status_code == 200:
-            try:
-                response_text = response.text
-                print(f"응답 길이: {len(response_text)} 바이트")
-                print(f"응답 미리보기: {response_text[:200]}...")
-                
-                # XML 파싱
-                root = ET.fromstring(response_text)
-                
-                # 네임스페이스 확인 및 설정
-                ns = {"nx": "http://www.nexacro.com/platform/dataset"}
-                
-                print(f"네임스페이스: {ns}")
-                
-                # 강의 데이터 추출
-                rows = []
-                
-                # Dataset 요소 찾기
-                datasets = root.findall(".//nx:Dataset", ns)
-                print(f"Dataset 요소 수: {len(datasets)}")
-                
-                for dataset in datasets:
-                    ds_id = dataset.get("id", "")
-                    print(f"Dataset ID: {ds_id}")
-                    
-                    # GRD_COUR001 ID를 가진 Dataset 확인
-                    if ds_id == "GRD_COUR001":
-                        # 행(Row) 데이터 추출
-                        rows_elem = dataset.find(".//nx:Rows", ns)
-                        
-                        if rows_elem is not None:
-                            row_elems = rows_elem.findall(".//nx:Row", ns)
-                            print(f"Row 요소 수: {len(row_elems)}")
-                            
-                            for row in row_elems:
-                                course_data = {}
-                                
-                                # 각 컬럼 데이터 추출
-                                for col in row:
-                                    col_id = col.get("id", "")
-                                    col_value = col.text if col.text else ""
-                                    course_data[col_id] = col_value
-                                
-                                # 필요한 필드 추출
-                                subject_code = course_data.get("SBJTCD", "")
-                                class_number = course_data.get("CLSS", "1")
-                                subject_name = course_data.get("SBJTNM", "")
-                                college = course_data.get("COLG_NM", "")  # 단과대학
-                                major = course_data.get("MAJR_NM", "")    # 학과
-                                course_type = course_data.get("SBJT_DIV_NM", "")  # 이수구분
-                                
-                                if subject_code:
-                                    rows.append({
-                                        "year": year,
-                                        "semester_code": semester_code,
-                                        "subject_code": subject_code,
-                                        "class_number": class_number,
-                                        "subject_name": subject_name,
-                                        "college": college,
-                                        "major": major,
-                                        "course_type": course_type
-                                    })
-                
-                print(f"총 {len(rows)}개 강의 목록을 가져왔습니다.")
-                
-                # 데이터가 없는 경우 샘플 강의 코드로 계속
-                if not rows:
-                    print("강의 목록이 비어있어 샘플 데이터를 추가합니다.")
-                    # 테스트용 샘플 과목 추가
-                    sample_courses = [
-                        {
-                            "year": year, 
-                            "semester_code": semester_code, 
-                            "subject_code": "0000128578", 
-                            "class_number": "1", 
-                            "subject_name": "샘플 강의 1",
-                            "college": "공과대학",
-                            "major": "컴퓨터공학부",
-                            "course_type": "학부전공"
-                        }
-                    ]
-                    rows.extend(sample_courses)
-                
-                return rows
-                
-            except Exception as e:
-                print(f"XML 파싱 중 오류: {e}")
-                import traceback
-                traceback.print_exc()
-                return []
-        else:
-            print(f"강의 목록 가져오기 실패: 상태 코드 {response.status_code}")
-            return []
-            
+        if debug_chunks is not None:
+            _save_debug_bytes(b"".join(debug_chunks), "course_list_response.xml")
+    finally:
+        response.close()
+
+def prefetch_course_list(courses):
+    """강의 목록을 별도 스레드에서 끝까지 받아 두고, 받은 강의부터 하나씩 반환
+
+    다운로드 속도와 관계없이 목록 응답을 바로 다 읽고 연결을 닫는다 (느린 크롤링 동안 목록 연결이 열려 있다가
+    서버/프록시 유휴 시간 초과로 목록이 조용히 잘리지 않도록). 목록은 수천 건이라 모두 메모리에 둔다.
+    목록을 받는 중에 난 오류는 그때까지 받은 강의를 모두 반환한 뒤 다시 발생한다.
+    """
+    received = queue.Queue()
+    done = object()
+    errors = []
+
+    def drain():
+        try:
+            for course in courses:
+                received.put(course)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            received.put(done)
+
+    threading.Thread(target=drain, name="course-list", daemon=True).start()
+    while True:
+        course = received.get()
+        if course is done:
+            break
+        yield course
+    if errors:
+        raise errors[0]
+
+# 강의 목록 가져오기 함수
+def fetch_course_list(year, semester_code, entrance_year="2017", client=None):
+    try:
+        rows = list(iter_course_list(year, semester_code, entrance_year, client=client))
+    except ET.ParseError as e:
+        print(f"XML 파싱 중 오류: {e}")
+        return []
     except Exception as e:
         print(f"강의 목록 요청 중 오류 발생: {e}")
         return []
+    
+    # 데이터가 없는 경우 샘플 강의 코드로 계속
+    if not rows:
+        print("강의 목록이 비어있어 샘플 데이터를 추가합니다.")
+        # 테스트용 샘플 과목 추가
+        sample_courses = [
+            {
+                "year": year, 
+                "semester_code": semester_code, 
+                "subject_code": "0000128578", 
+                "class_number": "1", 
+                "subject_name": "샘플 강의 1",
+                "college": "공과대학",
+                "major": "컴퓨터공학부",
+                "course_type": "학부전공"
+            }
+        ]
+        rows.extend(sample_courses)
+    
+    return rows
 
 # UbiReport PDF 생성 요청 함수
-def generate_pdf_from_ubireport(report_key):
+def generate_pdf_from_ubireport(report_key, client=None):
     """UbiReport에서 PDF 생성 요청"""
+    client = client or get_client()
     try:
-        url = "https://oasis.jbnu.ac.kr/com/UbiGateway"
+        url = client.url(UBI_GATEWAY_PATH)
         
         # PDF 내보내기 요청 헤더
         headers = {
@@ -214,7 +331,7 @@ def generate_pdf_from_ubireport(report_key):
         body = f"reqtype=1&exportid=PDF&key={report_key}"
         
         # 요청 보내기
-        response = requests.post(url, headers=headers, data=body, timeout=30)
+        response = client.post(url, headers=headers, data=body, timeout=30)
         
         print(f"PDF 내보내기 응답 상태 코드: {response.status_code}")
         print(f"PDF 내보내기 응답 헤더: {dict(response.headers)}")
@@ -236,14 +353,15 @@ def generate_pdf_from_ubireport(report_key):
         print(f"PDF 생성 요청 중 오류: {e}")
         return None
 
-# UbiReport 시작 함수 (3단계 과정)
-def get_syllabus_pdf(year, semester_code, subject_code, class_number, key):
-    """UbiReport 프로세스를 사용하여 강의계획서 PDF 생성 (3단계 과정)"""
+# UbiReport 1단계: 보고서 로드 요청
+def request_syllabus_report(year, semester_code, subject_code, class_number, key, client=None):
+    """UbiReport 보고서 로드 요청 후 (응답 본문, exportseq) 반환, 실패 시 (None, None)"""
+    client = client or get_client()
     try:
         # 1단계: 초기 요청 (보고서 로드)
         print("1단계: 초기 UbiReport 요청 보내는 중...")
         
-        url1 = "https://oasis.jbnu.ac.kr/com/UbiGateway"
+        url1 = client.url(UBI_GATEWAY_PATH)
         headers1 = {
             "accept": "*/*",
             "accept-language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
@@ -268,13 +386,13 @@ def get_syllabus_pdf(year, semester_code, subject_code, class_number, key):
             f"daemonid=&userwidth=undefined&userheight=undefined"
         )
         
-        response1 = requests.post(url1, headers=headers1, data=body1, timeout=30)
+        response1 = client.post(url1, headers=headers1, data=body1, timeout=30)
         print(f"1단계 응답 상태 코드: {response1.status_code}")
         save_response(response1, f"syllabus_step1_{key}.bin")
         
         if response1.status_code != 200:
             print("1단계 요청 실패")
-            return None
+            return None, None
             
         # 응답에서 exportseq 값 추출
         export_seq = response1.headers.get('exportseq', '')
@@ -287,13 +405,23 @@ def get_syllabus_pdf(year, semester_code, subject_code, class_number, key):
                 print(f"XML에서 exportseq 값 찾음: {export_seq}")
         
         print(f"exportseq: {export_seq}")
-        
+        return response1.content, export_seq
+    
+    except Exception as e:
+        print(f"보고서 요청 중 오류: {e}")
+        return None, None
+
+# UbiReport 2~3단계: PDF 내보내기 (1단계 응답을 파싱하지 못했을 때만 사용)
+def export_syllabus_pdf(key, export_seq="", client=None):
+    """1단계에서 로드한 보고서를 PDF로 내보내기"""
+    client = client or get_client()
+    try:
         # 2단계: 보고서 준비 상태 확인 (선택적)
         time.sleep(1)  # 보고서 준비 대기
         
         # 3단계: PDF 내보내기 요청
         print("3단계: PDF 내보내기 요청 보내는 중...")
-        url3 = "https://oasis.jbnu.ac.kr/com/UbiGateway"
+        url3 = client.url(UBI_GATEWAY_PATH)
         headers3 = {
             "accept": "*/*",
             "accept-language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
@@ -307,7 +435,7 @@ def get_syllabus_pdf(year, semester_code, subject_code, class_number, key):
         if export_seq:
             body3 += f"&exportseq={export_seq}"
         
-        response3 = requests.post(url3, headers=headers3, data=body3, timeout=30)
+        response3 = client.post(url3, headers=headers3, data=body3, timeout=30)
         print(f"3단계 응답 상태 코드: {response3.status_code}")
         save_response(response3, f"syllabus_step3_{key}.bin")
         
@@ -328,7 +456,7 @@ def get_syllabus_pdf(year, semester_code, subject_code, class_number, key):
                         if pdf_link:
                             pdf_url = pdf_link['href']
                             print(f"HTML에서 PDF 링크 발견: {pdf_url}")
-                            pdf_response = requests.get(pdf_url)
+                            pdf_response = client.get(pdf_url, timeout=30)
                             if pdf_response.status_code == 200:
                                 return pdf_response.content
                 except:
@@ -336,9 +464,9 @@ def get_syllabus_pdf(year, semester_code, subject_code, class_number, key):
                 
                 # 다른 방식으로 시도: 직접 PDF URL 구성
                 try:
-                    pdf_url = f"https://oasis.jbnu.ac.kr/com/UbiGateway?reqtype=1&exportid=PDF&key={key}"
+                    pdf_url = client.url(f"{UBI_GATEWAY_PATH}?reqtype=1&exportid=PDF&key={key}")
                     print(f"직접 PDF URL 구성 시도: {pdf_url}")
-                    pdf_response = requests.get(pdf_url)
+                    pdf_response = client.get(pdf_url, timeout=30)
                     if pdf_response.status_code == 200 and 'application/pdf' in pdf_response.headers.get('Content-Type', ''):
                         return pdf_response.content
                 except:
@@ -356,138 +484,13 @@ def get_syllabus_pdf(year, semester_code, subject_code, class_number, key):
         return None
 
 def parse_bin_file(bin_file_path):
-    try:
-        with open(bin_file_path, 'rb') as f:
-            content = f.read()
-        root = ET.fromstring(content)
-
-        syllabus_data = {
-            "기본정보": {},
-            "평가방법": {},
-            "핵심역량": {}
-        }
-        current_section = "기본정보"
-
-        # 1. 모든 Item을 (y, x, text) 튜플로 추출
-        items = []
-        for item in root.findall('.//Item'):
-            if 'classname' in item.attrib and item.attrib['classname'] == 'UbiTextItem':
-                text_elem = item.find('.//Text')
-                if text_elem is not None and text_elem.text:
-                    text = text_elem.text.strip()
-                    x = int(item.attrib.get('x', 0))
-                    y = int(item.attrib.get('y', 0))
-                    items.append((y, x, text))
-
-        # 2. y값(행) 기준으로 그룹핑 (오차 허용)
-        from collections import defaultdict
-        row_dict = defaultdict(list)
-        y_threshold = 3  # y좌표가 3px 이내면 같은 행으로 간주
-        sorted_items = sorted(items)
-        prev_y = None
-        group_y = None
-        for y, x, text in sorted_items:
-            if prev_y is None or abs(y - prev_y) > y_threshold:
-                group_y = y
-            row_dict[group_y].append((x, text))
-            prev_y = y
-
-        # 3. 각 행을 x값 오름차순으로 정렬 후 섹션별로 저장
-        rows_by_y = [sorted(row) for row in row_dict.values()]
-        section_rows = []
-        for row in rows_by_y:
-            texts = [text for x, text in row]
-            section_rows.append(texts)
-
-        def is_percent(val):
-            return bool(re.match(r'^[0-9]+%$', val.strip()))
-        def is_all_percent(row):
-            return all(is_percent(cell) for cell in row if cell.strip())
-        def is_all_korean(row):
-            return all(re.match(r'^[가-힣/()]+$', cell.strip()) for cell in row if cell.strip())
-
-        i = 0
-        prev_row = None
-        while i < len(section_rows):
-            row = section_rows[i]
-            # 섹션 구분
-            if any(s in row for s in ["교수정보", "강의정보", "평가방법", "교재정보", "핵심역량"]):
-                for s in ["교수정보", "강의정보", "평가방법", "교재정보", "핵심역량"]:
-                    if s in row:
-                        current_section = s
-                        break
-                # '평가방법' 표 구조 매핑 (한 행에 key-value 번갈아 있음)
-                if current_section == "평가방법":
-                    for j in range(0, len(row)-1, 2):
-                        key = row[j]
-                        value = row[j+1]
-                        if key != "평가방법":
-                            syllabus_data[current_section][key] = value
-                    i += 1
-                    prev_row = row
-                    continue
-            # '기본정보' 섹션에서 평가계획 표가 들어온 경우 분리 (다양한 케이스 처리)
-            if current_section == "기본정보":
-                if any("평가계획" in cell for cell in row):
-                    # 다음 행이 존재하고, 현재 행이 항목명, 다음 행이 %면 zip 매핑
-                    if i+1 < len(section_rows) and is_all_korean(row) and is_all_percent(section_rows[i+1]):
-                        keys = row
-                        values = section_rows[i+1]
-                        min_len = min(len(keys), len(values))
-                        for k, v in zip(keys[:min_len], values[:min_len]):
-                            if "평가계획" not in k:
-                                syllabus_data["평가방법"][k] = v
-                        i += 2
-                        prev_row = row
-                        continue
-                    # 한 행에 key-value 번갈아 있으면 짝수/홀수 매핑
-                    elif any(is_percent(cell) for cell in row) and any(re.match(r'^[가-힣/()]+$', cell.strip()) for cell in row):
-                        for j in range(0, len(row)-1, 2):
-                            k, v = row[j], row[j+1]
-                            if is_percent(v):
-                                syllabus_data["평가방법"][k] = v
-                        i += 1
-                        prev_row = row
-                        continue
-                    # 한 행에 값만 있으면 이전 행과 zip 매핑
-                    elif is_all_percent(row) and prev_row and is_all_korean(prev_row):
-                        keys = prev_row
-                        values = row
-                        min_len = min(len(keys), len(values))
-                        for k, v in zip(keys[:min_len], values[:min_len]):
-                            if "평가계획" not in k:
-                                syllabus_data["평가방법"][k] = v
-                        i += 1
-                        prev_row = row
-                        continue
-            # 일반 key-value 매핑 (2개씩)
-            j = 0
-            while j + 1 < len(row):
-                key = row[j]
-                value = row[j+1]
-                if key not in ["교수정보", "강의정보", "평가방법", "교재정보", "핵심역량"] and not (current_section == "기본정보" and "평가계획" in key):
-                    syllabus_data[current_section][key] = value
-                j += 2
-            prev_row = row
-            i += 1
-
-        # 세로형 평가계획 표 우선 처리 (보정)
-        for row in rows_by_y:
-            row = sorted(row)  # x값 기준 정렬
-            if len(row) > 3 and '평가계획' in row[0][1]:
-                for j in range(1, len(row)-1, 2):
-                    key = row[j][1]
-                    value = row[j+1][1]
-                    syllabus_data['평가방법'][key] = value
-            elif len(row) > 1 and '평가참고사항' in row[0][1]:
-                syllabus_data['평가방법']['평가참고사항'] = row[1][1]
-
-        return syllabus_data
-    except Exception as e:
-        print(f"파일 파싱 중 오류 발생: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+    """저장된 UbiReport 1단계 응답 파일 파싱 (디버그 덤프 재처리용)"""
+    with open(bin_file_path, 'rb') as f:
+        return parse_report(f)
+
+def parse_report_content(content):
+    """UbiReport 1단계 응답 본문(bytes)을 메모리에서 바로 파싱"""
+    return parse_report(content)
 
 def save_as_json(data, output_path):
     try:
@@ -499,8 +502,11 @@ def save_as_json(data, output_path):
         print(f"JSON 저장 중 오류: {e}")
         return False
 
-# 강의계획서 다운로드 함수
-def download_syllabus(year, semester_code, subject_code, class_number, subject_name=""):
+# 강의계획서 다운로드 함수 (저장된 파일 경로 반환, 실패 시 None)
+def download_syllabus(year, semester_code, subject_code, class_number, subject_name="", client=None, output_dir=None):
+    if output_dir is None:
+        output_dir = save_dir
+        os.makedirs(output_dir, exist_ok=True)
     print(f"강의계획서 요청: {subject_name} ({subject_code}, 분반: {class_number})")
     
     # 과목명이 없는 경우 기본값 설정
@@ -513,96 +519,230 @@ def download_syllabus(year, semester_code, subject_code, class_number, subject_n
     # 키 생성 (한 번만 생성하여 재사용)
     key = generate_key()
     
-    # UbiReport 3단계 프로세스로 PDF 가져오기
-    pdf_data = get_syllabus_pdf(year, semester_code, subject_code, class_number, key)
+    # 1단계: 보고서 로드 (응답은 디스크를 거치지 않고 메모리에서 파싱)
+    report_content, export_seq = request_syllabus_report(
+        year, semester_code, subject_code, class_number, key, client=client
+    )
     
-    # .bin 파일 파싱 (PDF 성공 여부와 관계없이)
-    bin_file = f"syllabus_step1_{key}.bin"
-    bin_path = os.path.join(save_dir, bin_file)
-    
-    if os.path.exists(bin_path):
-        print(f".bin 파일 발견: {bin_path}")
-        # .bin 파일 파싱
-        parsed_data = parse_bin_file(bin_path)
+    if report_content:
+        parsed_data = parse_report_content(report_content)
         
         if parsed_data:
             # JSON으로 저장 (과목명_분반.json 형식)
-            json_path = os.path.join(save_dir, f"{safe_subject_name}_{class_number}.json")
+            json_path = os.path.join(output_dir, f"{safe_subject_name}_{class_number}.json")
             if save_as_json(parsed_data, json_path):
-                print(f"JSON 파일 저장 완료: {json_path}")
-                return True
+                return json_path
+    
+    # 파싱에 실패한 경우에만 PDF 내보내기 요청
+    if report_content is not None:
+        pdf_data = export_syllabus_pdf(key, export_seq, client=client)
+    else:
+        pdf_data = None
     
     if pdf_data:
         # PDF 저장 (과목명_분반.pdf 형식)
-        pdf_path = os.path.join(save_dir, f"{safe_subject_name}_{class_number}.pdf")
+        pdf_path = os.path.join(output_dir, f"{safe_subject_name}_{class_number}.pdf")
         with open(pdf_path, 'wb') as f:
             f.write(pdf_data)
         print(f"PDF 파일 저장 완료: {pdf_path}")
-        return True
+        return pdf_path
     else:
-        print("PDF 다운로드 실패")
-        return False
+        print("강의계획서 다운로드 실패")
+        return None
+
+# 여러 강의계획서 병렬 다운로드 함수
+def crawl_courses(courses, year, semester_code, client, workers=4, journal=None, output_dir=None):
+    """제한된 수의 작업 스레드로 강의계획서 다운로드 (요청 속도는 client의 제한기가 조절)
+
+    courses는 리스트뿐 아니라 제너레이터도 받으며, 대기 중인 작업을 workers의 2배로 제한하므로
+    강의 목록을 받는 도중에도 다운로드를 시작할 수 있다.
+    """
+    success_count = 0
+    done_count = 0
+    max_pending = max(1, workers) * 2
+    
+    def download(course):
+        return download_syllabus(
+            year,
+            semester_code,
+            course['subject_code'],
+            course['class_number'],
+            course.get('subject_name', '이름 없음'),
+            client=client,
+            output_dir=output_dir
+        )
+    
+    def handle(future, course):
+        nonlocal success_count, done_count
+        error = "다운로드 실패"
+        try:
+            output_path = future.result()
+        except Exception as e:
+            print(f"다운로드 중 오류 발생: {course['subject_code']} - {e}")
+            output_path = None
+            error = str(e)
+        success = bool(output_path)
+        done_count += 1
+        if success:
+            success_count += 1
+        if journal is not None:
+            if success:
+                journal.mark_done(course, output_path)
+            else:
+                journal.mark_failed(course, error)
+        print(f"[{done_count}] 완료: {course.get('subject_name', '이름 없음')} ({'성공' if success else '실패'})")
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = {}
+        for course in courses:
+            if len(pending) >= max_pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    handle(future, pending.pop(future))
+            pending[executor.submit(download, course)] = course
+        for future in as_completed(pending):
+            handle(future, pending[future])
+    
+    return success_count
+
+def batched(iterable, size):
+    """iterable을 size개씩 묶은 리스트로 반환 (마지막 묶음은 더 작을 수 있음)"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def run_crawl(courses, year, semester_code, client, journal, workers=4, recrawl_changed=False, max_retry_wait=300,
+              output_dir=None):
+    """저널 기준으로 남은 강의만 크롤링하고, 실패한 강의는 지수 백오프로 재시도
+
+    courses가 제너레이터이면 작은 묶음 단위로 저널과 대조하여 바로 다운로드 대기열에 넣는다.
+    """
+    totals = {}
+    
+    def planned_courses():
+        for batch in batched(courses, 50):
+            to_crawl, stats = journal.plan(batch, recrawl_changed=recrawl_changed)
+            for name, count in stats.items():
+                totals[name] = totals.get(name, 0) + count
+            yield from to_crawl
+    
+    success_count = crawl_courses(planned_courses(), year, semester_code, client, workers=workers, journal=journal,
+                                  output_dir=output_dir)
+    if totals:
+        print(f"크롤링 계획: 신규 {totals['new']}, 중단 후 재개 {totals['resumed']}, 재시도 {totals['retry']}, "
+              f"변경됨 {totals['changed']}, 완료되어 건너뜀 {totals['skipped']}, "
+              f"재시도 대기 {totals['deferred']}, 포기 {totals['gave_up']}")
+    
+    # 재시도 대기열 처리 (대기 시간이 max_retry_wait를 넘으면 다음 실행으로 미룸)
+    while True:
+        retry_courses, next_at = journal.retry_queue(year, semester_code)
+        if not retry_courses:
+            break
+        delay = max(0.0, (next_at - datetime.now()).total_seconds())
+        if delay > max_retry_wait:
+            print(f"재시도 대기 {len(retry_courses)}건은 {delay:.0f}초 후 가능하므로 다음 실행으로 미룹니다.")
+            break
+        if delay > 0:
+            print(f"{len(retry_courses)}건 재시도까지 {delay:.1f}초 대기 중...")
+            time.sleep(delay)
+        due, _ = journal.plan(retry_courses)
+        if not due:
+            continue
+        print(f"실패한 강의 {len(due)}건 재시도")
+        success_count += crawl_courses(due, year, semester_code, client, workers=workers, journal=journal,
+                                       output_dir=output_dir)
+    
+    return success_count
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="강의계획서 다운로더")
+    parser.add_argument("--year", default="2025", help="기준 연도")
+    parser.add_argument("--semester-code", default="U211600010", help="학기 코드 (U211600010: 1학기)")
+    parser.add_argument("--entrance-year", default="2017", help="입학년도 (필터링용)")
+    parser.add_argument("--workers", type=int, default=4, help="동시 다운로드 작업 수")
+    parser.add_argument("--rps", type=float, default=2.0, help="전체 작업이 공유하는 초당 최대 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--base-url", default=None, help="서버 주소 (로컬 목 서버 테스트용)")
+    parser.add_argument("--journal", default=os.path.join(save_dir, "crawl_journal.db"), help="크롤링 저널(SQLite) 경로")
+    parser.add_argument("--recrawl-changed", action="store_true", help="완료된 강의 중 목록 항목이 바뀐 강의만 다시 크롤링")
+    parser.add_argument("--max-attempts", type=int, default=5, help="강의별 최대 시도 횟수")
+    parser.add_argument("--retry-base-delay", type=float, default=5.0, help="재시도 지수 백오프 기본 지연 (초)")
+    parser.add_argument("--max-retry-wait", type=float, default=300.0, help="이번 실행에서 재시도를 기다릴 최대 시간 (초)")
+    return parser.parse_args(argv)
 
 # 메인 함수
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+    
     # 설정
-    year = "2025"
-    semester_code = "U211600010"  # 2025년 1학기 코드
-    entrance_year = "2017"        # 입학년도 (필터링용)
+    year = args.year
+    semester_code = args.semester_code
+    entrance_year = args.entrance_year
+    
+    # 학기별 저장 폴더 (여러 학기를 받아도 파일명이 겹치지 않도록)
+    term_dir = os.path.join(save_dir, f"{year}_{semester_code}")
+    os.makedirs(term_dir, exist_ok=True)
+    
+    # 모든 작업이 공유하는 keep-alive 세션과 속도 제한기
+    client = OasisClient(base_url=args.base_url, requests_per_second=args.rps, pool_size=max(args.workers, 1) * 2)
+    journal = CrawlJournal(args.journal, max_attempts=args.max_attempts, base_delay=args.retry_base_delay)
     
     print("==== 강의계획서 다운로더 ====")
     print(f"기준 연도: {year}")
     print(f"학기 코드: {semester_code}")
-    print(f"저장 경로: {save_dir}")
+    print(f"저장 경로: {term_dir}")
+    print(f"서버 주소: {client.base_url}")
+    print(f"동시 작업 수: {args.workers}, 초당 최대 요청 수: {args.rps}")
+    print(f"크롤링 저널: {args.journal}")
     print("===========================\n")
     
-    # 1. 강의 목록 가져오기
-    print(f"강의 목록을 가져오는 중...")
-    courses = fetch_course_list(year, semester_code, entrance_year)
+    # 1~2. 강의 목록을 받는 대로 목록 파일에 기록하면서 바로 다운로드 대기열로 전달
+    courses_file = os.path.join(term_dir, "course_list.txt")
+    listed_count = 0
     
-    if not courses:
-        print("강의 목록을 가져오지 못했습니다.")
-        return
-    
-    # 2. 강의 목록 저장 (참고용)
-    courses_file = os.path.join(save_dir, "course_list.txt")
-    with open(courses_file, "w", encoding="utf-8") as f:
-        for course in courses:
+    def stream_courses(f):
+        nonlocal listed_count
+        # 목록은 다운로드와 별개로 끝까지 받아 둠 (다운로드 대기열이 차도 목록 연결이 열린 채 멈추지 않음)
+        for course in prefetch_course_list(iter_course_list(year, semester_code, entrance_year, client=client)):
+            listed_count += 1
             subject_name = course.get('subject_name', '이름 없음')
-            subject_code = course['subject_code']
-            class_number = course['class_number']
-            f.write(f"{subject_code} - {subject_name} (분반: {class_number})\n")
-    print(f"강의 목록 저장됨: {courses_file}")
+            f.write(f"{course['subject_code']} - {subject_name} (분반: {course['class_number']})\n")
+            yield course
     
-    # 3. 각 강의별 강의계획서 다운로드
-    print(f"\n총 {len(courses)}개 강의계획서 다운로드를 시작합니다.")
+    # 3. 각 강의별 강의계획서 다운로드 (고정 지연 대신 전역 속도 제한 적용)
+    print(f"강의 목록을 받으면서 강의계획서 다운로드를 시작합니다.")
     
-    success_count = 0
-    for i, course in enumerate(courses):
-        subject_code = course['subject_code']
-        class_number = course['class_number']
-        subject_name = course.get('subject_name', '이름 없음')
-        
-        print(f"\n[{i+1}/{len(courses)}] 처리 중: {subject_name} ({subject_code}, 분반: {class_number})")
-        
-        success = download_syllabus(
-            year, 
-            semester_code, 
-            subject_code, 
-            class_number,
-            subject_name
-        )
-        
-        if success:
-            success_count += 1
-        
-        # 요청 간 지연 (서버 부하 방지)
-        delay = 2 if i < 3 else 1.5  # 첫 몇 개는 조금 더 긴 지연
-        print(f"{delay}초 대기 중...")
-        time.sleep(delay)
+    start = time.perf_counter()
+    try:
+        with open(courses_file, "w", encoding="utf-8") as f:
+            success_count = run_crawl(
+                stream_courses(f), year, semester_code, client, journal,
+                workers=args.workers,
+                recrawl_changed=args.recrawl_changed,
+                max_retry_wait=args.max_retry_wait,
+                output_dir=term_dir
+            )
+    except Exception as e:
+        print(f"강의 목록 처리 중 오류 발생: {e}")
+        flush_debug_writes()
+        return
+    elapsed = time.perf_counter() - start
+    
+    if not listed_count:
+        print("강의 목록을 가져오지 못했습니다.")
+        flush_debug_writes()
+        return
+    print(f"강의 목록 저장됨: {courses_file} ({listed_count}개)")
     
-    print(f"\n작업 완료. 총 {len(courses)}개 강의계획서 중 {success_count}개 다운로드 성공.")
-    print(f"저장 위치: {save_dir}")
+    print(f"\n작업 완료. 이번 실행에서 {success_count}개 강의계획서 다운로드 성공.")
+    print(f"저널 상태: {journal.summary(year, semester_code)}")
+    flush_debug_writes()
+    print(f"소요 시간: {elapsed:.1f}초")
+    print(f"저장 위치: {term_dir}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,137 @@
+import re
+import threading
+import numpy as np
+
+# 요일/시간 문자열("월 7-A,월 7-B,수 6-A")을 주간 시간표 비트셋으로 변환하고 시간 충돌을 검사
+# 한 주를 요일(7) × 교시(0~15) × 반교시(A/B) = 224칸으로 나누어 uint64 4개에 담는다.
+# 후보 강의 전체를 (강의 수, 4) 행렬로 두고 학생 시간표와 비트 AND 한 번으로 충돌 여부를 계산한다.
+
+DAYS = "월화수목금토일"
+PERIODS_PER_DAY = 16  # 0~15교시
+HALVES = ("A", "B")
+SLOTS_PER_DAY = PERIODS_PER_DAY * len(HALVES)
+TOTAL_SLOTS = len(DAYS) * SLOTS_PER_DAY
+WORDS = (TOTAL_SLOTS + 63) // 64
+
+_SLOT_RE = re.compile(r'^\s*([월화수목금토일])\s*(\d{1,2})(?:\s*-\s*([AB]))?\s*$')
+
+# uint16 값별 켜진 비트 수 (겹치는 칸 수 계산용)
+_POPCOUNT16 = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+
+
+class ScheduleParseError(ValueError):
+    """요일/시간 형식이 아닌 문자열"""
+
+
+def slot_index(day, period, half):
+    return DAYS.index(day) * SLOTS_PER_DAY + period * len(HALVES) + HALVES.index(half)
+
+
+def parse_schedule(text, strict=False):
+    """요일/시간 문자열을 비트마스크(int)로 변환
+
+    "월 7-A,월 7-B"처럼 쉼표로 구분된 칸 목록이며, 반교시가 없으면("월 7") 교시 전체로 본다.
+    형식에 맞지 않는 항목은 무시하고 (strict이면 ScheduleParseError), 칸이 하나도 없으면 0을 반환한다.
+    """
+    mask = 0
+    for token in str(text or "").split(","):
+        if not token.strip():
+            continue
+        match = _SLOT_RE.match(token)
+        if not match or int(match.group(2)) >= PERIODS_PER_DAY:
+            if strict:
+                raise ScheduleParseError(f"요일/시간 형식이 아닙니다: {token.strip()}")
+            continue
+        day, period, half = match.group(1), int(match.group(2)), match.group(3)
+        for h in ([half] if half else HALVES):
+            mask |= 1 << slot_index(day, period, h)
+    return mask
+
+
+def mask_to_words(mask):
+    """비트마스크(int)를 uint64 배열로"""
+    return np.array([(mask >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(WORDS)], dtype=np.uint64)
+
+
+def format_mask(mask):
+    """비트마스크를 요일/시간 문자열로 (parse_schedule의 역변환)"""
+    slots = []
+    for index in range(TOTAL_SLOTS):
+        if mask >> index & 1:
+            day, rest = divmod(index, SLOTS_PER_DAY)
+            period, half = divmod(rest, len(HALVES))
+            slots.append(f"{DAYS[day]} {period}-{HALVES[half]}")
+    return ",".join(slots)
+
+
+def popcount(words):
+    """(N, WORDS) uint64 행렬의 행별 켜진 비트 수"""
+    return _POPCOUNT16[words.view(np.uint16)].reshape(len(words), -1).sum(axis=1, dtype=np.int32)
+
+
+class TimetableIndex:
+    """강의별 시간표 비트셋 행렬 (행 순서는 course_ids와 같음)"""
+
+    def __init__(self, course_ids, schedules):
+        self.course_ids = np.asarray(course_ids, dtype=np.int64)
+        self.words = np.zeros((len(self.course_ids), WORDS), dtype=np.uint64)
+        for row, schedule in enumerate(schedules):
+            mask = parse_schedule(schedule)
+            if mask:
+                self.words[row] = mask_to_words(mask)
+        self.has_schedule = self.words.any(axis=1)
+        self.slot_counts = popcount(self.words)
+        self._row_by_id = {int(course_id): row for row, course_id in enumerate(self.course_ids)}
+
+    @classmethod
+    def from_features(cls, table):
+        """course_features 특성 표(course_id, schedule 열)로부터 생성"""
+        return cls(table["course_id"].to_numpy(), table["schedule"].tolist())
+
+    def __len__(self):
+        return len(self.course_ids)
+
+    def rows_for(self, course_ids):
+        """course_id 목록의 행 번호 (색인에 없는 강의는 제외)"""
+        return np.array([self._row_by_id[c] for c in course_ids if c in self._row_by_id], dtype=np.int64)
+
+    def student_words(self, schedules=(), course_ids=()):
+        """학생 시간표(요일/시간 문자열 목록과 이미 담은 강의 목록)를 하나의 비트셋으로"""
+        words = np.zeros(WORDS, dtype=np.uint64)
+        for schedule in schedules:
+            words |= mask_to_words(parse_schedule(schedule, strict=True))
+        rows = self.rows_for(course_ids)
+        if len(rows):
+            words |= np.bitwise_or.reduce(self.words[rows], axis=0)
+        return words
+
+    def conflicts(self, student, rows=None):
+        """후보 강의별 시간 충돌 여부 (bool 배열). rows를 주면 해당 행만 검사"""
+        words = self.words if rows is None else self.words[rows]
+        return (words & student).any(axis=1)
+
+    def overlap_slots(self, student, rows=None):
+        """후보 강의별 학생 시간표와 겹치는 반교시 수"""
+        words = self.words if rows is None else self.words[rows]
+        return popcount(words & student)
+
+
+class TimetableStore:
+    """학기별 TimetableIndex 캐시 (특성 표가 바뀌면 다시 생성)"""
+
+    def __init__(self):
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get(self, term, table):
+        with self._lock:
+            cached = self._indexes.get(term)
+            if cached is not None and cached[0] is table:
+                return cached[1]
+        index = TimetableIndex.from_features(table)
+        with self._lock:
+            self._indexes[term] = (table, index)
+        return index
+
+
+timetables = TimetableStore()
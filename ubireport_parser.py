@@ -0,0 +1,223 @@
+import re
+import traceback
+import xml.etree.ElementTree as ET
+
+# UbiReport 1단계 응답(UbiTextItem 좌표 배치 XML)을 강의계획서 dict로 변환
+
+# y좌표가 3px 이내면 같은 행으로 간주
+Y_THRESHOLD = 3
+
+SECTION_NAMES = ("교수정보", "강의정보", "평가방법", "교재정보", "핵심역량")
+
+_PERCENT_RE = re.compile(r'^[0-9]+%$')
+_KOREAN_RE = re.compile(r'^[가-힣/()]+$')
+
+
+def _is_percent(val):
+    return _PERCENT_RE.match(val.strip()) is not None
+
+
+def _is_korean(val):
+    return _KOREAN_RE.match(val.strip()) is not None
+
+
+def _is_all_percent(row):
+    return all(_is_percent(cell) for cell in row if cell.strip())
+
+
+def _is_all_korean(row):
+    return all(_is_korean(cell) for cell in row if cell.strip())
+
+
+class _TextItemCollector:
+    """XMLParser target: 트리를 만들지 않고 UbiTextItem의 (y, x, text)만 수집
+
+    각 Item의 텍스트는 기존 구현의 item.find('.//Text').text와 같이
+    문서 순서상 첫 번째 Text 하위 요소의 (자식 요소 앞) 텍스트이다.
+    """
+
+    def __init__(self):
+        self.items = []
+        self._open_items = []  # [classname, x, y, text, text_assigned]
+        self._text_depth = 0
+        self._text_parts = None
+        self._text_has_child = False
+
+    def start(self, tag, attrib):
+        if self._text_depth:
+            self._text_has_child = True
+            if tag == "Text":
+                self._text_depth += 1
+            return
+        if tag == "Item":
+            self._open_items.append([attrib.get("classname"), attrib.get("x", 0), attrib.get("y", 0), None, False])
+        elif tag == "Text" and self._open_items:
+            self._text_depth = 1
+            self._text_parts = []
+            self._text_has_child = False
+
+    def data(self, data):
+        if self._text_depth and not self._text_has_child:
+            self._text_parts.append(data)
+
+    def end(self, tag):
+        if self._text_depth:
+            if tag == "Text":
+                self._text_depth -= 1
+                if not self._text_depth:
+                    text = "".join(self._text_parts)
+                    self._text_parts = None
+                    for item in self._open_items:
+                        if not item[4]:
+                            item[3] = text
+                            item[4] = True
+            return
+        if tag == "Item":
+            classname, x, y, text, _ = self._open_items.pop()
+            if classname == "UbiTextItem" and text:
+                self.items.append((int(y), int(x), text.strip()))
+
+    def close(self):
+        return None
+
+    def drain(self):
+        items, self.items = self.items, []
+        return items
+
+
+def iter_text_items(source, chunk_size=65536):
+    """UbiTextItem을 (y, x, text)로 점진적으로 추출
+
+    source는 bytes 또는 파일 객체. 입력을 chunk_size 단위로 파서에 넣고 그때까지 완성된
+    Item을 바로 내보내며, DOM을 만들지 않으므로 메모리 사용량이 문서 크기와 무관하다.
+    """
+    collector = _TextItemCollector()
+    parser = ET.XMLParser(target=collector)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        chunks = (view[i:i + chunk_size] for i in range(0, len(view), chunk_size))
+    else:
+        chunks = iter(lambda: source.read(chunk_size), b"")
+    for chunk in chunks:
+        parser.feed(bytes(chunk))
+        yield from collector.drain()
+    parser.close()
+    yield from collector.drain()
+
+
+def group_rows(items):
+    """(y, x, text) 목록을 한 번의 정렬 순회로 행 단위로 묶음
+
+    반환값: (행별 텍스트 목록, 세로형 평가계획 보정값 목록)
+    """
+    rows = []
+    corrections = []
+
+    def finish_row(row):
+        row.sort()
+        rows.append([text for _, text in row])
+        # 세로형 평가계획 표 / 평가참고사항 행은 마지막에 덮어쓰기 위해 따로 모음
+        if len(row) > 3 and '평가계획' in row[0][1]:
+            for j in range(1, len(row) - 1, 2):
+                corrections.append((row[j][1], row[j + 1][1]))
+        elif len(row) > 1 and '평가참고사항' in row[0][1]:
+            corrections.append(('평가참고사항', row[1][1]))
+
+    current = None
+    prev_y = None
+    for y, x, text in sorted(items):
+        if prev_y is None or abs(y - prev_y) > Y_THRESHOLD:
+            if current is not None:
+                finish_row(current)
+            current = []
+        current.append((x, text))
+        prev_y = y
+    if current is not None:
+        finish_row(current)
+    return rows, corrections
+
+
+def map_sections(section_rows, corrections):
+    """행 목록을 섹션별 key-value로 매핑
+
+    결과에는 기본정보/평가방법/핵심역량이 항상 있고, 보고서에 교수정보/강의정보/교재정보 머리행이 있으면
+    그 섹션도 최상위 키로 추가된다 (머리행 아래 항목은 기본정보가 아닌 그 섹션에 들어감).
+    """
+    syllabus_data = {
+        "기본정보": {},
+        "평가방법": {},
+        "핵심역량": {}
+    }
+    current_section = "기본정보"
+
+    i = 0
+    prev_row = None
+    while i < len(section_rows):
+        row = section_rows[i]
+        # 섹션 구분
+        section = next((s for s in SECTION_NAMES if s in row), None)
+        if section is not None:
+            current_section = section
+            # 교수정보/강의정보/교재정보 같은 머리행도 섹션으로 받음 (처음 나올 때 만듦)
+            syllabus_data.setdefault(current_section, {})
+            # '평가방법' 표 구조 매핑 (한 행에 key-value 번갈아 있음)
+            if current_section == "평가방법":
+                for j in range(0, len(row) - 1, 2):
+                    key = row[j]
+                    value = row[j + 1]
+                    if key != "평가방법":
+                        syllabus_data[current_section][key] = value
+                i += 1
+                prev_row = row
+                continue
+        # '기본정보' 섹션에서 평가계획 표가 들어온 경우 분리 (다양한 케이스 처리)
+        if current_section == "기본정보" and any("평가계획" in cell for cell in row):
+            # 다음 행이 존재하고, 현재 행이 항목명, 다음 행이 %면 zip 매핑
+            if i + 1 < len(section_rows) and _is_all_korean(row) and _is_all_percent(section_rows[i + 1]):
+                for k, v in zip(row, section_rows[i + 1]):
+                    if "평가계획" not in k:
+                        syllabus_data["평가방법"][k] = v
+                i += 2
+                prev_row = row
+                continue
+            # 한 행에 key-value 번갈아 있으면 짝수/홀수 매핑
+            elif any(_is_percent(cell) for cell in row) and any(_is_korean(cell) for cell in row):
+                for j in range(0, len(row) - 1, 2):
+                    k, v = row[j], row[j + 1]
+                    if _is_percent(v):
+                        syllabus_data["평가방법"][k] = v
+                i += 1
+                prev_row = row
+                continue
+            # 한 행에 값만 있으면 이전 행과 zip 매핑
+            elif _is_all_percent(row) and prev_row and _is_all_korean(prev_row):
+                for k, v in zip(prev_row, row):
+                    if "평가계획" not in k:
+                        syllabus_data["평가방법"][k] = v
+                i += 1
+                prev_row = row
+                continue
+        # 일반 key-value 매핑 (2개씩)
+        for j in range(0, len(row) - 1, 2):
+            key = row[j]
+            if key not in SECTION_NAMES and not (current_section == "기본정보" and "평가계획" in key):
+                syllabus_data[current_section][key] = row[j + 1]
+        prev_row = row
+        i += 1
+
+    # 세로형 평가계획 표 우선 처리 (보정)
+    for key, value in corrections:
+        syllabus_data['평가방법'][key] = value
+
+    return syllabus_data
+
+
+def parse_report(source):
+    """UbiReport 1단계 응답(bytes 또는 파일 객체)을 강의계획서 dict로 파싱, 실패 시 None"""
+    try:
+        rows, corrections = group_rows(iter_text_items(source))
+        return map_sections(rows, corrections)
+    except Exception as e:
+        print(f"파일 파싱 중 오류 발생: {e}")
+        traceback.print_exc()
+        return None
@@ -1,11 +1,22 @@
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from data_processor import Course, Syllabus
+from data_processor import Course, Syllabus, LEGACY_TERM, init_db
+from terms import get_current_term, register_term
+from course_catalog import catalog, build_course_metadata
+from chunking import chunk_course
+from metrics import span, RETRIEVED_HITS
+from retrieval_scoring import scored_search, scored_search_batch, load_min_similarity
+from profiling import stage, add_profile_arguments, profiler_from_args
+from index_registry import indexes, chroma_dir
+import contextvars
+import functools
 import json
 import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+import argparse
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -19,125 +30,258 @@ DATABASE_URL = "sqlite:///course_recommender.db"
 engine = create_engine(DATABASE_URL)
 Session = sessionmaker(bind=engine)
 
-# ChromaDB 설정
-CHROMA_DB_DIR = "./chroma_db"
-embeddings = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
+# ChromaDB 디렉터리는 index_registry의 현재 배포 버전 (빌드는 새 디렉터리에 쓰고 배포 시 교체)
 
-def get_vector_store():
-    """VectorDB 인스턴스 반환"""
+# 임베딩 클라이언트는 처음 사용할 때 생성 (import만으로 openai 패키지를 읽지 않도록)
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+def get_embeddings():
+    """OpenAI 임베딩 클라이언트 (처음 호출할 때 생성)"""
+    global _embeddings
+    if _embeddings is None:
+        with _embeddings_lock:
+            if _embeddings is None:
+                from langchain_community.embeddings import OpenAIEmbeddings
+                _embeddings = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
+    return _embeddings
+
+# 새로 만드는 컬렉션의 거리 종류 (l2/cosine/ip). 이미 있는 컬렉션은 만들 때의 설정을 그대로 사용
+DISTANCE_METRIC = os.getenv("CHROMA_DISTANCE_METRIC", "l2")
+
+# 검색 결과로 인정할 최소 코사인 유사도 (retrieval_scoring.py calibrate로 보정)
+MIN_SIMILARITY = load_min_similarity()
+
+# 학기 구분 이전에 만든 컬렉션 (langchain 기본 이름)은 LEGACY_TERM 컬렉션으로 계속 사용
+LEGACY_COLLECTION = "langchain"
+
+def collection_name(term):
+    """학기별 Chroma 컬렉션 이름"""
+    if term == LEGACY_TERM:
+        return LEGACY_COLLECTION
+    return f"courses_{term}"
+
+# 배포된 버전의 Chroma 인스턴스는 (버전, 컬렉션 이름)별로 한 번만 열고, 새 버전이 배포되면 이전 버전을
+# 쓰는 요청(use_index)이 모두 끝난 뒤 닫는다. chromadb는 디렉터리마다 클라이언트를 전역으로 캐시하므로
+# 직접 닫지 않으면 배포할 때마다 인덱스 하나씩 메모리에 남는다.
+_stores = {}
+_store_users = {}  # 버전 → use_index로 그 버전을 쓰는 중인 요청 수
+_stores_lock = threading.Lock()
+_pinned_version = contextvars.ContextVar("pinned_index_version", default=None)
+
+def _open_store(name, directory):
     return Chroma(
-        persist_directory=CHROMA_DB_DIR,
-        embedding_function=embeddings
+        collection_name=name,
+        persist_directory=directory,
+        embedding_function=get_embeddings(),
+        collection_metadata={"hnsw:space": DISTANCE_METRIC}
     )
 
-def get_course_documents():
-    """데이터베이스에서 강의 정보를 가져와 문서 형식으로 변환"""
+def close_directory(directory):
+    """chromadb가 캐시한 디렉터리의 클라이언트를 닫음 (그 디렉터리로 연 Chroma 인스턴스는 더 쓰지 않아야 함)"""
+    from chromadb.api.shared_system_client import SharedSystemClient
+    system = SharedSystemClient._identifier_to_system.pop(directory, None)
+    if system is not None:
+        system.stop()
+
+def _release_unused_versions():
+    """현재 버전이 아니고 쓰는 요청이 없는 버전의 인스턴스를 닫고 hold 기록을 지움"""
+    current = indexes.current_version()
+    with _stores_lock:
+        stale = {version for version, _ in _stores if version != current and not _store_users.get(version)}
+        for key in [key for key in _stores if key[0] in stale]:
+            del _stores[key]
+    for version in stale:
+        close_directory(chroma_dir(version))
+        indexes.release(version)
+
+def _store(name, directory):
+    if directory is not None:
+        # 빌드 디렉터리는 캐시하지 않음 (다 쓰면 close_directory로 닫음)
+        return _open_store(name, directory)
+    version = _pinned_version.get() or indexes.current_version()
+    key = (version, name)
+    with _stores_lock:
+        store = _stores.get(key)
+    if store is None:
+        store = _open_store(name, chroma_dir(version))
+        with _stores_lock:
+            store = _stores.setdefault(key, store)
+        indexes.hold(version)
+        _release_unused_versions()
+    return store
+
+@contextmanager
+def use_index():
+    """블록이 끝날 때까지 시작 시점의 배포 버전을 사용 (그동안 그 버전의 인스턴스를 닫지 않음)"""
+    version = indexes.current_version()
+    with _stores_lock:
+        _store_users[version] = _store_users.get(version, 0) + 1
+    token = _pinned_version.set(version)
+    try:
+        yield version
+    finally:
+        _pinned_version.reset(token)
+        with _stores_lock:
+            _store_users[version] -= 1
+            if not _store_users[version]:
+                del _store_users[version]
+        _release_unused_versions()
+
+def get_vector_store(term=None, directory=None):
+    """학기별 VectorDB 인스턴스 반환 (term 생략 시 기본 학기, directory 생략 시 현재 배포된 인덱스)"""
+    return _store(collection_name(term or get_current_term()), directory)
+
+def course_collection_name(term):
+    """학기별 강의 단위 벡터 컬렉션 이름 (강의당 벡터 1개)"""
+    return f"course_vectors_{term}"
+
+def get_course_vector_store(term=None, directory=None):
+    """학기별 강의 단위 VectorDB 인스턴스 반환 (term 생략 시 기본 학기, directory 생략 시 현재 배포된 인덱스)"""
+    return _store(course_collection_name(term or get_current_term()), directory)
+
+def publish_build(update):
+    """현재 인덱스를 복사한 새 빌드 디렉터리에서 update(directory)를 실행한 뒤 배포
+
+    실행 중인 API는 배포 전까지 이전 디렉터리를 계속 읽는다. update가 실패하면 빌드를 버린다.
+    """
+    version, directory = indexes.start_build()
+    try:
+        result = update(directory)
+    except BaseException:
+        close_directory(directory)
+        indexes.discard(version)
+        raise
+    close_directory(directory)
+    indexes.publish(version)
+    indexes.prune()
+    return result
+
+def drop_term_collection(term):
+    """학기 컬렉션 삭제 (다른 학기 컬렉션에는 영향 없음)"""
+    def drop(directory):
+        get_vector_store(term, directory).delete_collection()
+        get_course_vector_store(term, directory).delete_collection()
+    publish_build(drop)
+    print(f"VectorDB 컬렉션 삭제 완료: {collection_name(term)}, {course_collection_name(term)}")
+
+def build_course_document(course):
+    """강의 한 건을 임베딩용 문서(섹션 기반 청크 + 메타데이터)로 변환"""
+    # 메타데이터 (청크에는 course_id만 저장되고, 전체 메타데이터는 검색 후 강의 목록에서 조회)
+    return {"chunks": chunk_course(course), "metadata": build_course_metadata(course)}
+
+def get_course_documents(term):
+    """데이터베이스에서 해당 학기 강의 정보를 가져와 문서 형식으로 변환"""
     session = Session()
     try:
-        courses = session.query(Course).all()
-        documents = []
-        
-        for course in courses:
-            # 기본 정보
-            basic_info = json.loads(course.syllabus.basic_info)
-            professor_info = json.loads(course.syllabus.professor_info)
-            course_info = json.loads(course.syllabus.course_info)
-            evaluation = json.loads(course.syllabus.evaluation)
-            textbook_info = json.loads(course.syllabus.textbook_info)
-            core_competencies = json.loads(course.syllabus.core_competencies)
-            
-            # 텍스트 생성 (JSON 구조 반영)
-            text = f"""
-            강의 기본 정보:
-            - 교과목명: {course.subject_name}
-            - 담당교수: {course.professor}
-            - 이수구분: {course.course_type}
-            - 학과/학년: {course.major} {course.year}
-            - 분반: {course.class_number}
-            - 학기: {course.semester}
-
-            기본 정보:
-            - 이메일: {basic_info.get('email', '')}
-            - 연락처: {basic_info.get('phone', '')}
-            - 수업목표: {basic_info.get('course_objective', '')}
-
-            교수 정보:
-            - 연구실: {professor_info.get('office', '')}
-            - 상담가능시간: {professor_info.get('consultation_time', '')}
-
-            강의 정보:
-            - 강의실: {course_info.get('classroom', '')}
-            - 요일/시간: {course_info.get('schedule', '')}
-
-            평가 방법:
-            - A 비율: {evaluation.get('a_ratio', '')}
-            - 평가방법: {evaluation.get('evaluation_method', '')}
-            - 중간고사: {evaluation.get('midterm', '')}
-            - 기말고사: {evaluation.get('final', '')}
-            - 출석: {evaluation.get('attendance', '')}
-            - 과제: {evaluation.get('assignment', '')}
-            - 기타: {evaluation.get('other', '')}
-
-            교재 정보:
-            - 주교재: {textbook_info.get('main_textbook', '')}
-            - 참고자료: {textbook_info.get('reference', '')}
-
-            핵심역량:
-            - 소통역량: {core_competencies.get('communication', '')}
-            - 창의역량: {core_competencies.get('creativity', '')}
-            - 인성역량: {core_competencies.get('personality', '')}
-            - 실무역량: {core_competencies.get('practical', '')}
-            - 도전역량: {core_competencies.get('challenge', '')}
-            """
-            
-            # 메타데이터 (None 값을 빈 문자열로 변환)
-            metadata = {
-                "subject_code": course.subject_code or "",
-                "subject_name": course.subject_name or "",
-                "class_number": course.class_number or "",
-                "professor": course.professor or "",
-                "college": course.college or "",
-                "major": course.major or "",
-                "course_type": course.course_type or "",
-                "year": course.year or "",
-                "semester": course.semester or "",
-                "professor_email": basic_info.get('email', '') or "",
-                "professor_phone": basic_info.get('phone', '') or "",
-                "course_objective": basic_info.get('course_objective', '') or "",
-                "office": professor_info.get('office', '') or "",
-                "consultation_time": professor_info.get('consultation_time', '') or "",
-                "classroom": course_info.get('classroom', '') or "",
-                "schedule": course_info.get('schedule', '') or ""
-            }
-            
-            documents.append({"text": text, "metadata": metadata})
-        
-        return documents
+        courses = session.query(Course).filter(Course.term == term).all()
+        return [build_course_document(course) for course in courses]
     finally:
         session.close()
 
-def create_vector_store():
-    """VectorDB 생성"""
-    # 문서 가져오기
-    documents = get_course_documents()
-    
-    # 텍스트 분할 (청크 크기를 500으로 감소)
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,  # 청크 크기 감소
-        chunk_overlap=100,  # 오버랩 감소
-        length_function=len,
-        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
-    )
-    
+def split_documents(documents):
+    """문서의 청크를 (텍스트 목록, 메타데이터 목록)으로 펼침
+
+    청크 메타데이터에는 course_id와 chunk_index만 저장한다 (나머지는 검색 후 강의 목록에서 조회).
+    """
     texts = []
     metadatas = []
-    
     for doc in documents:
-        if not doc["text"].strip():
+        course_id = doc["metadata"]["course_id"]
+        texts.extend(doc["chunks"])
+        metadatas.extend({"course_id": course_id, "chunk_index": i} for i in range(len(doc["chunks"])))
+    return texts, metadatas
+
+# 강의 단위 벡터를 만들 때 수업목표가 담긴 청크의 가중치 (나머지 청크는 1)
+OBJECTIVE_WEIGHT = 2.0
+OBJECTIVE_MARKER = "[수업목표]"
+
+# 강의 단위 검색에서 가져올 후보 수 (n_results의 배수, 같은 교과목의 다른 분반 중복 제거 여유분)
+COURSE_CANDIDATE_FACTOR = 2
+
+# 청크 검색(강의 단위 컬렉션이 없는 학기)에서 가져올 청크 수 (n_results의 배수)
+CHUNK_CANDIDATE_FACTOR = 4
+
+def aggregate_course_vectors(chunk_embeddings, metadatas, documents):
+    """청크 임베딩을 강의별로 가중 평균하여 {course_id: (L2 정규화된 벡터, 대표 청크 텍스트)} 반환
+
+    수업목표가 담긴 청크는 OBJECTIVE_WEIGHT배로 반영한다. course_id가 없는 청크는 건너뛴다.
+    """
+    sums = {}
+    weights = {}
+    first_chunk = {}
+    for embedding, metadata, document in zip(chunk_embeddings, metadatas, documents):
+        course_id = (metadata or {}).get("course_id")
+        if course_id is None:
             continue
-        chunks = text_splitter.split_text(doc["text"])
-        texts.extend(chunks)
-        metadatas.extend([doc["metadata"]] * len(chunks))
+        weight = OBJECTIVE_WEIGHT if OBJECTIVE_MARKER in (document or "") else 1.0
+        vector = np.asarray(embedding, dtype=np.float32) * weight
+        if course_id in sums:
+            sums[course_id] += vector
+        else:
+            sums[course_id] = vector
+        weights[course_id] = weights.get(course_id, 0.0) + weight
+        if metadata.get("chunk_index") == 0 or course_id not in first_chunk:
+            first_chunk[course_id] = document or ""
+    result = {}
+    for course_id, total in sums.items():
+        vector = total / weights[course_id]
+        norm = np.linalg.norm(vector)
+        result[course_id] = (vector / norm if norm > 0 else vector, first_chunk[course_id])
+    return result
+
+def build_course_vectors(vectorstore, course_store, course_ids=None):
+    """청크 컬렉션의 임베딩으로 강의 단위 벡터를 만들어 course_store에 반영 (임베딩 API 호출 없음)
+
+    course_ids를 주면 해당 강의만 다시 만든다. 청크가 없어진 강의의 벡터는 삭제한다.
+    """
+    where = {"course_id": {"$in": list(course_ids)}} if course_ids is not None else None
+    data = vectorstore.get(where=where, include=["embeddings", "metadatas", "documents"])
+    vectors = aggregate_course_vectors(data["embeddings"], data["metadatas"], data["documents"])
+    if course_ids is not None:
+        stale = [f"course-{course_id}" for course_id in course_ids if course_id not in vectors]
+        if stale:
+            course_store.delete(ids=stale)
+    if not vectors:
+        return 0
+    ordered = sorted(vectors)
+    course_store._collection.upsert(
+        ids=[f"course-{course_id}" for course_id in ordered],
+        embeddings=[vectors[course_id][0].tolist() for course_id in ordered],
+        metadatas=[{"course_id": course_id} for course_id in ordered],
+        documents=[vectors[course_id][1] for course_id in ordered]
+    )
+    return len(ordered)
+
+def index_course_documents(vectorstore, documents, course_store=None):
+    """강의 문서를 기존 VectorDB에 추가 (같은 강의의 이전 청크는 교체)
+
+    course_store를 주면 해당 강의들의 강의 단위 벡터도 다시 만든다.
+    """
+    course_ids = [doc["metadata"]["course_id"] for doc in documents]
+    existing = vectorstore.get(where={"course_id": {"$in": course_ids}}, include=[])
+    if existing["ids"]:
+        vectorstore.delete(ids=existing["ids"])
+    
+    texts, metadatas = split_documents(documents)
+    if texts:
+        ids = [f"course-{metadata['course_id']}-{metadata['chunk_index']}" for metadata in metadatas]
+        vectorstore.add_texts(texts=texts, metadatas=metadatas, ids=ids)
+    if course_store is not None and course_ids:
+        build_course_vectors(vectorstore, course_store, course_ids)
+    return len(texts)
+
+def create_vector_store(term=None, profiler=None):
+    """학기별 VectorDB 생성 (해당 학기 컬렉션만 다시 만듦)"""
+    init_db()
+    term = term or get_current_term()
+    
+    # 문서 가져오기
+    with stage(profiler, "document_rendering"):
+        documents = get_course_documents(term)
+    
+    with stage(profiler, "chunking"):
+        texts, metadatas = split_documents(documents)
     
     if not texts:
         print("임베딩할 텍스트가 없습니다. 데이터베이스에 데이터가 있는지 확인하세요.")
@@ -146,91 +290,216 @@ def create_vector_store():
     # 배치 크기 설정 (한 번에 처리할 텍스트 수)
     BATCH_SIZE = 20  # 배치 크기 감소
     
-    # VectorDB 생성
-    vectorstore = Chroma.from_texts(
-        texts=texts,
-        embedding=embeddings,
-        metadatas=metadatas,
-        persist_directory=CHROMA_DB_DIR
-    )
+    def build(directory):
+        # 새 빌드 디렉터리에서 기존 컬렉션을 비우고 VectorDB 생성 (중복 청크 방지)
+        get_vector_store(term, directory).delete_collection()
+        with stage(profiler, "embedding"):
+            vectorstore = Chroma.from_texts(
+                texts=texts,
+                embedding=get_embeddings(),
+                metadatas=metadatas,
+                collection_name=collection_name(term),
+                persist_directory=directory,
+                collection_metadata={"hnsw:space": DISTANCE_METRIC}
+            )
+        
+        # 강의 단위 벡터 (청크 임베딩 가중 평균)
+        get_course_vector_store(term, directory).delete_collection()
+        with stage(profiler, "course_vectors"):
+            course_store = get_course_vector_store(term, directory)
+            count = build_course_vectors(vectorstore, course_store)
+            vectorstore.persist()
+        return count
+    
+    # 빌드가 끝난 뒤에 배포하므로 실행 중인 API는 만드는 도중의 인덱스를 읽지 않음
+    count = publish_build(build)
+    # 처음 적재한 학기도 terms.py activate/API에서 쓸 수 있도록 등록 (이미 있으면 그대로)
+    register_term(*term.split("-", 1))
+    print(f"VectorDB 생성 완료: {term} ({collection_name(term)}, 강의 단위 벡터 {count}개, "
+          f"버전 {indexes.current_version()})")
+
+def _dedupe_results(results, n_results, min_similarity=None):
+    """교과목명 기준 중복 제거 및 유사도 임계값 적용
+
+    results는 유사도 내림차순이므로 임계값보다 낮은 결과가 나오면 나머지도 모두 낮아 바로 멈춘다.
+    """
+    min_similarity = MIN_SIMILARITY if min_similarity is None else min_similarity
+    # 중복 제거를 위한 set
+    seen_subjects = set()
+    formatted_results = []
+    
+    for doc, score in results:
+        if score < min_similarity:
+            break
+        
+        # 메타데이터에서 교과목명 가져오기
+        metadata = doc.metadata
+        subject_name = metadata.get("subject_name", "")
+        
+        # 이미 본 교과목이면 건너뛰기
+        if subject_name in seen_subjects:
+            continue
+        
+        # 결과 추가
+        result = {
+            "content": doc.page_content,
+            "metadata": metadata,
+            "score": float(score)
+        }
+        formatted_results.append(json.dumps(result, ensure_ascii=False))
+        seen_subjects.add(subject_name)
+        
+        # 원하는 수의 결과를 얻으면 중단
+        if len(formatted_results) >= n_results:
+            break
+    
+    return formatted_results
+
+def _rerank_with_chunks(vectorstore, query_embedding, candidates):
+    """강의 단위 후보 안에서만 청크를 검색하여, 강의별 가장 가까운 청크로 내용과 점수를 보정
+
+    모든 후보의 점수를 (강의 점수 + 가장 가까운 청크 점수) / 2 로 맞춘다. 한 번의 검색에 청크가 잡히지 않은
+    후보는 해당 강의의 청크만 다시 검색하고, 청크가 아예 없으면 강의 점수를 청크 점수로 쓴다.
+    """
+    course_ids = [doc.metadata["course_id"] for doc, _ in candidates]
+    chunk_results = scored_search(vectorstore, query_embedding, len(course_ids) * 2,
+                                  filter={"course_id": {"$in": course_ids}})
+    best_chunk = {}
+    for doc, score in chunk_results:
+        course_id = doc.metadata.get("course_id")
+        if course_id not in best_chunk or score > best_chunk[course_id][1]:
+            best_chunk[course_id] = (doc, score)
+    for course_id in course_ids:
+        if course_id not in best_chunk:
+            hits = scored_search(vectorstore, query_embedding, 1, filter={"course_id": course_id})
+            if hits:
+                best_chunk[course_id] = hits[0]
+    
+    reranked = []
+    for doc, score in candidates:
+        chunk = best_chunk.get(doc.metadata["course_id"])
+        if chunk is not None:
+            doc, score = chunk[0], (score + chunk[1]) / 2
+        reranked.append((doc, score))
+    reranked.sort(key=lambda item: item[1], reverse=True)
+    return reranked
+
+def _above_min_similarity(results):
+    """유사도 내림차순 결과 중 MIN_SIMILARITY 이상인 앞부분
+
+    최소 유사도는 retrieval_scoring.py calibrate가 강의 단위 점수로 보정하므로, 청크 점수와 섞기 전의
+    강의 점수에 적용한다 (청크 보정 여부와 관계없이 같은 기준으로 자름).
+    """
+    for i, (_, score) in enumerate(results):
+        if score < MIN_SIMILARITY:
+            return results[:i]
+    return results
+
+def _finish_results(term, results, n_results, min_similarity=None):
+    """검색 결과에 전체 메타데이터를 채우고 교과목명 기준 중복 제거"""
+    RETRIEVED_HITS.inc(len(results))
     
-    vectorstore.persist()
-    print("VectorDB 생성 완료")
+    # 순위가 정해진 뒤 강의 목록에서 전체 메타데이터 채우기
+    with span("hydrate"):
+        for doc, _ in results:
+            doc.metadata = catalog.hydrate(term, doc.metadata)
+    
+    # 결과 처리
+    if results:
+        with span("dedupe"):
+            return _dedupe_results(results, n_results, min_similarity)
+    return []
+
+def _pinned(function):
+    """검색 함수 하나가 끝날 때까지 같은 배포 버전을 사용 (use_index)"""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with use_index():
+            return function(*args, **kwargs)
+    return wrapper
+
+@_pinned
+def query_similar_courses(query_text, n_results=5, term=None, rerank_chunks=True):
+    """유사한 강의 검색 (term 생략 시 기본 학기만 검색)
 
-def query_similar_courses(query_text, n_results=5):
-    """유사한 강의 검색"""
+    강의 단위 벡터 컬렉션에서 후보 강의를 먼저 고르고, rerank_chunks이면 후보 강의의 청크만
+    다시 검색하여 순위를 보정한다. 강의 단위 컬렉션이 없으면 청크 검색으로 대신한다.
+    """
+    term = term or get_current_term()
     try:
         # VectorDB 인스턴스 가져오기
-        vectorstore = get_vector_store()
+        with span("open_store"):
+            vectorstore = get_vector_store(term)
+            course_store = get_course_vector_store(term)
         
-        # 쿼리 실행 (검색 결과 수 증가)
-        results = vectorstore.similarity_search_with_score(
-            query=query_text,
-            k=20  # 검색 결과 수 증가
-        )
+        # 쿼리 임베딩과 검색을 분리하여 단계별 시간 측정
+        with span("embed_query"):
+            query_embedding = get_embeddings().embed_query(query_text)
         
-        # 결과 처리
-        if results:
-            # 중복 제거를 위한 set
-            seen_subjects = set()
-            formatted_results = []
-            
-            for doc, score in results:
-                # 메타데이터에서 교과목명 가져오기
-                metadata = doc.metadata
-                subject_name = metadata.get("subject_name", "")
-                
-                # 이미 본 교과목이면 건너뛰기
-                if subject_name in seen_subjects:
-                    continue
-                
-                # 유사도 점수가 너무 낮으면 건너뛰기 (0.5 이상만 포함)
-                if float(score) < 0.5:
-                    continue
-                
-                # 결과 추가
-                result = {
-                    "content": doc.page_content,
-                    "metadata": metadata,
-                    "score": float(score)
-                }
-                formatted_results.append(json.dumps(result, ensure_ascii=False))
-                seen_subjects.add(subject_name)
-                
-                # 원하는 수의 결과를 얻으면 중단
-                if len(formatted_results) >= n_results:
-                    break
-            
-            # 결과가 없으면 임계값을 더 낮춰서 재시도
-            if not formatted_results:
-                for doc, score in results:
-                    metadata = doc.metadata
-                    subject_name = metadata.get("subject_name", "")
-                    
-                    if subject_name in seen_subjects:
-                        continue
-                    
-                    # 임계값을 0.3으로 낮춤
-                    if float(score) < 0.3:
-                        continue
-                    
-                    result = {
-                        "content": doc.page_content,
-                        "metadata": metadata,
-                        "score": float(score)
-                    }
-                    formatted_results.append(json.dumps(result, ensure_ascii=False))
-                    seen_subjects.add(subject_name)
-                    
-                    if len(formatted_results) >= n_results:
-                        break
-            
-            return formatted_results
-        return []
+        # 1단계: 강의 단위 검색 (강의당 벡터 1개라 청크 많은 강의가 결과를 차지하지 않음)
+        with span("course_search"):
+            results = scored_search(course_store, query_embedding, n_results * COURSE_CANDIDATE_FACTOR)
+        
+        if not results:
+            # 강의 단위 컬렉션이 없는 경우 (학기 구분 이전 컬렉션 등) 청크 검색
+            with span("vector_search"):
+                results = scored_search(vectorstore, query_embedding, n_results * CHUNK_CANDIDATE_FACTOR)
+            return _finish_results(term, results, n_results)
+        
+        results = _above_min_similarity(results)
+        if results and rerank_chunks:
+            # 2단계: 후보 강의의 청크만 검색하여 순위 보정
+            with span("chunk_rerank"):
+                results = _rerank_with_chunks(vectorstore, query_embedding, results)
+        # 최소 유사도는 강의 점수에 이미 적용함
+        return _finish_results(term, results, n_results, min_similarity=float("-inf"))
         
     except Exception as e:
         print(f"쿼리 실행 중 오류 발생: {str(e)}")
         return []
 
+@_pinned
+def query_similar_courses_batch(query_texts, n_results=5, term=None, rerank_chunks=False):
+    """여러 질문의 유사한 강의를 한 번에 검색 (질문 순서대로 결과 목록 반환)
+
+    질문 임베딩은 한 번의 배치 호출로 만들고, 강의 단위 컬렉션도 한 번의 조회로 모든 질문을 검색한다.
+    rerank_chunks이면 질문마다 후보 강의의 청크 검색을 추가로 수행한다.
+    """
+    term = term or get_current_term()
+    if not query_texts:
+        return []
+    with span("open_store"):
+        vectorstore = get_vector_store(term)
+        course_store = get_course_vector_store(term)
+    
+    with span("embed_query"):
+        query_embeddings = get_embeddings().embed_documents(list(query_texts))
+    
+    with span("course_search"):
+        batches = scored_search_batch(course_store, query_embeddings, n_results * COURSE_CANDIDATE_FACTOR)
+    if not any(batches):
+        # 강의 단위 컬렉션이 없는 경우 청크 검색
+        with span("vector_search"):
+            batches = scored_search_batch(vectorstore, query_embeddings, n_results * CHUNK_CANDIDATE_FACTOR)
+        return [_finish_results(term, results, n_results) for results in batches]
+    batches = [_above_min_similarity(results) for results in batches]
+    if rerank_chunks:
+        with span("chunk_rerank"):
+            batches = [
+                _rerank_with_chunks(vectorstore, embedding, results) if results else results
+                for embedding, results in zip(query_embeddings, batches)
+            ]
+    return [_finish_results(term, results, n_results, min_similarity=float("-inf")) for results in batches]
+
 if __name__ == "__main__":
-    create_vector_store() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="DB의 강의 정보로 VectorDB 생성")
+    parser.add_argument("--term", default=None, help="생성할 학기 (예: 2025-U211600010, 생략 시 기본 학기)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    profiler = profiler_from_args(args, "vector_store")
+    try:
+        create_vector_store(term=args.term, profiler=profiler)
+    finally:
+        if profiler is not None:
+            profiler.finish()